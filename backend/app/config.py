@@ -0,0 +1,130 @@
+"""
+应用配置模块
+
+所有可调参数均可通过环境变量覆盖，便于在 Docker / 多实例部署中调整。
+"""
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    """读取整数类型的环境变量"""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """读取浮点类型的环境变量"""
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class Settings:
+    """
+    应用配置
+
+    目前使用环境变量 + 默认值的简单方式，避免引入额外依赖。
+    """
+
+    def __init__(self):
+        # 爬虫基础配置
+        self.user_agent: str = os.getenv(
+            "CRAWLER_USER_AGENT",
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+        )
+        self.crawler_timeout: int = _env_int("CRAWLER_TIMEOUT", 30)
+        self.request_timeout: int = _env_int("CRAWLER_REQUEST_TIMEOUT", 60)
+
+        # 浏览器池配置
+        self.browser_pool_size: int = _env_int("CRAWLER_POOL_SIZE", 2)
+        self.browser_max_pages: int = _env_int("CRAWLER_MAX_PAGES_PER_BROWSER", 5)
+        self.browser_recycle_after: int = _env_int("CRAWLER_RECYCLE_AFTER_PAGES", 200)
+
+        # 任务存储配置 (sqlite / memory)
+        self.task_store_backend: str = os.getenv("TASK_STORE_BACKEND", "sqlite")
+        self.task_db_path: str = os.getenv("TASK_DB_PATH", "data/tasks.db")
+
+        # 结果内容存储配置
+        self.result_blob_dir: str = os.getenv("RESULT_BLOB_DIR", "data/results")
+        self.result_inline_max_chars: int = _env_int("RESULT_INLINE_MAX_CHARS", 2048)
+
+        # 批量任务结果增量写入: jsonl (分段文件) / sqlite
+        self.result_sink_backend: str = os.getenv("RESULT_SINK_BACKEND", "jsonl")
+        self.result_sink_dir: str = os.getenv("RESULT_SINK_DIR", "data/task_results")
+        self.result_sink_db_path: str = os.getenv("RESULT_SINK_DB_PATH", "data/task_results.db")
+        self.result_segment_size: int = _env_int("RESULT_SEGMENT_SIZE", 1000)
+        # GET /tasks/{id} 最多内联返回的结果数，更多结果通过 /tasks/{id}/results 分页读取
+        self.task_inline_results_max: int = _env_int("TASK_INLINE_RESULTS_MAX", 100)
+
+        # 批量任务进度写入: 合并间隔 (秒)，或累计完成多少个URL后立即写入
+        self.progress_flush_interval: float = _env_float("PROGRESS_FLUSH_INTERVAL", 0.25)
+        self.progress_flush_every: int = _env_int("PROGRESS_FLUSH_EVERY", 100)
+
+        # 响应压缩: 小于该字节数的响应不压缩；不小于该字节数的响应体 (或流式块) 在线程池中压缩，不阻塞事件循环
+        self.compression_min_size: int = _env_int("COMPRESSION_MIN_SIZE", 1024)
+        self.compression_thread_min_size: int = _env_int("COMPRESSION_THREAD_MIN_SIZE", 64 * 1024)
+
+        # 监控指标: 域名标签上限 (超出归入 other)、事件循环延迟采样间隔 (秒)
+        self.metric_max_domains: int = _env_int("METRIC_MAX_DOMAINS", 100)
+        self.loop_lag_interval: float = _env_float("LOOP_LAG_INTERVAL", 0.5)
+
+        # 日志: 级别、格式 (json / text)、文件目录 (为空时只输出到控制台)、轮转大小与份数、
+        # 高频日志 (如批量进度) 的采样间隔 (秒，0 表示不采样)
+        self.log_level: str = os.getenv("LOG_LEVEL", "INFO")
+        self.log_format: str = os.getenv("LOG_FORMAT", "json").lower()
+        self.log_dir: str = os.getenv("LOG_DIR", "logs")
+        self.log_max_bytes: int = _env_int("LOG_MAX_BYTES", 50 * 1024 * 1024)
+        self.log_backup_count: int = _env_int("LOG_BACKUP_COUNT", 5)
+        self.log_sample_interval: float = _env_float("LOG_SAMPLE_INTERVAL", 5.0)
+
+        # 内存调控: 上限 (MB，0 表示不限制)、软阈值比例、采样间隔与 GC/回收冷却时间 (秒)
+        self.memory_ceiling_mb: int = _env_int("MEMORY_CEILING_MB", 0)
+        self.memory_soft_ratio: float = _env_float("MEMORY_SOFT_RATIO", 0.8)
+        self.memory_sample_interval: float = _env_float("MEMORY_SAMPLE_INTERVAL", 2.0)
+        self.memory_gc_cooldown: float = _env_float("MEMORY_GC_COOLDOWN", 10.0)
+        self.gc_freeze_on_start: bool = os.getenv("GC_FREEZE_ON_START", "true").lower() == "true"
+
+        # 爬取缓存配置
+        self.crawl_cache_path: str = os.getenv("CRAWL_CACHE_PATH", "data/crawl_cache.db")
+        self.crawl_cache_ttl: int = _env_int("CRAWL_CACHE_TTL_SECONDS", 24 * 3600)
+        self.crawl_cache_max_bytes: int = _env_int("CRAWL_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+        self.crawl_cache_memory_entries: int = _env_int("CRAWL_CACHE_MEMORY_ENTRIES", 256)
+
+        # 变化检测: 指纹数据库、近似重复的 SimHash 汉明距离上限、条件请求超时 (秒)
+        self.fingerprint_db_path: str = os.getenv("FINGERPRINT_DB_PATH", "data/fingerprints.db")
+        self.change_simhash_distance: int = _env_int("CHANGE_SIMHASH_DISTANCE", 3)
+        self.conditional_request_timeout: float = _env_float("CONDITIONAL_REQUEST_TIMEOUT", 10.0)
+
+        # 批量爬取调度配置 (每主机并发/限速/退避)
+        self.scheduler_per_host_limit: int = _env_int("SCHEDULER_PER_HOST_LIMIT", 2)
+        self.scheduler_host_rate: float = _env_float("SCHEDULER_HOST_RATE", 2.0)
+        self.scheduler_host_burst: float = _env_float("SCHEDULER_HOST_BURST", 4.0)
+        self.scheduler_backoff_base: float = _env_float("SCHEDULER_BACKOFF_BASE", 2.0)
+        self.scheduler_backoff_max: float = _env_float("SCHEDULER_BACKOFF_MAX", 60.0)
+        self.scheduler_max_retries: int = _env_int("SCHEDULER_MAX_RETRIES", 2)
+
+        # 流式批量接收: URL 文件目录与单个任务的URL上限
+        self.batch_spool_dir: str = os.getenv("BATCH_SPOOL_DIR", "data/batches")
+        self.batch_max_urls: int = _env_int("BATCH_MAX_URLS", 1000000)
+
+        # 批量任务执行方式: inline (API 进程内) / queue (独立 worker 进程)
+        self.batch_executor: str = os.getenv("BATCH_EXECUTOR", "inline").lower()
+        self.job_queue_backend: str = os.getenv("JOB_QUEUE_BACKEND", "sqlite")
+        self.job_db_path: str = os.getenv("JOB_DB_PATH", "data/jobs.db")
+        self.redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.job_lease_seconds: float = _env_float("JOB_LEASE_SECONDS", 60.0)
+        self.job_max_attempts: int = _env_int("JOB_MAX_ATTEMPTS", 3)
+        self.worker_poll_interval: float = _env_float("WORKER_POLL_INTERVAL", 1.0)
+
+        # 深度爬取配置
+        self.deep_crawl_max_pages: int = _env_int("DEEP_CRAWL_MAX_PAGES", 500)
+        self.deep_crawl_domain_delay: float = _env_float("DEEP_CRAWL_DOMAIN_DELAY", 1.0)
+        self.deep_crawl_bloom_threshold: int = _env_int("DEEP_CRAWL_BLOOM_THRESHOLD", 100000)
+
+
+settings = Settings()
@@ -0,0 +1,90 @@
+"""
+应用级服务容器与依赖注入
+
+所有路由通过 FastAPI Depends 从 app.state.services 获取同一组服务实例，
+保证批量爬取创建的任务能被任务接口查询和取消。
+"""
+
+from starlette.requests import HTTPConnection
+
+from app.services.browser_pool import BrowserPool
+from app.services.change_detection import FingerprintStore
+from app.services.crawl_cache import CrawlCache
+from app.services.crawler_service import CrawlerService
+from app.services.job_queue import JobQueue, create_job_queue
+from app.services.memory_governor import MemoryGovernor
+from app.services.result_store import ResultBlobStore
+from app.services.task_service import TaskService
+from app.utils.logging import get_logger
+from app.utils.metrics import EventLoopMonitor
+
+logger = get_logger(__name__)
+
+
+class ServiceContainer:
+    """
+    应用级服务容器
+
+    在应用创建时实例化并挂载到 app.state.services，
+    由 startup/shutdown 事件管理资源生命周期。
+    """
+
+    def __init__(self):
+        self.browser_pool = BrowserPool()
+        self.result_store = ResultBlobStore()
+        self.task_service = TaskService(blob_store=self.result_store)
+        self.job_queue = create_job_queue()
+        self.crawl_cache = CrawlCache()
+        self.fingerprints = FingerprintStore()
+        self.memory_governor = MemoryGovernor(browser_pool=self.browser_pool)
+        self.crawler_service = CrawlerService(
+            browser_pool=self.browser_pool,
+            crawl_cache=self.crawl_cache,
+            memory_governor=self.memory_governor,
+            fingerprints=self.fingerprints
+        )
+        self.loop_monitor = EventLoopMonitor()
+
+    async def startup(self):
+        """启动需要预热的资源"""
+        self.loop_monitor.start()
+        await self.browser_pool.start()
+        # 在预热完成后启动，使 gc.freeze 覆盖启动期创建的对象
+        self.memory_governor.start()
+        logger.info("服务容器已启动")
+
+    async def shutdown(self):
+        """释放所有服务资源"""
+        await self.loop_monitor.stop()
+        await self.memory_governor.stop()
+        await self.browser_pool.close()
+        await self.task_service.close()
+        await self.crawl_cache.close()
+        await self.fingerprints.close()
+        await self.job_queue.close()
+        logger.info("服务容器已关闭")
+
+
+def get_services(connection: HTTPConnection) -> ServiceContainer:
+    """获取应用级服务容器"""
+    return connection.app.state.services
+
+
+def get_task_service(connection: HTTPConnection) -> TaskService:
+    """获取共享的任务服务"""
+    return get_services(connection).task_service
+
+
+def get_crawler_service(connection: HTTPConnection) -> CrawlerService:
+    """获取共享的爬虫服务"""
+    return get_services(connection).crawler_service
+
+
+def get_result_store(connection: HTTPConnection) -> ResultBlobStore:
+    """获取共享的结果内容存储"""
+    return get_services(connection).result_store
+
+
+def get_job_queue(connection: HTTPConnection) -> JobQueue:
+    """获取共享的批量任务队列"""
+    return get_services(connection).job_queue
@@ -4,15 +4,20 @@ Crawl4AI 可视化工具 - FastAPI 后端
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import uvicorn
 import os
 import sys
 from pathlib import Path
 
-from app.routers import crawler, tasks, projects
+from app.config import settings
+from app.middleware import CompressionMiddleware
+from app.routers import crawler, tasks, projects, results
 from app.models.database import init_db
+from app.dependencies import ServiceContainer
 from app.utils.logging import setup_logging
+from app.utils.metrics import CONTENT_TYPE_LATEST, collect_service_metrics, render_metrics
+from app.utils.serialization import FastJSONResponse
 
 # 设置日志
 logger = setup_logging()
@@ -23,9 +28,13 @@ app = FastAPI(
     description="基于 crawl4ai 的专业级网页内容提取工具",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
 )
 
+# 应用级服务容器，所有路由共享
+app.state.services = ServiceContainer()
+
 # CORS 配置
 app.add_middleware(
     CORSMiddleware,
@@ -35,10 +44,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 响应压缩 (zstd / br / gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    thread_min_size=settings.compression_thread_min_size
+)
+
 # 注册路由
 app.include_router(crawler.router, prefix="/api/v1/crawler", tags=["爬虫"])
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["任务管理"])
 app.include_router(projects.router, prefix="/api/v1/projects", tags=["项目管理"])
+app.include_router(results.router, prefix="/api/v1/results", tags=["结果内容"])
 
 @app.on_event("startup")
 async def startup_event():
@@ -46,11 +63,13 @@ async def startup_event():
     logger.info("启动 Crawl4AI 可视化工具后端...")
     await init_db()
     logger.info("数据库初始化完成")
+    await app.state.services.startup()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭时的清理"""
     logger.info("关闭 Crawl4AI 可视化工具后端...")
+    await app.state.services.shutdown()
 
 @app.get("/")
 async def root():
@@ -65,16 +84,32 @@ async def root():
 async def health_check():
     """健康检查"""
     try:
-        # 这里可以添加更多的健康检查逻辑
-        # 比如检查数据库连接、Redis 连接等
+        services = app.state.services
+        # 任务存储可读、浏览器池已启动才视为健康
+        await services.task_service.store.list(offset=0, limit=1)
+        pool = services.browser_pool.get_stats()
+        if not pool["started"]:
+            raise RuntimeError("浏览器池未启动")
         return {
             "status": "healthy",
-            "message": "服务运行正常"
+            "message": "服务运行正常",
+            "browser_pages": {
+                "active": pool["active_pages"],
+                "available": pool["available_pages"],
+            },
+            "event_loop_lag": round(services.loop_monitor.last_lag, 4),
+            "memory": services.memory_governor.get_stats(),
         }
     except Exception as e:
         logger.error(f"健康检查失败: {e}")
         raise HTTPException(status_code=500, detail="服务异常")
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 指标"""
+    await collect_service_metrics(app.state.services)
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """全局异常处理"""
@@ -0,0 +1,217 @@
+"""
+应用中间件
+
+CompressionMiddleware: 按 Accept-Encoding 协商 zstd / brotli / gzip 压缩响应
+- zstd 需安装 zstandard 包，brotli 需安装 brotli 包，均未安装时只使用 gzip
+- 小于 minimum_size 的响应、已编码的响应、SSE 事件流与 Range 请求不压缩
+- 流式响应逐块压缩并立即刷新，不等待完整响应
+- 不小于 thread_min_size 的响应体或流式块在线程池中压缩，避免阻塞事件循环
+"""
+
+import asyncio
+import gzip
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 可选依赖
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 可选依赖
+    zstandard = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+# 不压缩的内容类型 (事件流需要逐条到达，图片/压缩包本身已压缩)
+SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "application/zip", "application/gzip")
+
+
+def available_encodings() -> List[str]:
+    """按优先级排列的可用压缩算法"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    按 Accept-Encoding 选择压缩算法
+
+    Args:
+        accept_encoding: Accept-Encoding 请求头
+
+    Returns:
+        Optional[str]: "zstd" / "br" / "gzip"，客户端不支持时返回None
+    """
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        try:
+            q = float(params.strip()[2:]) if params.strip().startswith("q=") else 1.0
+        except ValueError:
+            q = 1.0
+        if q > 0:
+            accepted.add(token.strip())
+    for encoding in available_encodings():
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+class _Compressor:
+    """统一 gzip / brotli / zstd 的流式压缩接口"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # wbits=31 输出 gzip 格式
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """压缩一块数据并刷新，使客户端可以立即解码"""
+        if self.encoding == "zstd":
+            return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.flush()
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "zstd":
+            return self._obj.flush()
+        if self.encoding == "br":
+            return self._obj.finish()
+        return self._obj.flush()
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    """一次性压缩完整响应体"""
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    响应压缩中间件
+
+    Args:
+        app: ASGI 应用
+        minimum_size: 小于该字节数的完整响应不压缩
+        thread_min_size: 不小于该字节数的数据在线程池中压缩
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, thread_min_size: int = 64 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_min_size = thread_min_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = negotiate_encoding(headers.get("accept-encoding"))
+        if encoding is None or "range" in headers:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.minimum_size, self.thread_min_size)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """拦截响应消息，按需压缩响应体"""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int, thread_min_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.thread_min_size = thread_min_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _should_skip(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] in (204, 206, 304) or "content-encoding" in headers:
+            return True
+        content_type = headers.get("content-type", "")
+        return any(content_type.startswith(t) for t in SKIP_CONTENT_TYPES)
+
+    async def _run(self, func, data: bytes, *args) -> bytes:
+        """较大的数据在线程池中压缩 (zlib / brotli / zstandard 压缩时释放 GIL)"""
+        if len(data) >= self.thread_min_size:
+            return await asyncio.to_thread(func, data, *args)
+        return func(data, *args)
+
+    async def __call__(self, message: Message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # 等到第一块响应体再决定是否压缩
+            self.start_message = message
+            self.passthrough = self._should_skip(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+
+            if not more_body and len(body) < self.minimum_size:
+                # 完整且较小的响应原样发送
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                body = await self._run(compress_bytes, body, self.encoding)
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+
+            # 流式响应: 长度未知，逐块压缩
+            del headers["Content-Length"]
+            self.compressor = _Compressor(self.encoding)
+            await self.send(start)
+
+        # 同一响应的块依次压缩，压缩器不会被并发使用
+        data = await self._run(self.compressor.compress, body) if body else b""
+        if not more_body:
+            data += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
@@ -47,7 +47,7 @@ class CrawlConfig(BaseModel):
     
     # 内容处理配置
     css_selector: Optional[str] = Field(default=None, description="CSS选择器")
-    excluded_tags: List[str] = Field(default_factory=list, description="排除的HTML标签")
+    excluded_tags: List[str] = Field(default_factory=lambda: ["form"], description="排除的HTML标签")
     excluded_selector: Optional[str] = Field(default=None, description="排除的CSS选择器")
     only_text: bool = Field(default=False, description="仅提取文本")
     
@@ -72,6 +72,10 @@ class CrawlConfig(BaseModel):
     override_navigator: bool = Field(default=False, description="覆盖导航器属性")
     magic: bool = Field(default=False, description="智能处理")
     
+    # 变化检测配置
+    change_detection: bool = Field(default=False, description="计算内容指纹并与上次爬取比较 (结果 metadata.change)，skip_unchanged 开启时自动启用")
+    skip_unchanged: bool = Field(default=False, description="增量重爬: 优先发送条件请求，内容未变化的页面不返回也不保存正文")
+    
     # 实验性功能
     experimental: Optional[Dict[str, Any]] = Field(default=None, description="实验性参数")
 
@@ -89,9 +93,9 @@ class SingleCrawlRequest(BaseModel):
 
 class BatchCrawlRequest(BaseModel):
     """批量URL爬取请求"""
-    urls: List[HttpUrl] = Field(..., min_items=1, max_items=100, description="要爬取的URL列表")
+    urls: List[HttpUrl] = Field(..., min_items=1, max_items=1000, description="要爬取的URL列表 (更大的任务使用 /batch/stream)")
     config: Optional[CrawlConfig] = Field(default_factory=CrawlConfig, description="爬取配置")
-    concurrent_limit: int = Field(default=5, ge=1, le=20, description="并发限制")
+    concurrent_limit: int = Field(default=5, ge=1, le=100, description="并发限制")
 
 class StructuredExtractionRequest(BaseModel):
     """结构化数据提取请求"""
@@ -117,6 +121,8 @@ class CrawlResult(BaseModel):
     title: Optional[str] = Field(default=None, description="页面标题")
     markdown: Optional[str] = Field(default=None, description="Markdown内容")
     cleaned_html: Optional[str] = Field(default=None, description="清理后的HTML")
+    markdown_ref: Optional[str] = Field(default=None, description="Markdown内容ID (通过 /results/{id}/markdown 获取)")
+    html_ref: Optional[str] = Field(default=None, description="HTML内容ID (通过 /results/{id}/html 获取)")
     media: Optional[Dict[str, Any]] = Field(default=None, description="媒体内容")
     links: Optional[Dict[str, Any]] = Field(default=None, description="链接信息")
     metadata: Optional[Dict[str, Any]] = Field(default=None, description="元数据")
@@ -138,7 +144,40 @@ class TaskInfo(BaseModel):
     updated_at: Optional[datetime] = Field(default=None, description="更新时间")
     completed_at: Optional[datetime] = Field(default=None, description="完成时间")
     error_message: Optional[str] = Field(default=None, description="错误信息")
-    results: Optional[List[CrawlResult]] = Field(default=None, description="爬取结果")
+    result_count: int = Field(default=0, ge=0, description="已写入的结果数量 (可分页读取的偏移上限)")
+    timing_stats: Optional[Dict[str, Dict[str, float]]] = Field(default=None, description="各阶段耗时统计(秒): {阶段: {count, p50, p95}}")
+    results: Optional[List[CrawlResult]] = Field(default=None, description="爬取结果 (结果较多时为空，通过 /tasks/{task_id}/results 分页获取)")
+
+class TaskProgress(BaseModel):
+    """任务进度快照 (不包含结果，供轻量级进度查询)"""
+    task_id: str = Field(..., description="任务ID")
+    status: CrawlStatus = Field(..., description="任务状态")
+    progress: float = Field(default=0.0, ge=0.0, le=100.0, description="进度百分比")
+    total_urls: int = Field(default=0, ge=0, description="总URL数量")
+    completed_urls: int = Field(default=0, ge=0, description="已完成URL数量")
+    failed_urls: int = Field(default=0, ge=0, description="失败URL数量")
+    result_count: int = Field(default=0, ge=0, description="已写入的结果数量")
+    updated_at: Optional[datetime] = Field(default=None, description="更新时间")
+    
+    @classmethod
+    def from_task(cls, task: TaskInfo) -> "TaskProgress":
+        return cls(
+            task_id=task.task_id,
+            status=task.status,
+            progress=task.progress,
+            total_urls=task.total_urls,
+            completed_urls=task.completed_urls,
+            failed_urls=task.failed_urls,
+            result_count=task.result_count,
+            updated_at=task.updated_at
+        )
+
+class TaskPage(BaseModel):
+    """分页任务列表"""
+    items: List[TaskInfo] = Field(default_factory=list, description="任务列表(不含结果)")
+    total: int = Field(default=0, ge=0, description="符合条件的任务总数")
+    offset: int = Field(default=0, ge=0, description="偏移量")
+    limit: int = Field(default=50, ge=1, description="每页数量")
 
 class ProjectInfo(BaseModel):
     """项目信息"""
@@ -162,6 +201,10 @@ class TaskResponse(APIResponse):
     """任务响应"""
     data: Optional[TaskInfo] = None
 
+class TaskListResponse(APIResponse):
+    """任务列表响应"""
+    data: Optional[TaskPage] = None
+
 class CrawlResponse(APIResponse):
     """爬取响应"""
     data: Optional[Union[CrawlResult, List[CrawlResult]]] = None
@@ -2,60 +2,66 @@
 爬虫相关的 API 路由 - 简化版本
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Query, Request
+from typing import List, Optional, Union
 import uuid
 import time
-import asyncio
 from datetime import datetime
 
 from app.models.schemas import (
     SingleCrawlRequest, BatchCrawlRequest, StructuredExtractionRequest,
-    CrawlResult, CrawlResponse, TaskResponse, TaskInfo, CrawlStatus
+    CrawlConfig, CrawlResult, CrawlResponse, TaskResponse, TaskInfo, CrawlStatus, APIResponse
 )
+from app.config import settings
+from app.dependencies import get_crawler_service, get_job_queue, get_task_service
+from app.services.batch_runner import run_batch_task
 from app.services.crawler_service import CrawlerService
+from app.services.job_queue import JobQueue
 from app.services.task_service import TaskService
+from app.services.url_ingest import UrlSpool
 from app.utils.logging import get_logger
+from app.utils.serialization import FastJSONResponse
 
 router = APIRouter()
 logger = get_logger(__name__)
 
-# 初始化服务
-crawler_service = CrawlerService()
-task_service = TaskService()
-
 @router.post("/single", response_model=CrawlResponse)
-async def crawl_single_url(request: SingleCrawlRequest):
+async def crawl_single_url(
+    request: SingleCrawlRequest,
+    crawler_service: CrawlerService = Depends(get_crawler_service)
+):
     """
     爬取单个URL - 简化版本
     """
     try:
         logger.info(f"开始爬取单个URL: {request.url}")
-        start_time = time.time()
         
-        # 调用爬虫服务
+        # 调用爬虫服务 (耗时及各阶段耗时由服务记录在结果中)
         result = await crawler_service.crawl_single(
             url=str(request.url),
             config=request.config
         )
         
-        execution_time = time.time() - start_time
-        result.execution_time = execution_time
-        
-        logger.info(f"单个URL爬取完成: {request.url}, 耗时: {execution_time:.2f}s")
+        logger.info(f"单个URL爬取完成: {request.url}, 耗时: {result.execution_time or 0:.2f}s")
         
-        return CrawlResponse(
+        return FastJSONResponse(CrawlResponse(
             success=True,
             message="爬取成功",
             data=result
-        )
+        ))
         
     except Exception as e:
         logger.error(f"单个URL爬取失败: {request.url}, 错误: {str(e)}")
         raise HTTPException(status_code=500, detail=f"爬取失败: {str(e)}")
 
 @router.post("/batch", response_model=TaskResponse)
-async def crawl_batch_urls(request: BatchCrawlRequest, background_tasks: BackgroundTasks):
+async def crawl_batch_urls(
+    request: BatchCrawlRequest,
+    background_tasks: BackgroundTasks,
+    crawler_service: CrawlerService = Depends(get_crawler_service),
+    task_service: TaskService = Depends(get_task_service),
+    job_queue: JobQueue = Depends(get_job_queue)
+):
     """
     批量爬取URLs (异步)
     """
@@ -72,14 +78,26 @@ async def crawl_batch_urls(request: BatchCrawlRequest, background_tasks: Backgro
         # 保存任务信息
         await task_service.create_task(task_info)
         
-        # 启动后台任务
-        background_tasks.add_task(
-            _process_batch_crawl,
-            task_id=task_id,
-            urls=[str(url) for url in request.urls],
-            config=request.config,
-            concurrent_limit=request.concurrent_limit
-        )
+        urls = [str(url) for url in request.urls]
+        
+        if settings.batch_executor == "queue":
+            # 交给独立 worker 进程执行
+            await job_queue.enqueue(task_id, {
+                "urls": urls,
+                "config": request.config.model_dump(mode="json"),
+                "concurrent_limit": request.concurrent_limit
+            })
+        else:
+            # 在 API 进程内作为后台任务执行
+            background_tasks.add_task(
+                _process_batch_crawl,
+                crawler_service=crawler_service,
+                task_service=task_service,
+                task_id=task_id,
+                urls=urls,
+                config=request.config,
+                concurrent_limit=request.concurrent_limit
+            )
         
         logger.info(f"批量爬取任务已创建: {task_id}, URLs数量: {len(request.urls)}")
         
@@ -93,8 +111,98 @@ async def crawl_batch_urls(request: BatchCrawlRequest, background_tasks: Backgro
         logger.error(f"创建批量爬取任务失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"创建任务失败: {str(e)}")
 
+@router.post("/batch/stream", response_model=TaskResponse)
+async def crawl_batch_stream(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    concurrent_limit: int = Query(default=5, ge=1, le=100, description="并发限制"),
+    config: Optional[str] = Query(default=None, description="爬取配置 (CrawlConfig 的 JSON 字符串)"),
+    crawler_service: CrawlerService = Depends(get_crawler_service),
+    task_service: TaskService = Depends(get_task_service),
+    job_queue: JobQueue = Depends(get_job_queue)
+):
+    """
+    流式批量爬取 (异步)
+    
+    请求体为换行分隔的URL列表 (text/plain)，或每行一个 JSON 字符串 / {"url": ...}
+    对象 (application/x-ndjson)。URL 边接收边校验、去重并写入磁盘，
+    适用于数万到上百万URL的任务。
+    """
+    try:
+        try:
+            crawl_config = CrawlConfig.model_validate_json(config) if config else CrawlConfig()
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"爬取配置无效: {str(e)}")
+        
+        task_id = str(uuid.uuid4())
+        spool = UrlSpool.for_task(task_id)
+        
+        try:
+            stats = await spool.ingest(request.stream(), max_urls=settings.batch_max_urls)
+        except ValueError as e:
+            spool.remove()
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception:
+            # 客户端断开等错误: 不保留写了一半的 URL 文件
+            spool.remove()
+            raise
+        
+        if not stats.accepted:
+            spool.remove()
+            raise HTTPException(status_code=400, detail=f"没有有效的URL: {'; '.join(stats.errors)}")
+        
+        task_info = TaskInfo(
+            task_id=task_id,
+            status=CrawlStatus.PENDING,
+            total_urls=stats.accepted,
+            created_at=datetime.now()
+        )
+        await task_service.create_task(task_info)
+        
+        if settings.batch_executor == "queue":
+            await job_queue.enqueue(task_id, {
+                "url_file": str(spool.path),
+                "total_urls": stats.accepted,
+                "config": crawl_config.model_dump(mode="json"),
+                "concurrent_limit": concurrent_limit
+            })
+        else:
+            background_tasks.add_task(
+                _process_batch_crawl,
+                crawler_service=crawler_service,
+                task_service=task_service,
+                task_id=task_id,
+                urls=spool,
+                config=crawl_config,
+                concurrent_limit=concurrent_limit,
+                total_urls=stats.accepted
+            )
+        
+        logger.info(
+            f"流式批量爬取任务已创建: {task_id}, URLs数量: {stats.accepted}, "
+            f"重复: {stats.duplicates}, 无效: {stats.invalid}"
+        )
+        
+        return TaskResponse(
+            success=True,
+            message=(
+                f"批量爬取任务已创建: 接收 {stats.accepted} 个URL, "
+                f"忽略重复 {stats.duplicates} 个, 无效 {stats.invalid} 个"
+            ),
+            data=task_info
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"创建流式批量爬取任务失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"创建任务失败: {str(e)}")
+
 @router.post("/extract", response_model=CrawlResponse)
-async def extract_structured_data(request: StructuredExtractionRequest):
+async def extract_structured_data(
+    request: StructuredExtractionRequest,
+    crawler_service: CrawlerService = Depends(get_crawler_service)
+):
     """
     结构化数据提取 - 简化版本
     """
@@ -114,18 +222,18 @@ async def extract_structured_data(request: StructuredExtractionRequest):
         
         logger.info(f"结构化数据提取完成: {request.url}, 耗时: {execution_time:.2f}s")
         
-        return CrawlResponse(
+        return FastJSONResponse(CrawlResponse(
             success=True,
             message="结构化数据提取成功",
             data=result
-        )
+        ))
         
     except Exception as e:
         logger.error(f"结构化数据提取失败: {request.url}, 错误: {str(e)}")
         raise HTTPException(status_code=500, detail=f"提取失败: {str(e)}")
 
 @router.get("/test-connection")
-async def test_crawler_connection():
+async def test_crawler_connection(crawler_service: CrawlerService = Depends(get_crawler_service)):
     """
     测试爬虫连接
     """
@@ -143,45 +251,97 @@ async def test_crawler_connection():
         logger.error(f"爬虫连接测试失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"连接测试失败: {str(e)}")
 
+@router.get("/pool/stats", response_model=APIResponse)
+async def get_browser_pool_stats(crawler_service: CrawlerService = Depends(get_crawler_service)):
+    """
+    获取浏览器池占用统计
+    """
+    try:
+        return APIResponse(
+            success=True,
+            message="获取浏览器池状态成功",
+            data=crawler_service.browser_pool.get_stats()
+        )
+        
+    except Exception as e:
+        logger.error(f"获取浏览器池状态失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取浏览器池状态失败: {str(e)}")
+
+@router.get("/cache/stats", response_model=APIResponse)
+async def get_crawl_cache_stats(crawler_service: CrawlerService = Depends(get_crawler_service)):
+    """
+    获取爬取缓存统计
+    """
+    try:
+        return APIResponse(
+            success=True,
+            message="获取缓存状态成功",
+            data=crawler_service.crawl_cache.get_stats()
+        )
+        
+    except Exception as e:
+        logger.error(f"获取缓存状态失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取缓存状态失败: {str(e)}")
+
+@router.delete("/cache", response_model=APIResponse)
+async def clear_crawl_cache(crawler_service: CrawlerService = Depends(get_crawler_service)):
+    """
+    清空爬取缓存
+    """
+    try:
+        cleared = await crawler_service.crawl_cache.clear()
+        return APIResponse(
+            success=True,
+            message=f"已清空 {cleared} 条缓存"
+        )
+        
+    except Exception as e:
+        logger.error(f"清空缓存失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"清空缓存失败: {str(e)}")
+
+@router.get("/queue/stats", response_model=APIResponse)
+async def get_job_queue_stats(job_queue: JobQueue = Depends(get_job_queue)):
+    """
+    获取批量任务队列统计
+    """
+    try:
+        stats = await job_queue.get_stats()
+        stats["executor"] = settings.batch_executor
+        return APIResponse(
+            success=True,
+            message="获取队列状态成功",
+            data=stats
+        )
+        
+    except Exception as e:
+        logger.error(f"获取队列状态失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取队列状态失败: {str(e)}")
+
 async def _process_batch_crawl(
+    crawler_service: CrawlerService,
+    task_service: TaskService,
     task_id: str, 
-    urls: List[str], 
+    urls: Union[List[str], UrlSpool], 
     config, 
-    concurrent_limit: int
+    concurrent_limit: int,
+    total_urls: Optional[int] = None
 ):
     """
-    处理批量爬取的后台任务
+    处理批量爬取的后台任务 (API 进程内执行)
     """
     try:
-        # 更新任务状态为运行中
-        await task_service.update_task_status(task_id, CrawlStatus.RUNNING)
-        
-        logger.info(f"开始处理批量爬取任务: {task_id}")
-        
-        # 执行批量爬取
-        results = await crawler_service.crawl_batch(
+        await run_batch_task(
+            crawler_service=crawler_service,
+            task_service=task_service,
+            task_id=task_id,
             urls=urls,
             config=config,
             concurrent_limit=concurrent_limit,
-            progress_callback=lambda completed, total: asyncio.create_task(
-                task_service.update_task_progress(task_id, completed, total)
-            )
+            total_urls=total_urls
         )
         
-        # 统计结果
-        completed_urls = sum(1 for r in results if r.success)
-        failed_urls = len(results) - completed_urls
-        
-        # 更新任务完成状态
-        await task_service.complete_task(
-            task_id=task_id,
-            results=results,
-            completed_urls=completed_urls,
-            failed_urls=failed_urls
-        )
-        
-        logger.info(f"批量爬取任务完成: {task_id}, 成功: {completed_urls}, 失败: {failed_urls}")
-        
     except Exception as e:
         logger.error(f"批量爬取任务失败: {task_id}, 错误: {str(e)}")
-        await task_service.fail_task(task_id, str(e)) 
\ No newline at end of file
+        await task_service.fail_task(task_id, str(e))
+        if isinstance(urls, UrlSpool):
+            urls.remove()
@@ -0,0 +1,127 @@
+"""
+结果内容相关的 API 路由
+
+按内容ID懒加载 markdown / HTML 正文，支持 HTTP Range 分段读取。
+"""
+
+import re
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
+
+from app.dependencies import get_result_store
+from app.services.result_store import ResultBlobStore
+from app.utils.logging import get_logger
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析单段 Range 请求头
+
+    Args:
+        range_header: Range 请求头，如 "bytes=0-1023" / "bytes=1024-" / "bytes=-512"
+        size: 内容总长度
+
+    Returns:
+        Optional[Tuple[int, int]]: 闭区间 (start, end)，无法满足时返回None
+    """
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None
+
+    start_str, end_str = match.groups()
+    if not start_str and not end_str:
+        return None
+
+    if not start_str:
+        # 后缀范围: 最后N个字节
+        length = int(end_str)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+
+    start = int(start_str)
+    end = int(end_str) if end_str else size - 1
+    if start >= size or start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+async def _blob_response(
+    blob_id: str,
+    request: Request,
+    result_store: ResultBlobStore,
+    media_type: str
+) -> Response:
+    """构造支持 Range 的内容响应"""
+    data = await result_store.get(blob_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="内容不存在")
+
+    size = len(data)
+    # 内容按哈希寻址，永不变化，可长期缓存
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{blob_id}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+
+    range_header = request.headers.get("range")
+    if not range_header:
+        return Response(content=data, media_type=media_type, headers=headers)
+
+    byte_range = _parse_range(range_header, size)
+    if byte_range is None:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return Response(
+        content=data[start:end + 1],
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+@router.get("/{blob_id}/markdown")
+async def get_result_markdown(
+    blob_id: str,
+    request: Request,
+    result_store: ResultBlobStore = Depends(get_result_store)
+):
+    """
+    获取 Markdown 内容
+
+    Args:
+        blob_id: 内容ID (CrawlResult.markdown_ref)
+
+    Returns:
+        Response: text/markdown 内容，支持 Range
+    """
+    return await _blob_response(blob_id, request, result_store, "text/markdown; charset=utf-8")
+
+
+@router.get("/{blob_id}/html")
+async def get_result_html(
+    blob_id: str,
+    request: Request,
+    result_store: ResultBlobStore = Depends(get_result_store)
+):
+    """
+    获取 HTML 内容
+
+    Args:
+        blob_id: 内容ID (CrawlResult.html_ref)
+
+    Returns:
+        Response: text/html 内容，支持 Range
+    """
+    return await _blob_response(blob_id, request, result_store, "text/html; charset=utf-8")
@@ -2,21 +2,39 @@
 任务管理相关的 API 路由
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import time
 
-from app.models.schemas import TaskResponse, TaskInfo, APIResponse
+from app.models.schemas import (
+    TaskResponse, TaskInfo, APIResponse, TaskListResponse, TaskPage, CrawlStatus, TaskProgress,
+    CrawlResult
+)
+from app.dependencies import get_task_service
+from app.services.task_events import TERMINAL_EVENTS
 from app.services.task_service import TaskService
+from app.services.task_store import FINISHED_STATUSES
 from app.utils.logging import get_logger
+from app.utils.serialization import FastJSONResponse
 
 router = APIRouter()
 logger = get_logger(__name__)
 
-# 初始化服务
-task_service = TaskService()
+# 事件流心跳间隔(秒)，防止代理断开空闲连接
+EVENT_HEARTBEAT_SECONDS = 15
+# 无事件时轮询存储进度的间隔 (秒)
+EVENT_POLL_SECONDS = 2
+# 结果分页大小
+RESULT_PAGE_DEFAULT = 100
+RESULT_PAGE_MAX = 1000
+# 可投影的结果字段
+RESULT_FIELDS = set(CrawlResult.model_fields)
 
 @router.get("/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: str):
+async def get_task(task_id: str, task_service: TaskService = Depends(get_task_service)):
     """
     获取任务信息
     
@@ -32,11 +50,16 @@ async def get_task(task_id: str):
         if not task:
             raise HTTPException(status_code=404, detail="任务不存在")
         
-        return TaskResponse(
+        message = "获取任务信息成功"
+        if task.results is None and task.result_count:
+            message += f"，结果较多未内联返回，请通过 /tasks/{task_id}/results 分页获取"
+        
+        # 直接返回响应对象，跳过 response_model 对大量结果的二次校验
+        return FastJSONResponse(TaskResponse(
             success=True,
-            message="获取任务信息成功",
+            message=message,
             data=task
-        )
+        ))
         
     except HTTPException:
         raise
@@ -44,22 +67,111 @@ async def get_task(task_id: str):
         logger.error(f"获取任务信息失败: {task_id}, 错误: {e}")
         raise HTTPException(status_code=500, detail=f"获取任务信息失败: {str(e)}")
 
-@router.get("/", response_model=APIResponse)
-async def get_all_tasks():
-    """获取所有任务"""
+@router.get("/{task_id}/results")
+async def get_task_results(
+    task_id: str,
+    offset: int = Query(default=0, ge=0, description="起始偏移 (上一页返回的 next_offset)"),
+    limit: int = Query(default=RESULT_PAGE_DEFAULT, ge=1, le=RESULT_PAGE_MAX, description="每页数量"),
+    fields: Optional[str] = Query(default=None, description="逗号分隔的返回字段，如 url,success,title,status_code"),
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    分页获取任务结果
+    
+    结果按写入顺序编号，偏移在任务运行中保持稳定，可用 next_offset 继续翻页；
+    每条结果附带 index (URL在批次中的序号)。
+    
+    Args:
+        task_id: 任务ID
+        offset: 起始偏移
+        limit: 每页数量
+        fields: 字段投影，不传时返回完整结果
+        
+    Returns:
+        Response: {"success", "message", "data": {"items", "offset", "next_offset", "has_more", ...}}
+    """
     try:
-        tasks = await task_service.get_all_tasks()
-        return APIResponse(
+        projection = _parse_result_fields(fields)
+        
+        progress = await task_service.get_progress(task_id)
+        if progress is None:
+            raise HTTPException(status_code=404, detail="任务不存在")
+        
+        entries = await task_service.get_results(task_id, offset, limit)
+        if projection is None:
+            items = [{"index": index, **result} for index, result in entries]
+        else:
+            items = [
+                {"index": index, **{k: result.get(k) for k in projection}}
+                for index, result in entries
+            ]
+        
+        next_offset = offset + len(items)
+        # 本页已满或任务仍在运行时可能还有更多结果
+        has_more = len(items) == limit or progress.status not in FINISHED_STATUSES
+        
+        return FastJSONResponse({
+            "success": True,
+            "message": "获取任务结果成功",
+            "data": {
+                "task_id": task_id,
+                "status": progress.status.value,
+                "result_count": max(progress.result_count, next_offset),
+                "offset": offset,
+                "limit": limit,
+                "next_offset": next_offset,
+                "has_more": has_more,
+                "items": items
+            }
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取任务结果失败: {task_id}, 错误: {e}")
+        raise HTTPException(status_code=500, detail=f"获取任务结果失败: {str(e)}")
+
+def _parse_result_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """解析字段投影参数，包含未知字段时返回 400"""
+    if not fields:
+        return None
+    projection = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in projection if f not in RESULT_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"未知的结果字段: {', '.join(unknown)}")
+    return projection or None
+
+@router.get("/", response_model=TaskListResponse)
+async def get_all_tasks(
+    status: Optional[CrawlStatus] = Query(default=None, description="按状态过滤"),
+    offset: int = Query(default=0, ge=0, description="偏移量"),
+    limit: int = Query(default=50, ge=1, le=500, description="每页数量"),
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    分页获取任务列表 (按创建时间倒序，不包含爬取结果)
+    
+    Args:
+        status: 按状态过滤
+        offset: 偏移量
+        limit: 每页数量
+        
+    Returns:
+        TaskListResponse: 任务列表响应
+    """
+    try:
+        tasks, total = await task_service.list_tasks(status=status, offset=offset, limit=limit)
+        return TaskListResponse(
             success=True,
             message="获取任务列表成功",
-            data=tasks
+            data=TaskPage(items=tasks, total=total, offset=offset, limit=limit)
         )
     except Exception as e:
         logger.error(f"获取任务列表失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取任务列表失败: {e}")
 
 @router.post("/{task_id}/cancel", response_model=APIResponse)
-async def cancel_task(task_id: str):
+async def cancel_task(task_id: str, task_service: TaskService = Depends(get_task_service)):
     """
     取消任务
     
@@ -87,7 +199,7 @@ async def cancel_task(task_id: str):
         raise HTTPException(status_code=500, detail=f"取消任务失败: {str(e)}")
 
 @router.delete("/{task_id}", response_model=APIResponse)
-async def delete_task(task_id: str):
+async def delete_task(task_id: str, task_service: TaskService = Depends(get_task_service)):
     """
     删除任务
     
@@ -115,7 +227,10 @@ async def delete_task(task_id: str):
         raise HTTPException(status_code=500, detail=f"删除任务失败: {str(e)}")
 
 @router.post("/cleanup", response_model=APIResponse)
-async def cleanup_tasks(max_age_hours: Optional[int] = 24):
+async def cleanup_tasks(
+    max_age_hours: Optional[int] = 24,
+    task_service: TaskService = Depends(get_task_service)
+):
     """
     清理已完成的旧任务
     
@@ -137,8 +252,8 @@ async def cleanup_tasks(max_age_hours: Optional[int] = 24):
         logger.error(f"清理任务失败: {e}")
         raise HTTPException(status_code=500, detail=f"清理任务失败: {str(e)}")
 
-@router.get("/{task_id}/progress")
-async def get_task_progress(task_id: str):
+@router.get("/{task_id}/progress", response_model=TaskProgress)
+async def get_task_progress(task_id: str, task_service: TaskService = Depends(get_task_service)):
     """
     获取任务进度 (轻量级接口，仅返回进度信息)
     
@@ -146,25 +261,131 @@ async def get_task_progress(task_id: str):
         task_id: 任务ID
         
     Returns:
-        Dict: 进度信息
+        TaskProgress: 进度快照
     """
     try:
-        task = await task_service.get_task(task_id)
+        progress = await task_service.get_progress(task_id)
         
-        if not task:
+        if not progress:
             raise HTTPException(status_code=404, detail="任务不存在")
         
-        return {
-            "task_id": task_id,
-            "status": task.status,
-            "progress": task.progress,
-            "completed_urls": task.completed_urls,
-            "total_urls": task.total_urls,
-            "failed_urls": task.failed_urls
-        }
+        return progress
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"获取任务进度失败: {task_id}, 错误: {e}")
-        raise HTTPException(status_code=500, detail=f"获取任务进度失败: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"获取任务进度失败: {str(e)}") 
+
+async def _iter_task_events(
+    task_service: TaskService,
+    task_id: str
+) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    订阅任务事件流
+    
+    先推送当前进度快照，之后推送实时事件，收到终态事件后结束。
+    空闲超过心跳间隔时产出 None，由调用方发送心跳。
+    没有事件时定期轮询存储中的进度，以覆盖在其他进程中执行的任务。
+    """
+    with task_service.events.subscribe(task_id) as queue:
+        progress = await task_service.get_progress(task_id)
+        if progress is None:
+            return
+        
+        snapshot = {"event": "progress", "data": progress.model_dump(mode="json")}
+        yield snapshot
+        if progress.status.value in TERMINAL_EVENTS:
+            yield {"event": progress.status.value, "data": snapshot["data"]}
+            return
+        
+        last_progress = snapshot["data"]
+        idle_since = time.monotonic()
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=EVENT_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                # 任务可能在 worker 进程中执行，本进程收不到事件，定期从存储读取进度
+                progress = await task_service.get_progress(task_id)
+                if progress is None:
+                    return
+                data = progress.model_dump(mode="json")
+                if data != last_progress:
+                    last_progress = data
+                    idle_since = time.monotonic()
+                    yield {"event": "progress", "data": data}
+                    if progress.status.value in TERMINAL_EVENTS:
+                        yield {"event": progress.status.value, "data": data}
+                        return
+                elif time.monotonic() - idle_since >= EVENT_HEARTBEAT_SECONDS:
+                    idle_since = time.monotonic()
+                    yield None
+                continue
+            
+            idle_since = time.monotonic()
+            if message["event"] == "progress":
+                last_progress = message["data"]
+            yield message
+            if message["event"] in TERMINAL_EVENTS:
+                return
+
+@router.get("/{task_id}/events")
+async def stream_task_events(
+    task_id: str,
+    request: Request,
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    以 Server-Sent Events 推送任务进度与单个URL完成事件
+    
+    事件类型: progress / result / completed / failed / cancelled
+    
+    Args:
+        task_id: 任务ID
+        
+    Returns:
+        StreamingResponse: text/event-stream 事件流
+    """
+    if not await task_service.get_progress(task_id):
+        raise HTTPException(status_code=404, detail="任务不存在")
+    
+    async def event_stream():
+        async for message in _iter_task_events(task_service, task_id):
+            if await request.is_disconnected():
+                break
+            if message is None:
+                yield ": keep-alive\n\n"
+                continue
+            data = json.dumps(message["data"], ensure_ascii=False)
+            yield f"event: {message['event']}\ndata: {data}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/{task_id}/ws")
+async def task_events_websocket(
+    websocket: WebSocket,
+    task_id: str,
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    以 WebSocket 推送任务事件，消息格式为 {"event": ..., "data": ...}
+    
+    Args:
+        task_id: 任务ID
+    """
+    await websocket.accept()
+    
+    if not await task_service.get_progress(task_id):
+        await websocket.close(code=4404, reason="任务不存在")
+        return
+    
+    try:
+        async for message in _iter_task_events(task_service, task_id):
+            await websocket.send_json(message or {"event": "ping", "data": None})
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.debug(f"任务事件订阅已断开: {task_id}")
@@ -0,0 +1,173 @@
+"""
+批量爬取任务执行
+
+API 进程内执行 (BackgroundTasks) 与独立 worker 进程执行共用同一套逻辑。
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Union
+
+from app.models.schemas import CrawlConfig, CrawlResult, CrawlStatus
+from app.services.crawler_service import CrawlerService
+from app.services.progress_aggregator import ProgressAggregator
+from app.services.stage_timing import TaskTimingStats
+from app.services.task_service import TaskService
+from app.services.url_ingest import UrlSpool, enumerate_urls
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+async def run_batch_task(
+    crawler_service: CrawlerService,
+    task_service: TaskService,
+    task_id: str,
+    urls: Union[List[str], UrlSpool],
+    config: CrawlConfig,
+    concurrent_limit: int,
+    total_urls: Optional[int] = None
+):
+    """
+    执行批量爬取任务
+
+    每个URL的结果完成后立即写入结果存储 (task_service.results)，内存中不保留整批结果；
+    任务被重新执行时 (如 worker 崩溃后重新领取) 跳过已写入结果的URL。
+
+    Args:
+        crawler_service: 爬虫服务
+        task_service: 任务服务
+        task_id: 任务ID
+        urls: URL列表，或流式接收后写入磁盘的 URL 文件
+        config: 爬取配置
+        concurrent_limit: 并发限制
+        total_urls: URL总数 (urls 为 URL 文件时必须提供)
+    """
+    spool = urls if isinstance(urls, UrlSpool) else None
+    total = total_urls if total_urls is not None else len(urls)
+
+    if config.deep_crawl:
+        # 深度爬取的页面集合是动态发现的，无法按序号续跑，总是完整重跑
+        await task_service.results.delete(task_id)
+        done: Dict[int, bool] = {}
+    else:
+        done = await task_service.results.completed_indices(task_id)
+
+    succeeded = sum(1 for success in done.values() if success)
+    completed = len(done)
+    result_count = len(done)
+
+    # 各阶段耗时按任务汇总为 p50/p95 (续跑时只统计本次执行的URL)
+    timing_stats = TaskTimingStats()
+    
+    # 进度在内存中合并，按间隔写入任务存储
+    progress = ProgressAggregator(task_service, task_id, total)
+
+    # 结果按完成顺序串行写入，不阻塞爬取
+    writes: asyncio.Queue = asyncio.Queue()
+
+    async def writer():
+        nonlocal result_count
+        while True:
+            item = await writes.get()
+            try:
+                if item is None:
+                    return
+                index, result, progress_total, done_count, failed_count = item
+                write_start = time.perf_counter()
+                result_count = await task_service.append_result(task_id, index, result)
+                timing_stats.add("serialization", time.perf_counter() - write_start)
+                # 进度在结果写入后更新，result_count 之内的结果均可读取
+                progress.update(done_count, failed_count, progress_total, result_count)
+            except Exception as e:
+                logger.error(f"写入结果失败: {task_id}, 错误: {e}")
+            finally:
+                writes.task_done()
+
+    writer_task = asyncio.create_task(writer())
+    progress.start()
+
+    try:
+        # 更新任务状态为运行中 (任务在排队期间已被取消时不再执行)
+        if not await task_service.update_task_status(task_id, CrawlStatus.RUNNING):
+            logger.info(f"任务已取消或不存在，跳过执行: {task_id}")
+            return
+
+        if done:
+            logger.info(f"续跑批量爬取任务: {task_id}, 已完成 {len(done)}/{total}")
+        else:
+            logger.info(f"开始处理批量爬取任务: {task_id}")
+
+        def record(index: int, result: CrawlResult, progress_total: int):
+            nonlocal completed, succeeded
+            completed += 1
+            if result.success:
+                succeeded += 1
+            timing_stats.add_timings((result.metadata or {}).get("timings"))
+            writes.put_nowait((index, result, progress_total, completed, completed - succeeded))
+            # 推送单个URL完成事件
+            task_service.events.publish_result(task_id, result, completed, progress_total)
+
+        def on_url_result(index: int, result: CrawlResult):
+            record(index, result, total)
+
+        def on_deep_progress(_completed: int, discovered: int, result: CrawlResult):
+            # 深度爬取的结果按完成顺序编号
+            record(completed, result, discovered)
+
+        # 在独立的 asyncio.Task 中执行批量爬取，取消任务时中止该 Task:
+        # 未开始的URL不再调度，进行中的页面加载被中断，浏览器槽位随之归还
+        if config.deep_crawl:
+            seeds = await spool.read_all() if spool else urls
+            # 页面结果经 record 写入结果存储，不在内存中累积
+            crawl = asyncio.create_task(crawler_service.deep_crawl(
+                urls=seeds,
+                config=config,
+                concurrent_limit=concurrent_limit,
+                progress_callback=on_deep_progress
+            ))
+        else:
+            # URL 经有界队列逐个送入爬虫，不一次性为所有URL创建协程
+            source = spool.iter_urls(skip=done) if spool else enumerate_urls(urls, skip=done)
+            crawl = asyncio.create_task(crawler_service.crawl_stream(
+                source,
+                config=config,
+                concurrent_limit=concurrent_limit,
+                on_result=on_url_result
+            ))
+        task_service.register_runner(task_id, crawl)
+
+        try:
+            await crawl
+        except asyncio.CancelledError:
+            # 非用户取消 (如进程关闭) 时继续向上传播
+            if not await task_service.is_cancelled(task_id):
+                raise
+            logger.info(f"批量爬取任务已中止: {task_id}, 保留已完成的 {completed} 个结果")
+
+        # 等待剩余结果写入
+        writes.put_nowait(None)
+        await writer_task
+        await progress.close()
+
+        # 更新任务完成状态 (已取消的任务只保存部分结果，取消可能发生在其他进程)
+        marked_completed = await task_service.complete_task(
+            task_id=task_id,
+            completed_urls=succeeded,
+            failed_urls=completed - succeeded,
+            result_count=result_count,
+            timing_stats=timing_stats.summary()
+        )
+
+        if spool:
+            spool.remove()
+
+        if marked_completed:
+            logger.info(f"批量爬取任务完成: {task_id}, 成功: {succeeded}, 失败: {completed - succeeded}")
+
+    finally:
+        if not writer_task.done():
+            writer_task.cancel()
+        progress.cancel()
+        # 结果已写完 (或本次执行已中止)，释放结果存储为该任务缓存的写入位置
+        task_service.results.release(task_id)
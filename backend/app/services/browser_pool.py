@@ -0,0 +1,310 @@
+"""
+浏览器池服务
+
+维护一组长期存活的 AsyncWebCrawler 实例，避免每个URL都启动/关闭一次 Chromium。
+由应用生命周期管理 (startup 时启动，shutdown 时关闭)。
+"""
+
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from crawl4ai import AsyncWebCrawler
+
+from app.config import settings
+from app.services.crawl_config_builder import build_browser_config
+from app.services.stage_timing import instrument_crawler
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 替换浏览器启动失败时的尝试次数与指数退避 (秒)
+LAUNCH_ATTEMPTS = 3
+LAUNCH_BACKOFF_BASE = 1.0
+LAUNCH_BACKOFF_MAX = 30.0
+
+
+class PooledBrowser:
+    """池中的单个浏览器实例及其使用统计"""
+
+    def __init__(self, crawler: AsyncWebCrawler):
+        self.browser_id = uuid.uuid4().hex[:8]
+        self.crawler = crawler
+        self.active_pages = 0
+        self.pages_served = 0
+        self.retiring = False
+        self.created_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "browser_id": self.browser_id,
+            "active_pages": self.active_pages,
+            "pages_served": self.pages_served,
+            "retiring": self.retiring,
+            "age_seconds": round(time.monotonic() - self.created_at, 1),
+        }
+
+
+class BrowserPool:
+    """
+    浏览器池
+
+    - pool_size: 同时保持的浏览器数量
+    - max_pages_per_browser: 单个浏览器允许的并发页面数
+    - recycle_after: 单个浏览器处理N个页面后回收重启，防止内存泄漏累积
+
+    替换浏览器启动失败时按指数退避重试；仍失败时池中浏览器暂时减少，
+    之后的 acquire 会补充启动，池中没有浏览器且没有正在启动的浏览器时抛出异常而不是无限等待。
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        max_pages_per_browser: Optional[int] = None,
+        recycle_after: Optional[int] = None,
+    ):
+        self.pool_size = max(1, pool_size or settings.browser_pool_size)
+        self.max_pages_per_browser = max(1, max_pages_per_browser or settings.browser_max_pages)
+        self.recycle_after = max(1, recycle_after or settings.browser_recycle_after)
+
+        self._browsers: List[PooledBrowser] = []
+        self._condition = asyncio.Condition()
+        self._start_lock = asyncio.Lock()
+        self._started = False
+        self._closing = False
+        self._waiting = 0
+        # 正在启动的替换浏览器数量
+        self._pending_launches = 0
+        self._launch_tasks: Set[asyncio.Task] = set()
+        self._launch_count = 0
+        self._recycle_count = 0
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def _launch(self) -> PooledBrowser:
+        """启动一个新的浏览器实例"""
+        crawler = AsyncWebCrawler(config=build_browser_config())
+        await crawler.start()
+        instrument_crawler(crawler)
+        self._launch_count += 1
+        browser = PooledBrowser(crawler)
+        logger.info(f"浏览器已启动: {browser.browser_id}")
+        return browser
+
+    async def _shutdown_browser(self, browser: PooledBrowser):
+        """关闭浏览器实例，忽略关闭过程中的异常"""
+        try:
+            await browser.crawler.close()
+            logger.info(f"浏览器已关闭: {browser.browser_id}, 共处理 {browser.pages_served} 个页面")
+        except Exception as e:
+            logger.warning(f"关闭浏览器失败: {browser.browser_id}, 错误: {e}")
+
+    async def start(self):
+        """启动浏览器池"""
+        async with self._start_lock:
+            if self._started:
+                return
+
+            self._closing = False
+            browsers = await asyncio.gather(*[self._launch() for _ in range(self.pool_size)])
+            async with self._condition:
+                self._browsers.extend(browsers)
+                self._started = True
+                self._condition.notify_all()
+
+            logger.info(
+                f"浏览器池已启动: {self.pool_size} 个浏览器, "
+                f"每个浏览器最多 {self.max_pages_per_browser} 个页面"
+            )
+
+    async def close(self):
+        """关闭浏览器池中的所有浏览器"""
+        async with self._start_lock:
+            if not self._started:
+                return
+
+            async with self._condition:
+                self._closing = True
+                browsers = list(self._browsers)
+                self._browsers.clear()
+                self._started = False
+                self._condition.notify_all()
+
+            for task in list(self._launch_tasks):
+                task.cancel()
+            await asyncio.gather(*[self._shutdown_browser(b) for b in browsers])
+            logger.info("浏览器池已关闭")
+
+    async def _checkout(self) -> PooledBrowser:
+        """取出一个有空闲页面槽位的浏览器 (选择负载最低的)"""
+        if not self._started:
+            await self.start()
+
+        async with self._condition:
+            self._waiting += 1
+            replenished = False
+            try:
+                while True:
+                    if self._closing:
+                        raise RuntimeError("浏览器池已关闭")
+
+                    candidates = [
+                        b for b in self._browsers
+                        if not b.retiring and b.active_pages < self.max_pages_per_browser
+                    ]
+                    if candidates:
+                        browser = min(candidates, key=lambda b: b.active_pages)
+                        browser.active_pages += 1
+                        browser.pages_served += 1
+                        if browser.pages_served >= self.recycle_after:
+                            browser.retiring = True
+                        return browser
+
+                    if not replenished and len(self._browsers) + self._pending_launches < self.pool_size:
+                        # 之前的替换浏览器启动失败，补充启动一个
+                        replenished = True
+                        self._spawn_replacement()
+                    if not self._browsers and not self._pending_launches:
+                        raise RuntimeError("浏览器池中没有可用的浏览器: 启动浏览器失败")
+
+                    await self._condition.wait()
+            finally:
+                self._waiting -= 1
+
+    async def _checkin(self, browser: PooledBrowser):
+        """归还页面槽位，必要时回收浏览器"""
+        async with self._condition:
+            browser.active_pages -= 1
+            should_recycle = (
+                browser.retiring
+                and browser.active_pages == 0
+                and browser in self._browsers
+                and not self._closing
+            )
+            if should_recycle:
+                self._browsers.remove(browser)
+                self._pending_launches += 1
+            self._condition.notify_all()
+
+        if should_recycle:
+            await self._recycle(browser)
+
+    async def _recycle(self, browser: PooledBrowser):
+        """关闭已达到阈值的浏览器并启动替换实例 (调用前已从池中移除并计入 _pending_launches)"""
+        logger.info(f"回收浏览器: {browser.browser_id}, 已处理 {browser.pages_served} 个页面")
+        await self._shutdown_browser(browser)
+        self._recycle_count += 1
+        await self._launch_replacement()
+
+    def _spawn_replacement(self):
+        """在后台启动一个替换浏览器 (需在 _condition 内调用)"""
+        self._pending_launches += 1
+        task = asyncio.create_task(self._launch_replacement())
+        self._launch_tasks.add(task)
+        task.add_done_callback(self._launch_tasks.discard)
+
+    async def _launch_replacement(self):
+        """
+        启动替换浏览器并放回池中，失败时按指数退避重试
+
+        调用前已计入 _pending_launches，结束时 (无论成败) 扣除并唤醒等待者。
+        """
+        replacement: Optional[PooledBrowser] = None
+        try:
+            delay = LAUNCH_BACKOFF_BASE
+            for attempt in range(1, LAUNCH_ATTEMPTS + 1):
+                if self._closing:
+                    break
+                try:
+                    replacement = await self._launch()
+                    break
+                except Exception as e:
+                    logger.error(f"启动替换浏览器失败 (第 {attempt}/{LAUNCH_ATTEMPTS} 次): {e}")
+                    if attempt < LAUNCH_ATTEMPTS:
+                        await asyncio.sleep(delay)
+                        delay = min(LAUNCH_BACKOFF_MAX, delay * 2)
+        finally:
+            async with self._condition:
+                self._pending_launches -= 1
+                closing = self._closing
+                if replacement is not None and not closing:
+                    self._browsers.append(replacement)
+                self._condition.notify_all()
+
+        if replacement is not None and closing:
+            await self._shutdown_browser(replacement)
+
+    async def request_recycle(self) -> Optional[str]:
+        """
+        提前回收处理页面最多的浏览器 (内存压力过高时调用)
+
+        浏览器空闲时立即回收，否则标记为待回收，最后一个页面归还时回收。
+
+        Returns:
+            Optional[str]: 被回收的浏览器ID，没有可回收的浏览器时返回None
+        """
+        async with self._condition:
+            candidates = [b for b in self._browsers if not b.retiring]
+            if not candidates or self._closing:
+                return None
+            browser = max(candidates, key=lambda b: b.pages_served)
+            browser.retiring = True
+            idle = browser.active_pages == 0
+            if idle:
+                self._browsers.remove(browser)
+                self._pending_launches += 1
+
+        if idle:
+            await self._recycle(browser)
+        return browser.browser_id
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[AsyncWebCrawler]:
+        """
+        获取一个浏览器页面槽位
+
+        用法:
+            async with browser_pool.acquire() as crawler:
+                result = await crawler.arun(url=url)
+        """
+        browser = await self._checkout()
+        try:
+            yield browser.crawler
+        except asyncio.CancelledError:
+            # 页面加载被中途取消时可能遗留未关闭的页面，标记该浏览器待回收以释放资源
+            browser.retiring = True
+            raise
+        finally:
+            # 取消过程中也要保证槽位归还
+            await asyncio.shield(self._checkin(browser))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取浏览器池占用统计
+
+        Returns:
+            Dict[str, Any]: 池状态信息
+        """
+        active_pages = sum(b.active_pages for b in self._browsers)
+        capacity = sum(
+            self.max_pages_per_browser for b in self._browsers if not b.retiring
+        )
+        return {
+            "started": self._started,
+            "pool_size": self.pool_size,
+            "max_pages_per_browser": self.max_pages_per_browser,
+            "recycle_after": self.recycle_after,
+            "browsers": len(self._browsers),
+            "capacity": capacity,
+            "active_pages": active_pages,
+            "available_pages": max(0, capacity - active_pages),
+            "waiting": self._waiting,
+            "pending_launches": self._pending_launches,
+            "launch_count": self._launch_count,
+            "recycle_count": self._recycle_count,
+            "details": [b.to_dict() for b in self._browsers],
+        }
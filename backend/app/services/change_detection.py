@@ -0,0 +1,314 @@
+"""
+内容指纹与变化检测
+
+每次成功爬取后计算 Markdown 的内容指纹，并与同一URL (相同内容配置) 上次爬取的指纹比较:
+- content_hash: 规范化 (小写、合并空白) 后的 SHA-256，相同即内容未变化
+- simhash: 64位 SimHash (3词 shingle，中日文按字切分)，汉明距离不超过
+  CHANGE_SIMHASH_DISTANCE 时视为近似重复 (只有少量改动)
+
+变化状态记录在 result.metadata["change"]: new / unchanged / similar / changed。
+指纹与响应中的 ETag / Last-Modified 保存在 SQLite 中，增量重爬时用于条件请求。
+"""
+
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.config import settings
+from app.models.schemas import CrawlConfig
+from app.services.crawl_cache import cache_key
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 中日文逐字作为词，其余按单词切分
+TOKEN_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff]|\w+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+SHINGLE_SIZE = 3
+SIMHASH_BITS = 64
+
+NEW = "new"
+UNCHANGED = "unchanged"
+SIMILAR = "similar"
+CHANGED = "changed"
+
+
+def normalize_markdown(markdown: str) -> str:
+    """规范化 Markdown: 小写并合并连续空白，忽略排版上的差异"""
+    return WHITESPACE_PATTERN.sub(" ", markdown.lower()).strip()
+
+
+def content_hash(normalized: str) -> str:
+    """规范化内容的哈希"""
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+def simhash(normalized: str) -> int:
+    """
+    计算 64 位 SimHash
+
+    Args:
+        normalized: 规范化后的内容
+
+    Returns:
+        int: SimHash 值
+    """
+    tokens = TOKEN_PATTERN.findall(normalized)
+    if len(tokens) >= SHINGLE_SIZE:
+        features = Counter(
+            " ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)
+        )
+    else:
+        features = Counter(tokens)
+    if not features:
+        return 0
+
+    # 只累加每个特征哈希中为 1 的位，某位的权重超过总权重的一半时该位为 1
+    weights = [0] * SIMHASH_BITS
+    total = 0
+    for feature, weight in features.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        total += weight
+        while h:
+            low = h & -h
+            weights[low.bit_length() - 1] += weight
+            h ^= low
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight * 2 > total)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def fingerprint(markdown: str) -> Dict[str, Any]:
+    """
+    计算内容指纹
+
+    Args:
+        markdown: Markdown 内容
+
+    Returns:
+        Dict[str, Any]: {"content_hash", "simhash"}
+    """
+    normalized = normalize_markdown(markdown or "")
+    return {"content_hash": content_hash(normalized), "simhash": simhash(normalized)}
+
+
+def classify(current: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    与上次爬取的指纹比较
+
+    Args:
+        current: 本次指纹
+        previous: 上次保存的指纹，没有时为None
+
+    Returns:
+        Dict[str, Any]: 变化信息 (写入 result.metadata["change"])
+    """
+    change: Dict[str, Any] = {
+        "status": NEW,
+        "content_hash": current["content_hash"],
+        "simhash": f"{current['simhash']:016x}",
+    }
+    if previous is None:
+        return change
+
+    change["previous_crawled_at"] = previous["crawled_at"]
+    if previous["content_hash"] == current["content_hash"]:
+        change["status"] = UNCHANGED
+        change["distance"] = 0
+        return change
+
+    distance = hamming_distance(previous["simhash"], current["simhash"])
+    change["distance"] = distance
+    change["status"] = SIMILAR if distance <= settings.change_simhash_distance else CHANGED
+    return change
+
+
+def response_validators(headers: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """从响应头中取出 ETag / Last-Modified (忽略大小写)"""
+    validators = {}
+    for name, value in (headers or {}).items():
+        lowered = str(name).lower()
+        if lowered == "etag":
+            validators["etag"] = str(value)
+        elif lowered == "last-modified":
+            validators["last_modified"] = str(value)
+    return validators
+
+
+class FingerprintStore:
+    """
+    内容指纹存储 (SQLite)
+
+    以 "规范化URL + 内容配置" 为键 (与爬取缓存相同)，只保留最近一次爬取的指纹。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS content_fingerprints (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            simhash TEXT NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            crawled_at REAL NOT NULL,
+            changed_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or settings.fingerprint_db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, fn, *args):
+        with self._conn_lock:
+            return fn(self._connect(), *args)
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(self._execute, fn, *args)
+
+    async def get(self, url: str, config: CrawlConfig) -> Optional[Dict[str, Any]]:
+        """
+        读取上次爬取的指纹
+
+        Args:
+            url: URL
+            config: 爬取配置
+
+        Returns:
+            Optional[Dict[str, Any]]: 指纹记录，没有时返回None
+        """
+        key = cache_key(url, config)
+
+        def _get(conn: sqlite3.Connection):
+            return conn.execute(
+                "SELECT content_hash, simhash, etag, last_modified, crawled_at, changed_at "
+                "FROM content_fingerprints WHERE key = ?", (key,)
+            ).fetchone()
+
+        row = await self._run(_get)
+        if row is None:
+            return None
+        return {
+            "content_hash": row[0],
+            "simhash": int(row[1], 16),
+            "etag": row[2],
+            "last_modified": row[3],
+            "crawled_at": row[4],
+            "changed_at": row[5],
+        }
+
+    async def put(
+        self,
+        url: str,
+        config: CrawlConfig,
+        current: Dict[str, Any],
+        validators: Dict[str, str],
+        changed: bool
+    ):
+        """
+        保存本次爬取的指纹
+
+        Args:
+            url: URL
+            config: 爬取配置
+            current: 本次指纹
+            validators: 响应的 ETag / Last-Modified
+            changed: 内容是否变化 (未变化时保留原来的 changed_at)
+        """
+        key = cache_key(url, config)
+        now = time.time()
+
+        def _put(conn: sqlite3.Connection):
+            conn.execute(
+                "INSERT INTO content_fingerprints "
+                "(key, url, content_hash, simhash, etag, last_modified, crawled_at, changed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET content_hash = excluded.content_hash, "
+                "simhash = excluded.simhash, etag = excluded.etag, last_modified = excluded.last_modified, "
+                "crawled_at = excluded.crawled_at, "
+                "changed_at = CASE WHEN ? THEN excluded.changed_at ELSE content_fingerprints.changed_at END",
+                (key, url, current["content_hash"], f"{current['simhash']:016x}",
+                 validators.get("etag"), validators.get("last_modified"), now, now, int(changed)),
+            )
+
+        await self._run(_put)
+
+    async def touch(self, url: str, config: CrawlConfig):
+        """条件请求确认未变化时只更新爬取时间"""
+        key = cache_key(url, config)
+        now = time.time()
+
+        def _touch(conn: sqlite3.Connection):
+            conn.execute("UPDATE content_fingerprints SET crawled_at = ? WHERE key = ?", (now, key))
+
+        await self._run(_touch)
+
+    async def not_modified(self, url: str, previous: Dict[str, Any]) -> bool:
+        """
+        用上次的 ETag / Last-Modified 发送条件请求
+
+        Args:
+            url: URL
+            previous: 上次保存的指纹
+
+        Returns:
+            bool: 服务器返回 304 (内容未变化) 时为True；没有校验信息或请求失败时为False
+        """
+        headers = {}
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+        if not headers:
+            return False
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.conditional_request_timeout,
+                follow_redirects=True,
+                headers={"User-Agent": settings.user_agent},
+            )
+        try:
+            # 只读取状态码，内容已变化时不下载响应体
+            async with self._client.stream("GET", url, headers=headers) as response:
+                return response.status_code == 304
+        except httpx.HTTPError as e:
+            logger.debug("条件请求失败: %s, 错误: %s", url, e)
+            return False
+
+    async def close(self):
+        """关闭指纹数据库与 HTTP 客户端"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+        def _close():
+            with self._conn_lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+        await asyncio.to_thread(_close)
@@ -0,0 +1,331 @@
+"""
+爬取结果缓存
+
+按 "规范化URL + 影响内容的配置字段哈希" 缓存成功的爬取结果，
+支持 TTL、按容量的 LRU 淘汰和磁盘持久化 (SQLite)，并遵循 CrawlConfig.cache_mode。
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.config import settings
+from app.models.schemas import CacheMode, CrawlConfig, CrawlResult
+from app.utils.logging import get_logger
+from app.utils.metrics import CACHE_LOOKUPS
+
+logger = get_logger(__name__)
+
+CACHE_HITS = CACHE_LOOKUPS.labels("hit")
+CACHE_MISSES = CACHE_LOOKUPS.labels("miss")
+
+# 会影响爬取内容的配置字段 (超时、代理、缓存模式等不影响内容，不参与缓存键)
+CONTENT_FIELDS = (
+    "word_count_threshold",
+    "wait_until",
+    "wait_for",
+    "delay_before_return_html",
+    "css_selector",
+    "excluded_tags",
+    "excluded_selector",
+    "only_text",
+    "screenshot",
+    "pdf",
+    "exclude_external_images",
+    "exclude_external_links",
+    "exclude_social_media_links",
+    "exclude_domains",
+    "js_code",
+    "simulate_user",
+    "override_navigator",
+    "magic",
+    "experimental",
+)
+
+READABLE_MODES = {CacheMode.ENABLED, CacheMode.READ_ONLY}
+WRITABLE_MODES = {CacheMode.ENABLED, CacheMode.WRITE_ONLY}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化URL: 小写 scheme/host、去掉默认端口和片段、查询参数排序
+
+    Args:
+        url: 原始URL
+
+    Returns:
+        str: 规范化后的URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def config_fingerprint(config: CrawlConfig) -> str:
+    """
+    计算影响内容的配置字段哈希
+
+    Args:
+        config: 爬取配置
+
+    Returns:
+        str: 配置指纹
+    """
+    fields = config.model_dump(include=set(CONTENT_FIELDS), mode="json")
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(url: str, config: CrawlConfig) -> str:
+    """生成缓存键"""
+    raw = f"{normalize_url(url)}|{config_fingerprint(config)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CrawlCache:
+    """
+    两级爬取缓存
+
+    - 内存层: 少量热点条目的 LRU
+    - 磁盘层: SQLite 持久化，总容量超限时按最近访问时间淘汰
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS crawl_cache (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL,
+            payload BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_crawl_cache_accessed ON crawl_cache(accessed_at);
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        memory_entries: Optional[int] = None,
+    ):
+        self.db_path = Path(db_path or settings.crawl_cache_path)
+        self.ttl_seconds = ttl_seconds or settings.crawl_cache_ttl
+        self.max_bytes = max_bytes or settings.crawl_cache_max_bytes
+        self.memory_entries = memory_entries or settings.crawl_cache_memory_entries
+
+        self._memory: "OrderedDict[str, Tuple[float, CrawlResult]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def can_read(mode: CacheMode) -> bool:
+        return mode in READABLE_MODES
+
+    @staticmethod
+    def can_write(mode: CacheMode) -> bool:
+        return mode in WRITABLE_MODES
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            conn.execute("DELETE FROM crawl_cache WHERE expires_at < ?", (time.time(),))
+            self._total_bytes = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM crawl_cache"
+            ).fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, fn, *args):
+        with self._conn_lock:
+            return fn(self._connect(), *args)
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(self._execute, fn, *args)
+
+    def _remember(self, key: str, expires_at: float, result: CrawlResult):
+        self._memory[key] = (expires_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def _mark_hit(result: CrawlResult) -> CrawlResult:
+        hit = result.model_copy(deep=True)
+        hit.metadata = {**(hit.metadata or {}), "cache_hit": True}
+        return hit
+
+    async def get(self, url: str, config: CrawlConfig) -> Optional[CrawlResult]:
+        """
+        读取缓存
+
+        Args:
+            url: URL
+            config: 爬取配置
+
+        Returns:
+            Optional[CrawlResult]: 未过期的缓存结果，未命中返回None
+        """
+        key = cache_key(url, config)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                CACHE_HITS.inc()
+                return self._mark_hit(result)
+            del self._memory[key]
+
+        def _get(conn: sqlite3.Connection):
+            row = conn.execute(
+                "SELECT expires_at, size, payload FROM crawl_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] <= now:
+                conn.execute("DELETE FROM crawl_cache WHERE key = ?", (key,))
+                self._total_bytes -= row[1]
+                return None
+            conn.execute("UPDATE crawl_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0], gzip.decompress(row[2])
+
+        row = await self._run(_get)
+        if row is None:
+            self.misses += 1
+            CACHE_MISSES.inc()
+            return None
+
+        expires_at, payload = row
+        result = CrawlResult.model_validate_json(payload)
+        self._remember(key, expires_at, result)
+        self.hits += 1
+        CACHE_HITS.inc()
+        return self._mark_hit(result)
+
+    async def put(self, url: str, config: CrawlConfig, result: CrawlResult):
+        """
+        写入缓存 (仅缓存成功结果)
+
+        Args:
+            url: URL
+            config: 爬取配置
+            result: 爬取结果
+        """
+        if not result.success:
+            return
+
+        key = cache_key(url, config)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        payload = gzip.compress(result.model_dump_json().encode("utf-8"), compresslevel=6)
+        size = len(payload)
+
+        def _put(conn: sqlite3.Connection):
+            old = conn.execute("SELECT size FROM crawl_cache WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO crawl_cache (key, url, expires_at, accessed_at, size, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, expires_at, now, size, payload),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            return self._evict(conn)
+
+        # 内存层只在事件循环中修改，淘汰的键在这里移除
+        for victim in await self._run(_put):
+            self._memory.pop(victim, None)
+        self._remember(key, expires_at, result.model_copy(deep=True))
+        self.writes += 1
+
+    def _evict(self, conn: sqlite3.Connection) -> List[str]:
+        """
+        总容量超限时淘汰过期及最久未访问的条目，直到低于容量的90%
+
+        Returns:
+            List[str]: 按容量淘汰的键 (由调用方在事件循环中从内存层移除)
+        """
+        if self._total_bytes <= self.max_bytes:
+            return []
+
+        conn.execute("DELETE FROM crawl_cache WHERE expires_at < ?", (time.time(),))
+        target = int(self.max_bytes * 0.9)
+        victims: List[str] = []
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM crawl_cache").fetchone()[0]
+        if total > target:
+            rows = conn.execute("SELECT key, size FROM crawl_cache ORDER BY accessed_at ASC").fetchall()
+            for key, size in rows:
+                if total <= target:
+                    break
+                victims.append(key)
+                total -= size
+            conn.executemany("DELETE FROM crawl_cache WHERE key = ?", [(key,) for key in victims])
+            self.evictions += len(victims)
+        self._total_bytes = total
+        return victims
+
+    async def clear(self) -> int:
+        """
+        清空缓存
+
+        Returns:
+            int: 删除的条目数量
+        """
+        def _clear(conn: sqlite3.Connection):
+            count = conn.execute("DELETE FROM crawl_cache").rowcount
+            self._total_bytes = 0
+            return count
+
+        self._memory.clear()
+        return await self._run(_clear)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    async def close(self):
+        """关闭缓存数据库"""
+        def _close():
+            with self._conn_lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+        await asyncio.to_thread(_close)
@@ -0,0 +1,96 @@
+"""
+CrawlConfig 到 crawl4ai 配置的转换层
+
+将 API 层的 CrawlConfig 翻译为 crawl4ai 的 BrowserConfig / CrawlerRunConfig，
+并按配置内容缓存转换结果，批量任务中相同配置不会为每个URL重复构建。
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from crawl4ai import BrowserConfig, CacheMode as C4ACacheMode, CrawlerRunConfig
+from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+
+from app.config import settings
+from app.models.schemas import CrawlConfig
+
+# 不属于单页运行配置的字段 (缓存与变化检测由服务端自行处理，深度爬取由爬虫服务调度)
+NON_RUN_FIELDS = {
+    "cache_mode", "deep_crawl", "crawl_depth", "crawl_strategy", "change_detection", "skip_unchanged"
+}
+
+
+def build_browser_config() -> BrowserConfig:
+    """
+    构建浏览器池使用的浏览器配置
+
+    Returns:
+        BrowserConfig: crawl4ai 浏览器配置
+    """
+    return BrowserConfig(
+        headless=True,
+        user_agent=settings.user_agent,
+        verbose=False,
+    )
+
+
+def _proxy_config(config: CrawlConfig) -> Optional[Dict[str, Any]]:
+    if not config.proxy_server:
+        return None
+    proxy = {"server": config.proxy_server}
+    if config.proxy_username:
+        proxy["username"] = config.proxy_username
+    if config.proxy_password:
+        proxy["password"] = config.proxy_password
+    return proxy
+
+
+@lru_cache(maxsize=128)
+def _build_run_config(config_json: str) -> CrawlerRunConfig:
+    config = CrawlConfig.model_validate_json(config_json)
+    return CrawlerRunConfig(
+        # 服务端已有自己的结果缓存，crawl4ai 内置缓存始终绕过
+        cache_mode=C4ACacheMode.BYPASS,
+        # 内容处理
+        word_count_threshold=config.word_count_threshold,
+        css_selector=config.css_selector,
+        excluded_tags=list(config.excluded_tags),
+        excluded_selector=config.excluded_selector,
+        only_text=config.only_text,
+        remove_overlay_elements=True,
+        markdown_generator=DefaultMarkdownGenerator(options={"escape_dot": False}),
+        # 页面交互
+        wait_until=config.wait_until,
+        page_timeout=config.page_timeout,
+        wait_for=config.wait_for,
+        delay_before_return_html=config.delay_before_return_html,
+        js_code=config.js_code,
+        simulate_user=config.simulate_user,
+        override_navigator=config.override_navigator,
+        magic=config.magic,
+        # 媒体
+        screenshot=config.screenshot,
+        pdf=config.pdf,
+        exclude_external_images=config.exclude_external_images,
+        # 链接过滤
+        exclude_external_links=config.exclude_external_links,
+        exclude_social_media_links=config.exclude_social_media_links,
+        exclude_domains=list(config.exclude_domains),
+        # 代理 (运行级，保持池中浏览器可复用)
+        proxy_config=_proxy_config(config),
+        experimental=config.experimental,
+        verbose=False,
+    )
+
+
+def build_run_config(config: CrawlConfig) -> CrawlerRunConfig:
+    """
+    构建单页运行配置 (以配置的 JSON 序列化为键缓存)
+
+    Args:
+        config: 爬取配置
+
+    Returns:
+        CrawlerRunConfig: crawl4ai 运行配置
+    """
+    return _build_run_config(config.model_dump_json(exclude=NON_RUN_FIELDS))
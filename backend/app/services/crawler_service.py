@@ -3,27 +3,62 @@
 """
 
 import asyncio
-import gc
+import base64
 import logging
+import time
 from asyncio import TimeoutError, wait_for
-from typing import List, Optional, Dict, Any
+from typing import Any, AsyncIterable, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
-from crawl4ai import AsyncWebCrawler
+from app.config import settings
 from app.models.schemas import CrawlConfig, CrawlResult
+from app.services.browser_pool import BrowserPool
+from app.services.change_detection import (
+    UNCHANGED, FingerprintStore, classify, fingerprint, response_validators
+)
+from app.services.crawl_cache import CrawlCache
+from app.services.crawl_config_builder import build_run_config
+from app.services.deep_crawl import DeepCrawler
+from app.services.domain_scheduler import DomainScheduler
+from app.services.memory_governor import MemoryGovernor
+from app.services.stage_timing import StageTimer, start_timing
+from app.services.url_ingest import enumerate_urls
 from app.utils.logging import get_logger
+from app.utils.metrics import (
+    BATCH_ACTIVE_WORKERS, BATCH_QUEUE_DEPTH, CONTENT_CHANGES, CRAWL_STAGE_DURATION, observe_crawl
+)
 
 logger = get_logger(__name__)
 
+# 流式批量爬取中每个全局并发槽位对应的 worker 数
+STREAM_WORKERS_PER_SLOT = 2
+
+TIMEOUT_MESSAGE = "Request timed out"
+
+
 class CrawlerService:
     """
     爬虫服务类 - 简化版本，基于成功的crawl4ai-fastapi项目
     """
     
-    def __init__(self):
-        self.user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36"
-        self.crawler_timeout = 30
-        self.request_timeout = 60
+    def __init__(
+        self,
+        browser_pool: Optional[BrowserPool] = None,
+        crawl_cache: Optional[CrawlCache] = None,
+        memory_governor: Optional[MemoryGovernor] = None,
+        fingerprints: Optional[FingerprintStore] = None
+    ):
+        self.user_agent = settings.user_agent
+        self.crawler_timeout = settings.crawler_timeout
+        self.request_timeout = settings.request_timeout
+        # 共享浏览器池，避免每个URL启动一次浏览器
+        self.browser_pool = browser_pool or BrowserPool()
+        # 爬取结果缓存，按 config.cache_mode 读写
+        self.crawl_cache = crawl_cache or CrawlCache()
+        # 内存调控，内存压力高时减少批量爬取的并发
+        self.memory_governor = memory_governor
+        # 内容指纹，按 config.change_detection 比较上次爬取的内容
+        self.fingerprints = fingerprints or FingerprintStore()
     
     async def _validate_url(self, url: str) -> bool:
         """验证URL格式"""
@@ -35,85 +70,234 @@ class CrawlerService:
     
     async def crawl_single(self, url: str, config: CrawlConfig) -> CrawlResult:
         """
-        爬取单个URL - 基于成功的实现
+        爬取单个URL - 根据 config.cache_mode 读写缓存
+        
+        各阶段耗时 (秒) 记录在 result.metadata["timings"]，总耗时记录在 result.execution_time；
+        启用变化检测时与上次爬取的比较结果记录在 result.metadata["change"]。
+        
+        增量重爬 (config.skip_unchanged，深度爬取除外) 时先用上次的 ETag / Last-Modified 发送条件请求，
+        返回 304 时不再启动浏览器；内容未变化的页面只返回变化状态，不包含正文，也不写入缓存。
         """
+        config = config or CrawlConfig()
+        timer = start_timing()
+        start = time.perf_counter()
+        
+        # 验证URL
+        if not await self._validate_url(url):
+            return CrawlResult(
+                url=url,
+                success=False,
+                error_message="Invalid URL format"
+            )
+        
+        if self.crawl_cache.can_read(config.cache_mode):
+            try:
+                cached = await self.crawl_cache.get(url, config)
+                if cached is not None:
+                    logger.debug("缓存命中: %s", url)
+                    elapsed = time.perf_counter() - start
+                    timer.add("cache_lookup", elapsed)
+                    self._finish_timing(cached, timer, elapsed)
+                    observe_crawl(url, "cached", elapsed)
+                    return cached
+            except Exception as e:
+                logger.warning(f"读取缓存失败: {url}, 错误: {e}")
+        
+        detect = config.change_detection or config.skip_unchanged
+        skip_unchanged = config.skip_unchanged and not config.deep_crawl
+        previous = await self._previous_fingerprint(url, config) if detect else None
+        
+        # 条件请求不经过浏览器，配置了代理时跳过，避免绕过代理直连目标站点
+        if skip_unchanged and previous is not None and not config.proxy_server:
+            conditional_start = time.perf_counter()
+            not_modified = await self.fingerprints.not_modified(url, previous)
+            timer.add("conditional_request", time.perf_counter() - conditional_start)
+            if not_modified:
+                change = {**classify(previous, previous), "not_modified": True}
+                result = self._unchanged_result(url, 304, None, change)
+                CONTENT_CHANGES.labels(UNCHANGED).inc()
+                try:
+                    await self.fingerprints.touch(url, config)
+                except Exception as e:
+                    logger.warning(f"更新内容指纹失败: {url}, 错误: {e}")
+                self._finish_timing(result, timer, time.perf_counter() - start)
+                observe_crawl(url, "not_modified", result.execution_time)
+                return result
+        
+        result = await self._fetch(url, config, timer)
+        if result.success and detect:
+            result = await self._detect_change(url, config, result, previous, timer, skip_unchanged)
+        self._finish_timing(result, timer, time.perf_counter() - start)
+        if result.success and (result.metadata or {}).get("change", {}).get("content_skipped"):
+            outcome = "unchanged"
+        elif result.success:
+            outcome = "success"
+        elif result.error_message == TIMEOUT_MESSAGE:
+            outcome = "timeout"
+        else:
+            outcome = "failure"
+        observe_crawl(url, outcome, result.execution_time)
+        
+        if outcome == "success" and self.crawl_cache.can_write(config.cache_mode):
+            try:
+                await self.crawl_cache.put(url, config, result)
+            except Exception as e:
+                logger.warning(f"写入缓存失败: {url}, 错误: {e}")
+        
+        return result
+    
+    async def _previous_fingerprint(self, url: str, config: CrawlConfig) -> Optional[Dict[str, Any]]:
         try:
-            # 验证URL
-            if not await self._validate_url(url):
-                return CrawlResult(
-                    url=url,
-                    success=False,
-                    error_message="Invalid URL format"
-                )
+            return await self.fingerprints.get(url, config)
+        except Exception as e:
+            logger.warning(f"读取内容指纹失败: {url}, 错误: {e}")
+            return None
+    
+    async def _detect_change(
+        self,
+        url: str,
+        config: CrawlConfig,
+        result: CrawlResult,
+        previous: Optional[Dict[str, Any]],
+        timer: StageTimer,
+        skip_unchanged: bool
+    ) -> CrawlResult:
+        """计算内容指纹、与上次爬取比较并保存，增量重爬时未变化的页面去掉正文"""
+        fingerprint_start = time.perf_counter()
+        # 大页面的分词与哈希在线程中执行，不阻塞事件循环
+        current = await asyncio.to_thread(fingerprint, result.markdown)
+        timer.add("fingerprint", time.perf_counter() - fingerprint_start)
+        
+        change = classify(current, previous)
+        CONTENT_CHANGES.labels(change["status"]).inc()
+        validators = (result.metadata or {}).get("validators", {})
+        try:
+            await self.fingerprints.put(url, config, current, validators, changed=change["status"] != UNCHANGED)
+        except Exception as e:
+            logger.warning(f"保存内容指纹失败: {url}, 错误: {e}")
+        
+        if skip_unchanged and change["status"] == UNCHANGED:
+            return self._unchanged_result(url, result.status_code, result.title, change)
+        result.metadata = {**(result.metadata or {}), "change": change}
+        return result
+    
+    @staticmethod
+    def _unchanged_result(
+        url: str,
+        status_code: Optional[int],
+        title: Optional[str],
+        change: Dict[str, Any]
+    ) -> CrawlResult:
+        """增量重爬中内容未变化的页面: 只保留变化状态，不包含正文"""
+        return CrawlResult(
+            url=url,
+            success=True,
+            status_code=status_code,
+            title=title,
+            metadata={"change": {**change, "content_skipped": True}}
+        )
+    
+    @staticmethod
+    def _finish_timing(result: CrawlResult, timer: StageTimer, elapsed: float):
+        """写入总耗时与阶段耗时，并记录阶段指标"""
+        for stage, seconds in timer.stages.items():
+            CRAWL_STAGE_DURATION.labels(stage).observe(seconds)
+        timer.add("total", elapsed)
+        result.execution_time = round(elapsed, 4)
+        result.metadata = {**(result.metadata or {}), "timings": timer.to_dict()}
+    
+    async def _fetch(self, url: str, config: CrawlConfig, timer: StageTimer) -> CrawlResult:
+        """
+        通过浏览器实际抓取单个URL - 基于成功的实现
+        """
+        try:
+            logger.debug("开始爬取: %s", url)
             
-            logger.info(f"开始爬取: {url}")
+            run_config = build_run_config(config)
+            # 外层超时不小于页面超时，避免提前中断正常的页面加载
+            timeout = max(self.request_timeout, config.page_timeout / 1000 + 10)
             
-            # 使用与成功项目相同的爬取逻辑
-            async with AsyncWebCrawler(
-                verbose=True,
-                user_agent=self.user_agent,
-                timeout=self.crawler_timeout,
-            ) as crawler:
+            # 从浏览器池获取浏览器，复用已启动的 Chromium
+            acquire_start = time.perf_counter()
+            async with self.browser_pool.acquire() as crawler:
+                fetch_start = time.perf_counter()
+                timer.add("browser_acquire", fetch_start - acquire_start)
                 result = await wait_for(
-                    crawler.arun(
-                        url=url,
-                        screenshot=False,
-                        excluded_tags=["form"],
-                        exclude_external_links=False,
-                        exclude_social_media_links=True,
-                        exclude_external_images=False,
-                        remove_overlay_elements=True,
-                        html2text={
-                            "escape_dot": False,
-                        },
-                    ),
-                    timeout=self.request_timeout,
-                )
-            
-            # 垃圾回收
-            gc.collect()
-            
-            # 检查结果
-            if result.markdown is None:
-                return CrawlResult(
-                    url=url,
-                    success=False,
-                    error_message="Content crawling failed - no markdown content"
+                    crawler.arun(url=url, config=run_config),
+                    timeout=timeout,
                 )
+                fetch_end = time.perf_counter()
             
-            # 构建成功结果
-            crawl_result = CrawlResult(
-                url=url,
-                success=True,
-                status_code=getattr(result, 'status_code', 200),
-                title=getattr(result, 'title', None),
-                markdown=result.markdown,
-                cleaned_html=getattr(result, 'html', None),
-                metadata={
-                    "method": "crawl4ai_simple",
-                    "user_agent": self.user_agent,
-                    "content_length": len(result.markdown) if result.markdown else 0
-                }
-            )
+            # arun 包含页面加载与 HTML 处理，扣除 Markdown 阶段即为加载耗时
+            timer.add("fetch", max(0.0, fetch_end - fetch_start - timer.stages.get("markdown", 0.0)))
+            timer.between("navigation", "before_goto", "after_goto")
+            timer.between("wait_for", "after_goto", "before_retrieve_html")
             
-            logger.info(f"爬取成功: {url}, 内容长度: {len(result.markdown) if result.markdown else 0}")
+            postprocess_start = time.perf_counter()
+            crawl_result = self._convert(url, config, result)
+            timer.add("postprocess", time.perf_counter() - postprocess_start)
             return crawl_result
             
         except TimeoutError:
-            logger.error(f"爬取超时: {url}")
+            logger.error("爬取超时: %s", url)
             return CrawlResult(
                 url=url,
                 success=False,
-                error_message="Request timed out"
+                error_message=TIMEOUT_MESSAGE
             )
         except Exception as e:
-            logger.error(f"爬取失败: {url}, 错误: {str(e)}")
+            logger.error("爬取失败: %s, 错误: %s", url, e)
             return CrawlResult(
                 url=url,
                 success=False,
                 error_message=f"Crawling failed: {str(e)}"
             )
     
+    def _convert(self, url: str, config: CrawlConfig, result: Any) -> CrawlResult:
+        """将 crawl4ai 的结果转换为 CrawlResult"""
+        # 检查结果
+        if not result.success:
+            return CrawlResult(
+                url=url,
+                success=False,
+                status_code=result.status_code,
+                error_message=result.error_message or "Content crawling failed"
+            )
+        
+        if result.markdown is None:
+            return CrawlResult(
+                url=url,
+                success=False,
+                error_message="Content crawling failed - no markdown content"
+            )
+        
+        page_metadata = result.metadata or {}
+        
+        # 构建成功结果
+        crawl_result = CrawlResult(
+            url=url,
+            success=True,
+            status_code=result.status_code or 200,
+            title=page_metadata.get("title"),
+            markdown=result.markdown,
+            cleaned_html=getattr(result, 'html', None),
+            media=result.media or None,
+            links=result.links or None,
+            screenshot=result.screenshot if config.screenshot else None,
+            pdf=base64.b64encode(result.pdf).decode("ascii") if config.pdf and result.pdf else None,
+            metadata={
+                "method": "crawl4ai_run_config",
+                "user_agent": self.user_agent,
+                "content_length": len(result.markdown) if result.markdown else 0,
+                "page": page_metadata,
+                # 增量重爬时用于条件请求
+                "validators": response_validators(getattr(result, "response_headers", None))
+            }
+        )
+        
+        logger.debug("爬取成功: %s, 内容长度: %d", url, crawl_result.metadata["content_length"])
+        return crawl_result
+    
     async def crawl_batch(
         self, 
         urls: List[str], 
@@ -122,19 +306,69 @@ class CrawlerService:
         progress_callback: Optional[callable] = None
     ) -> List[CrawlResult]:
         """
-        批量爬取URLs - 使用信号量控制并发
+        批量爬取URLs - 按域名调度并发
+        
+        progress_callback 在每个URL完成时以 (completed, total, result) 调用；
+        启用 config.deep_crawl 时改为从这些URL出发进行深度爬取
         """
+        if config.deep_crawl:
+            pages: List[CrawlResult] = []
+            
+            def on_page(completed: int, discovered: int, result: CrawlResult):
+                pages.append(result)
+                if progress_callback:
+                    progress_callback(completed, discovered, result)
+            
+            await self.deep_crawl(urls, config, concurrent_limit, on_page)
+            return pages
+        
         try:
             logger.info(f"开始批量爬取: {len(urls)} 个URLs")
             
-            # 使用信号量控制并发
-            semaphore = asyncio.Semaphore(concurrent_limit)
-            results = []
+            results: List[Optional[CrawlResult]] = [None] * len(urls)
             completed = 0
             
-            async def crawl_with_semaphore(url: str) -> CrawlResult:
+            def on_result(index: int, result: CrawlResult):
                 nonlocal completed
-                async with semaphore:
+                results[index] = result
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, len(urls), result)
+                logger.info("进度: %d/%d, URL: %s", completed, len(urls), result.url, extra={"sample": True})
+            
+            await self.crawl_stream(enumerate_urls(urls), config, concurrent_limit, on_result)
+            
+            success_count = sum(1 for r in results if r.success)
+            logger.info(f"批量爬取完成: 成功 {success_count}/{len(urls)}")
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"批量爬取失败: {e}")
+            # 返回所有失败的结果
+            return [
+                CrawlResult(url=url, success=False, error_message=str(e))
+                for url in urls
+            ]
+    
+    async def _admit(self, slot: int, workers: int):
+        """worker 领取下一个URL前按内存压力等待"""
+        if self.memory_governor is not None:
+            await self.memory_governor.admit(slot, workers)
+    
+    async def _crawl_scheduled(self, scheduler: DomainScheduler, url: str, config: CrawlConfig) -> CrawlResult:
+        """
+        经域名调度器爬取单个URL，被限流时在退避后重试
+        
+        调度等待记录在 result.metadata["timings"]["queue_wait"]
+        """
+        BATCH_ACTIVE_WORKERS.inc()
+        try:
+            queue_wait = 0.0
+            for attempt in range(settings.scheduler_max_retries + 1):
+                wait_start = time.perf_counter()
+                async with scheduler.slot(url):
+                    queue_wait += time.perf_counter() - wait_start
                     try:
                         result = await self.crawl_single(url, config)
                     except Exception as e:
@@ -143,42 +377,141 @@ class CrawlerService:
                             success=False,
                             error_message=str(e)
                         )
-                    
-                    completed += 1
-                    if progress_callback:
-                        progress_callback(completed, len(urls))
-                    
-                    logger.info(f"进度: {completed}/{len(urls)}, URL: {url}")
-                    return result
-            
-            # 并发执行所有爬取任务
-            tasks = [crawl_with_semaphore(url) for url in urls]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # 处理异常结果
-            final_results = []
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    final_results.append(CrawlResult(
-                        url=urls[i],
-                        success=False,
-                        error_message=str(result)
-                    ))
-                else:
-                    final_results.append(result)
-            
-            success_count = sum(1 for r in final_results if r.success)
-            logger.info(f"批量爬取完成: 成功 {success_count}/{len(urls)}")
+                
+                # 被限流时在退避后重试
+                if not scheduler.record(url, result.status_code):
+                    break
+        except Exception as e:
+            return CrawlResult(url=url, success=False, error_message=str(e))
+        finally:
+            BATCH_ACTIVE_WORKERS.dec()
+        
+        # 调度等待在 crawl_single 之外发生，单独补充到阶段耗时中
+        CRAWL_STAGE_DURATION.labels("queue_wait").observe(queue_wait)
+        metadata = result.metadata if result.metadata is not None else {}
+        metadata.setdefault("timings", {})["queue_wait"] = round(queue_wait, 4)
+        result.metadata = metadata
+        return result
+    
+    async def crawl_stream(
+        self,
+        urls: AsyncIterable[Tuple[int, str]],
+        config: CrawlConfig,
+        concurrent_limit: int = 3,
+        on_result: Optional[Callable[[int, CrawlResult], Any]] = None
+    ) -> int:
+        """
+        流式批量爬取 - URL经有界队列分发给固定数量的 worker
+        
+        不为每个URL单独创建协程，内存占用与URL总数无关；
+        on_result 按完成顺序以 (URL序号, result) 调用
+        
+        Args:
+            urls: (URL序号, URL) 的异步迭代器
+            config: 爬取配置
+            concurrent_limit: 全局并发限制
+            on_result: 单个URL完成回调
             
-            return final_results
+        Returns:
+            int: 已处理的URL数量
+        """
+        # 按域名调度: 全局并发 + 每主机并发/限速/退避
+        scheduler = DomainScheduler(global_limit=concurrent_limit)
+        # worker 数多于全局并发，部分 worker 等待受限主机时其他主机仍能占满全局并发
+        worker_count = scheduler.global_limit * STREAM_WORKERS_PER_SLOT
+        queue: asyncio.Queue = asyncio.Queue(maxsize=worker_count * 2)
+        processed = 0
+        
+        # 已入队但未被 worker 取走的URL数，退出时从全局队列深度指标中扣除
+        queued = 0
+        
+        async def producer():
+            nonlocal queued
+            try:
+                async for item in urls:
+                    await queue.put(item)
+                    queued += 1
+                    BATCH_QUEUE_DEPTH.inc()
+                for _ in range(worker_count):
+                    await queue.put(None)
+            finally:
+                # 被取消时关闭URL迭代器 (释放 URL 文件句柄)
+                aclose = getattr(urls, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+        
+        async def worker(slot: int):
+            nonlocal processed, queued
+            while True:
+                await self._admit(slot, worker_count)
+                item = await queue.get()
+                if item is None:
+                    return
+                queued -= 1
+                BATCH_QUEUE_DEPTH.dec()
+                index, url = item
+                result = await self._crawl_scheduled(scheduler, url, config)
+                processed += 1
+                if on_result:
+                    on_result(index, result)
+        
+        feeder = asyncio.create_task(producer())
+        workers = [asyncio.create_task(worker(slot)) for slot in range(worker_count)]
+        try:
+            await asyncio.gather(feeder, *workers)
+        finally:
+            # 读取URL失败、worker 出错或被取消时停止生产者与所有 worker，
+            # 生产者不会阻塞在已满的队列上
+            feeder.cancel()
+            for task in workers:
+                task.cancel()
+            BATCH_QUEUE_DEPTH.dec(queued)
+        return processed
+    
+    async def deep_crawl(
+        self,
+        urls: List[str],
+        config: CrawlConfig,
+        concurrent_limit: int = 3,
+        progress_callback: Optional[callable] = None
+    ) -> int:
+        """
+        深度爬取 - 从起始URL出发按 crawl_strategy 发现并爬取链接
+        
+        页面与流式批量爬取一样经域名调度器与内存调控执行，结果不在内存中累积；
+        progress_callback 以 (completed, discovered, result) 调用，
+        discovered 随新链接的发现而增长
+        
+        Returns:
+            int: 已爬取的页面数量
+        """
+        delay = settings.deep_crawl_domain_delay
+        # 同一主机的请求之间至少间隔 deep_crawl_domain_delay 秒 (容量为1的令牌桶)
+        scheduler = DomainScheduler(
+            global_limit=concurrent_limit,
+            host_rate=1 / delay if delay > 0 else None,
+            host_burst=1.0 if delay > 0 else None,
+        )
+        
+        async def fetch(url: str, page_config: CrawlConfig) -> CrawlResult:
+            return await self._crawl_scheduled(scheduler, url, page_config)
+        
+        def on_result(result: CrawlResult, completed: int, discovered: int):
+            if progress_callback:
+                progress_callback(completed, discovered, result)
+        
+        deep_crawler = DeepCrawler(
+            fetch=fetch,
+            config=config,
+            concurrent_limit=scheduler.global_limit * STREAM_WORKERS_PER_SLOT,
+            admit=self._admit
+        )
+        try:
+            return await deep_crawler.run(urls, on_result=on_result)
             
         except Exception as e:
-            logger.error(f"批量爬取失败: {e}")
-            # 返回所有失败的结果
-            return [
-                CrawlResult(url=url, success=False, error_message=str(e))
-                for url in urls
-            ]
+            logger.error(f"深度爬取失败: {e}")
+            return deep_crawler.completed
     
     async def extract_structured_data(
         self, 
@@ -0,0 +1,280 @@
+"""
+深度爬取引擎
+
+基于 URL 边界队列 (frontier) 的深度爬取，实现 CrawlConfig 中的
+deep_crawl / crawl_depth / crawl_strategy:
+
+- BFS / DFS / BEST_FIRST 共用一个优先队列，仅排序键不同
+- 已访问集合使用 64 位哈希 (大规模爬取时切换为 Bloom 过滤器)
+- 遵循 exclude_domains / exclude_external_links 过滤
+- 每个页面完成后立即通过回调推送，不在内存中保留页面结果
+
+页面的并发、同域名请求间隔与内存调控由调用方传入的 fetch / admit 负责
+(CrawlerService 使用与流式批量爬取相同的域名调度器和内存调控)。
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import math
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+from app.config import settings
+from app.models.schemas import CrawlConfig, CrawlResult, CrawlStrategy
+from app.services.crawl_cache import normalize_url
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _url_digest(url: str) -> bytes:
+    return hashlib.blake2b(normalize_url(url).encode("utf-8"), digest_size=16).digest()
+
+
+class HashedSeenSet:
+    """以64位整数哈希存储已访问URL，内存占用远小于保存完整URL字符串"""
+
+    def __init__(self):
+        self._hashes: Set[int] = set()
+
+    def add(self, url: str) -> bool:
+        """加入集合，返回是否为新URL"""
+        h = int.from_bytes(_url_digest(url)[:8], "big")
+        if h in self._hashes:
+            return False
+        self._hashes.add(h)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+class BloomSeenSet:
+    """
+    Bloom 过滤器实现的已访问集合
+
+    固定内存，存在极小的误判率 (误判时跳过一个未访问的URL)。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, url: str) -> Iterable[int]:
+        digest = _url_digest(url)
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, url: str) -> bool:
+        """加入集合，返回是否为新URL"""
+        is_new = False
+        for pos in self._positions(url):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                is_new = True
+        if is_new:
+            self._count += 1
+        return is_new
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def create_seen_set(max_pages: int):
+    """根据爬取规模选择已访问集合的实现"""
+    if max_pages >= settings.deep_crawl_bloom_threshold:
+        # 发现的链接数通常远多于爬取的页面数
+        return BloomSeenSet(capacity=max_pages * 20)
+    return HashedSeenSet()
+
+
+class Frontier:
+    """
+    URL 边界队列
+
+    BFS 按深度优先出队较浅的URL，DFS 后进先出，BEST_FIRST 按评分出队。
+    """
+
+    def __init__(self, strategy: CrawlStrategy):
+        self.strategy = strategy
+        self._heap: List[Tuple[Tuple[float, int], str, int, float]] = []
+        self._seq = itertools.count()
+
+    def push(self, url: str, depth: int, score: float = 0.0):
+        seq = next(self._seq)
+        if self.strategy == CrawlStrategy.BFS:
+            key = (depth, seq)
+        elif self.strategy == CrawlStrategy.DFS:
+            key = (-seq, 0)
+        else:
+            key = (-score, seq)
+        heapq.heappush(self._heap, (key, url, depth, score))
+
+    def pop(self) -> Tuple[str, int, float]:
+        _, url, depth, score = heapq.heappop(self._heap)
+        return url, depth, score
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def score_url(url: str, depth: int, anchor_text: str, keywords: List[str]) -> float:
+    """
+    BEST_FIRST 评分: 关键词命中越多、深度越浅、路径越短得分越高
+
+    关键词通过 config.experimental["deep_crawl_keywords"] 指定
+    """
+    score = 1.0 / (1 + depth)
+    if keywords:
+        haystack = f"{url} {anchor_text}".lower()
+        score += sum(1.0 for kw in keywords if kw in haystack)
+    path_segments = len([p for p in urlsplit(url).path.split("/") if p])
+    score -= 0.05 * path_segments
+    return score
+
+
+class DeepCrawler:
+    """
+    深度爬取执行器
+
+    Args:
+        fetch: 单页爬取函数 (负责并发与限速调度)
+        config: 爬取配置
+        concurrent_limit: worker 数量
+        max_pages: 最多爬取的页面数
+        admit: worker 领取下一个页面前调用 (slot, workers)，用于内存压力下减少并发
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, CrawlConfig], Awaitable[CrawlResult]],
+        config: CrawlConfig,
+        concurrent_limit: int = 3,
+        max_pages: Optional[int] = None,
+        admit: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    ):
+        self.fetch = fetch
+        self.config = config
+        self.concurrent_limit = max(1, concurrent_limit)
+        self.max_pages = max_pages or settings.deep_crawl_max_pages
+        self.max_depth = config.crawl_depth
+        self.admit = admit
+
+        self.frontier = Frontier(config.crawl_strategy)
+        self.seen = create_seen_set(self.max_pages)
+        self.excluded_domains = [d.lower().lstrip(".") for d in config.exclude_domains]
+        self.keywords = [
+            str(k).lower() for k in (config.experimental or {}).get("deep_crawl_keywords", [])
+        ]
+
+        self._seed_hosts: Set[str] = set()
+        self._scheduled = 0
+        self._in_flight = 0
+        self.completed = 0
+        self._condition = asyncio.Condition()
+
+    def _host(self, url: str) -> str:
+        return (urlsplit(url).hostname or "").lower()
+
+    def _allowed(self, url: str) -> bool:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return False
+        host = parts.hostname.lower()
+        if any(host == d or host.endswith(f".{d}") for d in self.excluded_domains):
+            return False
+        if self.config.exclude_external_links and host not in self._seed_hosts:
+            return False
+        return True
+
+    def _enqueue(self, url: str, depth: int, anchor_text: str = "") -> bool:
+        if self._scheduled >= self.max_pages or not self._allowed(url):
+            return False
+        if not self.seen.add(url):
+            return False
+        score = score_url(url, depth, anchor_text, self.keywords)
+        self.frontier.push(url, depth, score)
+        self._scheduled += 1
+        return True
+
+    def _extract_links(self, result: CrawlResult) -> Iterable[Tuple[str, str]]:
+        links = result.links or {}
+        for group in ("internal", "external"):
+            for link in links.get(group, []) or []:
+                if isinstance(link, dict):
+                    href, text = link.get("href"), link.get("text") or ""
+                else:
+                    href, text = str(link), ""
+                if href:
+                    yield urldefrag(urljoin(result.url, href))[0], text
+
+    async def run(
+        self,
+        start_urls: List[str],
+        on_result: Optional[Callable[[CrawlResult, int, int], Any]] = None,
+    ) -> int:
+        """
+        执行深度爬取
+
+        Args:
+            start_urls: 起始URL
+            on_result: 每个页面完成时回调 (result, completed, discovered)，
+                结果由回调写出，本方法不保留
+
+        Returns:
+            int: 已爬取的页面数量
+        """
+        self._seed_hosts = {self._host(u) for u in start_urls}
+        for url in start_urls:
+            self._enqueue(url, 0)
+
+        async def worker(slot: int):
+            while True:
+                if self.admit is not None:
+                    await self.admit(slot, self.concurrent_limit)
+                async with self._condition:
+                    while not len(self.frontier) and self._in_flight:
+                        await self._condition.wait()
+                    if not len(self.frontier):
+                        self._condition.notify_all()
+                        return
+                    url, depth, score = self.frontier.pop()
+                    self._in_flight += 1
+
+                try:
+                    result = await self.fetch(url, self.config)
+                except Exception as e:
+                    result = CrawlResult(url=url, success=False, error_message=str(e))
+
+                result.metadata = {
+                    **(result.metadata or {}),
+                    "depth": depth,
+                    "score": round(score, 4),
+                }
+
+                async with self._condition:
+                    if result.success and depth < self.max_depth:
+                        for link, text in self._extract_links(result):
+                            self._enqueue(link, depth + 1, text)
+                    self.completed += 1
+                    completed = self.completed
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+
+                if on_result:
+                    on_result(result, completed, self._scheduled)
+
+        logger.info(
+            f"开始深度爬取: {len(start_urls)} 个起始URL, 深度 {self.max_depth}, "
+            f"策略 {self.config.crawl_strategy.value}, 最多 {self.max_pages} 个页面"
+        )
+        await asyncio.gather(*[worker(slot) for slot in range(self.concurrent_limit)])
+        logger.info(f"深度爬取完成: 共爬取 {self.completed} 个页面")
+        return self.completed
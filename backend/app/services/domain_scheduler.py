@@ -0,0 +1,193 @@
+"""
+按域名调度的批量爬取并发控制
+
+- 全局并发上限 (concurrent_limit)
+- 每个主机的并发上限
+- 每个主机的令牌桶限速
+- 收到 429/503 时对该主机指数退避，成功后逐步恢复
+- 空闲主机 (无进行中请求、令牌桶已满、不在退避期) 的状态会被清理，主机数不随URL数无限增长
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+from app.config import settings
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 表示被目标站点限流的状态码
+THROTTLE_STATUS_CODES = {429, 503}
+
+# 主机状态数达到该值后才开始清理空闲主机
+PRUNE_MIN_HOSTS = 256
+
+
+class TokenBucket:
+    """令牌桶限速器"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        """获取一个令牌，不足时等待"""
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def is_full(self, now: float) -> bool:
+        """令牌是否已恢复到桶容量 (此时丢弃该桶与新建一个等价)"""
+        if self.rate <= 0:
+            return True
+        return self._tokens + (now - self._updated) * self.rate >= self.capacity
+
+
+class HostState:
+    """单个主机的并发、限速与退避状态"""
+
+    def __init__(self, concurrency: int, rate: float, burst: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.backoff_seconds = 0.0
+        self.backoff_until = 0.0
+        self.throttled = 0
+        self.requests = 0
+        # 正在等待或持有该主机槽位的请求数
+        self.active = 0
+
+    def is_idle(self, now: float) -> bool:
+        return not self.active and now >= self.backoff_until and self.bucket.is_full(now)
+
+
+class DomainScheduler:
+    """
+    域名感知的调度器
+
+    先获取主机槽位再获取全局槽位，等待某个主机的请求不会占用全局并发，
+    从而在多主机混合的批量任务中充分利用并发。
+    """
+
+    def __init__(
+        self,
+        global_limit: int,
+        per_host_limit: Optional[int] = None,
+        host_rate: Optional[float] = None,
+        host_burst: Optional[float] = None,
+    ):
+        self.global_limit = max(1, global_limit)
+        self.per_host_limit = max(1, per_host_limit or settings.scheduler_per_host_limit)
+        self.host_rate = settings.scheduler_host_rate if host_rate is None else host_rate
+        self.host_burst = host_burst or settings.scheduler_host_burst
+        self.backoff_base = settings.scheduler_backoff_base
+        self.backoff_max = settings.scheduler_backoff_max
+
+        self._global = asyncio.Semaphore(self.global_limit)
+        self._hosts: Dict[str, HostState] = {}
+        self._prune_at = PRUNE_MIN_HOSTS
+        self.pruned = 0
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return (urlsplit(url).hostname or "").lower()
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            if len(self._hosts) >= self._prune_at:
+                self._prune()
+            state = self._hosts[host] = HostState(self.per_host_limit, self.host_rate, self.host_burst)
+        return state
+
+    def _prune(self):
+        """
+        清理空闲主机的状态
+
+        下一次清理在主机数翻倍后进行，清理的总开销与新增主机数成正比
+        """
+        now = time.monotonic()
+        idle = [host for host, state in self._hosts.items() if state.is_idle(now)]
+        for host in idle:
+            del self._hosts[host]
+        self.pruned += len(idle)
+        self._prune_at = max(PRUNE_MIN_HOSTS, len(self._hosts) * 2)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """
+        获取一个爬取槽位
+
+        用法:
+            async with scheduler.slot(url):
+                result = await crawl(url)
+        """
+        state = self._state(self.host_of(url))
+        state.active += 1
+        try:
+            async with state.semaphore:
+                delay = state.backoff_until - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await state.bucket.acquire()
+                async with self._global:
+                    state.requests += 1
+                    yield
+        finally:
+            state.active -= 1
+
+    def record(self, url: str, status_code: Optional[int]) -> bool:
+        """
+        记录请求结果并调整主机退避
+
+        Args:
+            url: 已爬取的URL
+            status_code: HTTP状态码
+
+        Returns:
+            bool: 是否被限流 (调用方可据此重试)
+        """
+        host = self.host_of(url)
+        state = self._state(host)
+
+        if status_code in THROTTLE_STATUS_CODES:
+            state.throttled += 1
+            state.backoff_seconds = min(
+                self.backoff_max,
+                max(self.backoff_base, state.backoff_seconds * 2),
+            )
+            state.backoff_until = time.monotonic() + state.backoff_seconds
+            logger.warning(f"主机限流 {status_code}: {host}, 退避 {state.backoff_seconds:.1f}s")
+            return True
+
+        # 成功后逐步缩短退避时间
+        if state.backoff_seconds:
+            state.backoff_seconds = state.backoff_seconds / 2 if state.backoff_seconds > self.backoff_base else 0.0
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各主机的调度统计"""
+        return {
+            "global_limit": self.global_limit,
+            "per_host_limit": self.per_host_limit,
+            "pruned_hosts": self.pruned,
+            "hosts": {
+                host: {
+                    "requests": state.requests,
+                    "throttled": state.throttled,
+                    "backoff_seconds": state.backoff_seconds,
+                }
+                for host, state in self._hosts.items()
+            },
+        }
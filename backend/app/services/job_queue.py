@@ -0,0 +1,362 @@
+"""
+批量爬取任务队列
+
+API 进程只负责入队，独立的 worker 进程 (python -m app.worker) 领取并执行批量爬取。
+
+- 本地后端: SQLite (WAL)，多个 worker 进程可共享同一个数据库文件
+- 可选后端: Redis (需安装 redis 包)，适用于跨主机水平扩展
+
+投递语义为至少一次: worker 通过租约 (lease) 持有任务并定期续租，
+worker 崩溃后租约过期，任务会被其他 worker 重新领取；
+每个URL的结果在完成时即增量写入结果存储 (见 result_sink)，重新领取时跳过已完成的URL。
+
+续租、确认与失败都校验 worker_id，租约被接管后原 worker 的这些操作不再生效。
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class Job:
+    """队列中的批量爬取任务"""
+
+    def __init__(self, job_id: str, task_id: str, payload: Dict[str, Any], attempts: int = 0):
+        self.job_id = job_id
+        self.task_id = task_id
+        self.payload = payload
+        self.attempts = attempts
+
+
+class JobQueue(ABC):
+    """任务队列接口"""
+
+    @abstractmethod
+    async def enqueue(self, task_id: str, payload: Dict[str, Any]) -> str:
+        """入队，返回 job_id"""
+
+    @abstractmethod
+    async def claim(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        """领取一个待执行 (或租约已过期) 的任务"""
+
+    @abstractmethod
+    async def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """续租，返回 False 表示租约已被其他 worker 接管"""
+
+    @abstractmethod
+    async def ack(self, job_id: str, worker_id: str) -> bool:
+        """确认任务完成，返回 False 表示租约已不属于该 worker"""
+
+    @abstractmethod
+    async def fail(self, job_id: str, worker_id: str, error_message: str, retry: bool) -> bool:
+        """任务失败，retry=True 时重新入队；返回 False 表示租约已不属于该 worker"""
+
+    @abstractmethod
+    async def get_stats(self) -> Dict[str, Any]:
+        """队列统计"""
+
+    async def close(self) -> None:
+        """释放队列资源"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """基于 SQLite 的本地持久化队列"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            task_id TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker_id TEXT,
+            lease_until REAL,
+            error_message TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or settings.job_db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # 多个 worker 进程并发领取时等待写锁
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, fn, *args):
+        with self._conn_lock:
+            return fn(self._connect(), *args)
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(self._execute, fn, *args)
+
+    async def enqueue(self, task_id: str, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        data = json.dumps(payload, ensure_ascii=False)
+
+        def _enqueue(conn: sqlite3.Connection):
+            conn.execute(
+                "INSERT INTO jobs (job_id, task_id, payload, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, task_id, data, now, now),
+            )
+
+        await self._run(_enqueue)
+        return job_id
+
+    async def claim(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        def _claim(conn: sqlite3.Connection):
+            now = time.time()
+            # IMMEDIATE 事务保证多进程下同一任务只被一个 worker 领取
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT job_id, task_id, payload, attempts FROM jobs "
+                    "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', worker_id = ?, lease_until = ?, "
+                        "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                        (worker_id, now + lease_seconds, now, row[0]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return row
+
+        row = await self._run(_claim)
+        if row is None:
+            return None
+        return Job(job_id=row[0], task_id=row[1], payload=json.loads(row[2]), attempts=row[3] + 1)
+
+    async def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        def _heartbeat(conn: sqlite3.Connection):
+            now = time.time()
+            return conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? "
+                "WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (now + lease_seconds, now, job_id, worker_id),
+            ).rowcount
+
+        return await self._run(_heartbeat) > 0
+
+    async def ack(self, job_id: str, worker_id: str) -> bool:
+        def _ack(conn: sqlite3.Connection):
+            return conn.execute(
+                "UPDATE jobs SET status = 'done', worker_id = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (time.time(), job_id, worker_id),
+            ).rowcount
+
+        return await self._run(_ack) > 0
+
+    async def fail(self, job_id: str, worker_id: str, error_message: str, retry: bool) -> bool:
+        status = "queued" if retry else "failed"
+
+        def _fail(conn: sqlite3.Connection):
+            return conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = NULL, lease_until = NULL, "
+                "error_message = ?, updated_at = ? "
+                "WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (status, error_message, time.time(), job_id, worker_id),
+            ).rowcount
+
+        return await self._run(_fail) > 0
+
+    async def get_stats(self) -> Dict[str, Any]:
+        def _stats(conn: sqlite3.Connection):
+            return conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+
+        rows = await self._run(_stats)
+        return {"backend": "sqlite", "jobs": dict(rows)}
+
+    async def close(self) -> None:
+        def _close():
+            with self._conn_lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+        await asyncio.to_thread(_close)
+
+
+class RedisJobQueue(JobQueue):
+    """
+    基于 Redis 的队列
+
+    - {prefix}:queue        待执行 job_id 列表
+    - {prefix}:running      执行中任务的租约 (zset, score 为租约到期时间)
+    - {prefix}:job:{id}     任务详情 (hash)
+
+    领取、续租、确认与失败均为 Lua 脚本，出队与登记租约在同一个原子操作中完成，
+    worker 在两步之间崩溃也不会丢失任务。
+    """
+
+    # KEYS: queue, running; ARGV: now, lease_until, worker_id, job key 前缀
+    # 返回 {重新入队的过期任务数[, job_id, task_id, payload, attempts]}
+    CLAIM_SCRIPT = """
+        local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+        for _, id in ipairs(expired) do
+            redis.call('ZREM', KEYS[2], id)
+            redis.call('HSET', ARGV[4] .. id, 'status', 'queued', 'worker_id', '')
+            redis.call('RPUSH', KEYS[1], id)
+        end
+        local id = redis.call('RPOP', KEYS[1])
+        if not id then
+            return {#expired}
+        end
+        local key = ARGV[4] .. id
+        redis.call('ZADD', KEYS[2], ARGV[2], id)
+        redis.call('HSET', key, 'status', 'running', 'worker_id', ARGV[3])
+        local attempts = redis.call('HINCRBY', key, 'attempts', 1)
+        return {#expired, id, redis.call('HGET', key, 'task_id'), redis.call('HGET', key, 'payload'), attempts}
+    """
+
+    # KEYS: running, job key; ARGV: job_id, worker_id, lease_until
+    HEARTBEAT_SCRIPT = """
+        if redis.call('HGET', KEYS[2], 'worker_id') ~= ARGV[2]
+                or redis.call('HGET', KEYS[2], 'status') ~= 'running' then
+            return 0
+        end
+        redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+        return 1
+    """
+
+    # KEYS: running, job key, queue; ARGV: job_id, worker_id, status, error_message, 是否重新入队
+    FINISH_SCRIPT = """
+        if redis.call('HGET', KEYS[2], 'worker_id') ~= ARGV[2]
+                or redis.call('HGET', KEYS[2], 'status') ~= 'running' then
+            return 0
+        end
+        redis.call('ZREM', KEYS[1], ARGV[1])
+        redis.call('HSET', KEYS[2], 'status', ARGV[3], 'worker_id', '')
+        if ARGV[4] ~= '' then
+            redis.call('HSET', KEYS[2], 'error_message', ARGV[4])
+        end
+        if ARGV[5] == '1' then
+            redis.call('LPUSH', KEYS[3], ARGV[1])
+        elseif ARGV[3] == 'done' then
+            redis.call('EXPIRE', KEYS[2], 86400)
+        end
+        return 1
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, prefix: str = "crawl4ai_visual:jobs"):
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("使用 Redis 队列需要安装 redis 包") from e
+
+        self.redis = aioredis.from_url(redis_url or settings.redis_url, decode_responses=True)
+        self.prefix = prefix
+        self._claim = self.redis.register_script(self.CLAIM_SCRIPT)
+        self._heartbeat = self.redis.register_script(self.HEARTBEAT_SCRIPT)
+        self._finish = self.redis.register_script(self.FINISH_SCRIPT)
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix,) + parts)
+
+    async def enqueue(self, task_id: str, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key("job", job_id), mapping={
+                "task_id": task_id,
+                "payload": json.dumps(payload, ensure_ascii=False),
+                "status": "queued",
+                "attempts": 0,
+            })
+            pipe.lpush(self._key("queue"), job_id)
+            await pipe.execute()
+        return job_id
+
+    async def claim(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        now = time.time()
+        reply = await self._claim(
+            keys=[self._key("queue"), self._key("running")],
+            args=[now, now + lease_seconds, worker_id, self._key("job", "")],
+        )
+        if int(reply[0]):
+            logger.warning(f"{reply[0]} 个任务租约过期，已重新入队")
+        if len(reply) == 1:
+            return None
+
+        _, job_id, task_id, payload, attempts = reply
+        return Job(job_id=job_id, task_id=task_id, payload=json.loads(payload), attempts=int(attempts))
+
+    async def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        renewed = await self._heartbeat(
+            keys=[self._key("running"), self._key("job", job_id)],
+            args=[job_id, worker_id, time.time() + lease_seconds],
+        )
+        return bool(renewed)
+
+    async def _finish_job(self, job_id: str, worker_id: str, status: str, error_message: str, retry: bool) -> bool:
+        finished = await self._finish(
+            keys=[self._key("running"), self._key("job", job_id), self._key("queue")],
+            args=[job_id, worker_id, status, error_message, "1" if retry else "0"],
+        )
+        return bool(finished)
+
+    async def ack(self, job_id: str, worker_id: str) -> bool:
+        return await self._finish_job(job_id, worker_id, "done", "", retry=False)
+
+    async def fail(self, job_id: str, worker_id: str, error_message: str, retry: bool) -> bool:
+        return await self._finish_job(job_id, worker_id, "queued" if retry else "failed", error_message, retry)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "jobs": {
+                "queued": await self.redis.llen(self._key("queue")),
+                "running": await self.redis.zcard(self._key("running")),
+            },
+        }
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def create_job_queue(backend: Optional[str] = None) -> JobQueue:
+    """
+    根据配置创建任务队列
+
+    Args:
+        backend: 队列类型 ("sqlite" 或 "redis")，默认读取配置
+
+    Returns:
+        JobQueue: 任务队列实例
+    """
+    backend = (backend or settings.job_queue_backend).lower()
+    if backend == "sqlite":
+        return SQLiteJobQueue()
+    if backend == "redis":
+        return RedisJobQueue()
+    raise ValueError(f"不支持的任务队列类型: {backend}")
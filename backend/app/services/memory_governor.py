@@ -0,0 +1,248 @@
+"""
+内存调控
+
+取代每个页面后的强制 gc.collect() (在并发爬取时每个URL都会阻塞事件循环数十毫秒):
+- 定期采样本进程及其子进程 (Chromium) 的常驻内存
+- 超过软阈值 (ceiling * soft_ratio) 后按比例减少批量爬取的并发 worker，
+  达到上限时只保留一个 worker
+- 超过软阈值时回收处理页面最多的浏览器，并在冷却时间内最多触发一次完整 GC
+- 启动时冻结已有对象 (gc.freeze)，常规的分代回收不再反复扫描启动期创建的对象
+
+GC 暂停时长通过 gc.callbacks 记录在 gc_pause_seconds 指标中，可与 event_loop_lag_seconds
+一起观察事件循环阻塞的变化。
+"""
+
+import asyncio
+import gc
+import math
+import os
+import resource
+import sys
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.browser_pool import BrowserPool
+from app.utils.logging import get_logger
+from app.utils.metrics import GC_PAUSE, GOVERNOR_GC_RUNS, MEMORY_PRESSURE, MEMORY_RSS
+
+logger = get_logger(__name__)
+
+HAS_PROC = os.path.isdir("/proc")
+
+
+def _read_rss(pid: int) -> int:
+    with open(f"/proc/{pid}/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _children(pids: List[int]) -> List[int]:
+    """一次遍历 /proc 找出给定进程的直接子进程"""
+    parents = set(pids)
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # 进程名可能包含空格，从最后一个 ')' 之后解析
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid in parents:
+            children.append(int(entry))
+    return children
+
+
+def process_tree_rss() -> int:
+    """
+    本进程及其全部子孙进程的常驻内存之和 (字节)
+
+    没有 /proc 的平台退化为本进程的峰值常驻内存
+    """
+    if not HAS_PROC:
+        # ru_maxrss 在 macOS 上以字节为单位，其余平台为 KiB
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    total = 0
+    level = [os.getpid()]
+    while level:
+        for pid in level:
+            try:
+                total += _read_rss(pid)
+            except OSError:
+                continue
+        level = _children(level)
+    return total
+
+
+class _GCPauseTimer:
+    """
+    通过 gc.callbacks 记录每次回收的暂停时长
+
+    回调中不直接更新指标 (回收可能发生在指标内部持有锁期间)，
+    只把 (代, 时长) 放入有界队列，由采样循环统一写入指标。
+    """
+
+    def __init__(self):
+        self._start = 0.0
+        self.pauses: Deque[Tuple[int, float]] = deque(maxlen=10000)
+
+    def __call__(self, phase: str, info: dict):
+        if phase == "start":
+            self._start = time.perf_counter()
+        elif self._start:
+            self.pauses.append((info.get("generation", -1), time.perf_counter() - self._start))
+            self._start = 0.0
+
+    def flush(self):
+        while self.pauses:
+            generation, seconds = self.pauses.popleft()
+            GC_PAUSE.labels(str(generation)).observe(seconds)
+
+
+class MemoryGovernor:
+    """
+    内存调控器
+
+    Args:
+        browser_pool: 压力过高时回收其中的浏览器
+        ceiling_bytes: 内存上限，0 表示不限制 (只记录指标)
+        soft_ratio: 超过 ceiling * soft_ratio 开始降并发/回收浏览器/触发 GC
+        interval: 采样间隔 (秒)
+    """
+
+    def __init__(
+        self,
+        browser_pool: Optional[BrowserPool] = None,
+        ceiling_bytes: Optional[int] = None,
+        soft_ratio: Optional[float] = None,
+        interval: Optional[float] = None,
+    ):
+        self.browser_pool = browser_pool
+        self.ceiling_bytes = settings.memory_ceiling_mb * 1024 * 1024 if ceiling_bytes is None else ceiling_bytes
+        self.soft_ratio = soft_ratio or settings.memory_soft_ratio
+        self.interval = interval or settings.memory_sample_interval
+        self.gc_cooldown = settings.memory_gc_cooldown
+
+        self.rss = 0
+        self.pressure = 0.0
+        self.gc_runs = 0
+        self.recycles = 0
+        self._last_gc = 0.0
+        self._last_recycle = 0.0
+        self._capacity = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+        self._gc_timer: Optional[_GCPauseTimer] = None
+
+    @property
+    def soft_limit(self) -> int:
+        return int(self.ceiling_bytes * self.soft_ratio)
+
+    def allowed_workers(self, workers: int) -> int:
+        """
+        当前内存压力下允许同时工作的 worker 数
+
+        软阈值以下不限制；软阈值到上限之间线性减少；达到上限时只允许一个。
+        """
+        if not self.ceiling_bytes or self.rss <= self.soft_limit:
+            return workers
+        span = max(1, self.ceiling_bytes - self.soft_limit)
+        headroom = max(0.0, 1 - (self.rss - self.soft_limit) / span)
+        return max(1, math.ceil(workers * headroom))
+
+    async def admit(self, slot: int, workers: int):
+        """
+        批量爬取的 worker 在领取下一个URL前调用，序号超出允许范围时等待内存回落
+
+        Args:
+            slot: worker 序号 (从0开始)
+            workers: worker 总数
+        """
+        if slot < self.allowed_workers(workers):
+            return
+        async with self._capacity:
+            while slot >= self.allowed_workers(workers):
+                await self._capacity.wait()
+
+    async def sample(self):
+        """采样一次内存并按压力采取措施"""
+        self.rss = await asyncio.to_thread(process_tree_rss)
+        self.pressure = self.rss / self.ceiling_bytes if self.ceiling_bytes else 0.0
+        MEMORY_RSS.set(self.rss)
+        MEMORY_PRESSURE.set(self.pressure)
+        if self._gc_timer is not None:
+            self._gc_timer.flush()
+
+        async with self._capacity:
+            self._capacity.notify_all()
+
+        if not self.ceiling_bytes or self.rss <= self.soft_limit:
+            return
+
+        now = time.monotonic()
+        if now - self._last_recycle >= self.gc_cooldown and self.browser_pool is not None:
+            self._last_recycle = now
+            browser_id = await self.browser_pool.request_recycle()
+            if browser_id:
+                self.recycles += 1
+                logger.warning(
+                    f"内存压力 {self.pressure:.0%} ({self.rss / 1024 / 1024:.0f} MiB)，回收浏览器: {browser_id}"
+                )
+
+        if now - self._last_gc >= self.gc_cooldown:
+            self._last_gc = now
+            self.gc_runs += 1
+            GOVERNOR_GC_RUNS.inc()
+            collected = gc.collect()
+            logger.info(f"内存压力 {self.pressure:.0%}，完整 GC 回收 {collected} 个对象")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                logger.warning(f"内存采样失败: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """启动采样，并冻结启动期间创建的对象"""
+        if self._task is not None:
+            return
+        if settings.gc_freeze_on_start and hasattr(gc, "freeze"):
+            gc.collect()
+            gc.freeze()
+        if self._gc_timer is None:
+            self._gc_timer = _GCPauseTimer()
+            gc.callbacks.append(self._gc_timer)
+        self._task = asyncio.create_task(self._run())
+        if self.ceiling_bytes:
+            logger.info(f"内存调控已启动: 上限 {self.ceiling_bytes / 1024 / 1024:.0f} MiB")
+
+    async def stop(self):
+        """停止采样"""
+        if self._gc_timer is not None:
+            gc.callbacks.remove(self._gc_timer)
+            self._gc_timer = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取内存调控状态"""
+        return {
+            "rss_bytes": self.rss,
+            "ceiling_bytes": self.ceiling_bytes,
+            "pressure": round(self.pressure, 4),
+            "gc_runs": self.gc_runs,
+            "browser_recycles": self.recycles,
+        }
@@ -0,0 +1,111 @@
+"""
+批量任务进度合并写入
+
+每个URL完成时只在内存中更新计数 (同一事件循环内的普通赋值，不需要锁)，
+由每个任务唯一的刷新协程按固定间隔或累计一定数量的URL后写入任务存储:
+- 写入串行执行，进度不会乱序，也不会出现大量未被引用的后台任务
+- close() 在 complete_task 之前调用并等待进行中的写入结束，之后不再有进度写入
+"""
+
+import asyncio
+from typing import Optional
+
+from app.config import settings
+from app.services.task_service import TaskService
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProgressAggregator:
+    """
+    单个批量任务的进度合并器
+
+    Args:
+        task_service: 任务服务
+        task_id: 任务ID
+        total: URL总数 (深度爬取时随链接发现增长)
+        interval: 刷新间隔 (秒)
+        every: 累计完成多少个URL后立即刷新
+    """
+
+    def __init__(
+        self,
+        task_service: TaskService,
+        task_id: str,
+        total: int,
+        interval: Optional[float] = None,
+        every: Optional[int] = None
+    ):
+        self.task_service = task_service
+        self.task_id = task_id
+        self.interval = interval or settings.progress_flush_interval
+        self.every = every or settings.progress_flush_every
+
+        self.completed = 0
+        self.failed = 0
+        self.total = total
+        self.result_count = 0
+        self.flushes = 0
+        self._pending = 0
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def update(self, completed: int, failed: int, total: int, result_count: int):
+        """
+        记录最新进度，达到 every 个URL时提前唤醒刷新协程
+
+        Args:
+            completed: 已完成数量 (含失败)
+            failed: 已失败数量
+            total: 总数量
+            result_count: 已写入的结果数量
+        """
+        self._pending += max(0, completed - self.completed)
+        self.completed = completed
+        self.failed = failed
+        self.total = max(self.total, total)
+        self.result_count = max(self.result_count, result_count)
+        if self._pending >= self.every:
+            self._wake.set()
+
+    async def flush(self):
+        """把当前进度写入任务存储 (没有新进度时跳过)"""
+        if not self._pending:
+            return
+        self._pending = 0
+        self.flushes += 1
+        try:
+            await self.task_service.update_task_progress(
+                self.task_id, self.completed, self.total, self.result_count, self.failed
+            )
+        except Exception as e:
+            logger.warning(f"更新任务进度失败: {self.task_id}, 错误: {e}")
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """写入尚未写入的进度并停止刷新协程"""
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def cancel(self):
+        """异常退出时中止刷新协程"""
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
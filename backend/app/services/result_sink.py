@@ -0,0 +1,356 @@
+"""
+批量任务结果的增量写入
+
+每个URL完成后立即追加写入结果存储，而不是在任务结束时一次性保存：
+- 进程崩溃只丢失正在写入的一条结果，续跑时跳过已写入的URL
+- 内存中不再保留整个批次的结果
+- 结果按写入顺序编号 (偏移)，任务运行中即可分页读取
+
+后端:
+- jsonl (默认): 按任务分目录的追加写 JSONL 分段文件，每段固定条数，按偏移定位分段
+- sqlite: 单表存储，适合结果量不大、希望少量文件的部署
+"""
+
+import asyncio
+import shutil
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models.schemas import CrawlResult
+from app.utils.logging import get_logger
+from app.utils.serialization import json_loads
+
+logger = get_logger(__name__)
+
+
+def _encode(index: int, result: CrawlResult) -> str:
+    # 序号与成功标志放在结果之前，续跑时无需解析整条结果
+    success = "true" if result.success else "false"
+    return f'{{"index":{index},"success":{success},"result":{result.model_dump_json()}}}'
+
+
+class ResultSink(ABC):
+    """结果写入接口"""
+
+    @abstractmethod
+    async def append(self, task_id: str, index: int, result: CrawlResult) -> int:
+        """
+        追加一条结果
+
+        Args:
+            task_id: 任务ID
+            index: URL在批次中的序号
+            result: 爬取结果
+
+        Returns:
+            int: 该结果的偏移 (从0开始)
+        """
+
+    @abstractmethod
+    async def read_raw(
+        self,
+        task_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """按写入顺序读取未经模型校验的结果字典 [(URL序号, 结果)]，供接口直接投影字段"""
+
+    async def read(
+        self,
+        task_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Tuple[int, CrawlResult]]:
+        """按写入顺序读取 [(URL序号, 结果)]"""
+        entries = await self.read_raw(task_id, offset, limit)
+        return [(index, CrawlResult.model_validate(data)) for index, data in entries]
+
+    @abstractmethod
+    async def count(self, task_id: str) -> int:
+        """已写入的结果数量"""
+
+    @abstractmethod
+    async def completed_indices(self, task_id: str) -> Dict[int, bool]:
+        """已写入结果的URL序号及是否成功 {URL序号: success}，用于续跑"""
+
+    @abstractmethod
+    async def delete(self, task_id: str) -> None:
+        """删除任务的全部结果"""
+
+    def release(self, task_id: str) -> None:
+        """任务结束后释放为该任务缓存的写入状态 (结果本身保留)"""
+
+    async def close(self) -> None:
+        """释放资源"""
+
+
+class JsonlResultSink(ResultSink):
+    """
+    JSONL 分段文件
+
+    目录结构: {base_dir}/{task_id}/{段号:06d}.jsonl，每段 segment_size 条结果，
+    偏移 N 位于第 N // segment_size 段的第 N % segment_size 行。
+
+    本进程写入的任务在内存中记录条数 (追加时更新，任务结束时释放)；
+    其他进程 (worker) 写入的任务读取时统计文件。
+    """
+
+    # 统计行数时每次读取的字节数
+    SCAN_CHUNK = 1024 * 1024
+
+    def __init__(self, base_dir: Optional[str] = None, segment_size: Optional[int] = None):
+        self.base_dir = Path(base_dir or settings.result_sink_dir)
+        self.segment_size = max(1, segment_size or settings.result_segment_size)
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _task_dir(self, task_id: str) -> Path:
+        return self.base_dir / task_id
+
+    def _segment(self, task_id: str, number: int) -> Path:
+        return self._task_dir(task_id) / f"{number:06d}.jsonl"
+
+    def _scan_count(self, task_id: str, repair: bool = False) -> int:
+        """
+        从文件统计已写入的完整行数 (只分块读取最后一段)
+
+        repair=True 时截掉崩溃时写了一半的最后一行
+        """
+        segments = sorted(self._task_dir(task_id).glob("*.jsonl"))
+        if not segments:
+            return 0
+        last = segments[-1]
+        complete = 0
+        # 最后一个换行符之后的位置，即完整行的总字节数
+        end = 0
+        position = 0
+        with open(last, "rb") as f:
+            while chunk := f.read(self.SCAN_CHUNK):
+                newlines = chunk.count(b"\n")
+                if newlines:
+                    complete += newlines
+                    end = position + chunk.rfind(b"\n") + 1
+                position += len(chunk)
+        if repair and position > end:
+            logger.warning(f"截断不完整的结果行: {last}")
+            with open(last, "r+b") as f:
+                f.truncate(end)
+        return (len(segments) - 1) * self.segment_size + complete
+
+    def _load_count(self, task_id: str) -> int:
+        """写入位置 (本进程写入的任务缓存条数，避免每次统计文件)"""
+        count = self._counts.get(task_id)
+        if count is None:
+            count = self._counts[task_id] = self._scan_count(task_id, repair=True)
+        return count
+
+    def _current_count(self, task_id: str) -> int:
+        """读取时的结果条数: 本进程正在写入的任务直接使用内存中的条数"""
+        count = self._counts.get(task_id)
+        return self._scan_count(task_id) if count is None else count
+
+    def _append(self, task_id: str, line: str) -> int:
+        with self._lock:
+            offset = self._load_count(task_id)
+            path = self._segment(task_id, offset // self.segment_size)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self._counts[task_id] = offset + 1
+            return offset
+
+    async def append(self, task_id: str, index: int, result: CrawlResult) -> int:
+        return await asyncio.to_thread(self._append, task_id, _encode(index, result))
+
+    def _read_lines(self, task_id: str, offset: int, limit: Optional[int]) -> List[str]:
+        total = self._current_count(task_id)
+        end = total if limit is None else min(total, offset + limit)
+        lines: List[str] = []
+        position = offset
+        while position < end:
+            number, skip = divmod(position, self.segment_size)
+            with open(self._segment(task_id, number), "r", encoding="utf-8") as f:
+                for i, line in enumerate(f):
+                    if i < skip:
+                        continue
+                    lines.append(line)
+                    position += 1
+                    if position >= end or i + 1 >= self.segment_size:
+                        break
+        return lines
+
+    async def read_raw(
+        self,
+        task_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        lines = await asyncio.to_thread(self._read_lines, task_id, max(0, offset), limit)
+        entries = []
+        for line in lines:
+            entry = json_loads(line)
+            entries.append((entry["index"], entry["result"]))
+        return entries
+
+    async def count(self, task_id: str) -> int:
+        return await asyncio.to_thread(self._current_count, task_id)
+
+    async def completed_indices(self, task_id: str) -> Dict[int, bool]:
+        def _scan():
+            total = self._current_count(task_id)
+            done: Dict[int, bool] = {}
+            for number in range((total + self.segment_size - 1) // self.segment_size):
+                with open(self._segment(task_id, number), "r", encoding="utf-8") as f:
+                    for i, line in enumerate(f):
+                        if number * self.segment_size + i >= total:
+                            break
+                        # 只解析行首的 "index" 与 "success" 字段
+                        head, _, _ = line.partition(',"result":')
+                        entry = json_loads(head + "}")
+                        done[entry["index"]] = entry["success"]
+            return done
+
+        return await asyncio.to_thread(_scan)
+
+    async def delete(self, task_id: str) -> None:
+        def _delete():
+            with self._lock:
+                self._counts.pop(task_id, None)
+                shutil.rmtree(self._task_dir(task_id), ignore_errors=True)
+
+        await asyncio.to_thread(_delete)
+
+    def release(self, task_id: str) -> None:
+        with self._lock:
+            self._counts.pop(task_id, None)
+
+
+class SQLiteResultSink(ResultSink):
+    """SQLite 结果表 (WAL 模式)"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS task_results (
+            task_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            url_index INTEGER NOT NULL,
+            success INTEGER NOT NULL,
+            result TEXT NOT NULL,
+            PRIMARY KEY (task_id, seq)
+        );
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or settings.result_sink_db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, fn, *args):
+        with self._conn_lock:
+            return fn(self._connect(), *args)
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(self._execute, fn, *args)
+
+    async def append(self, task_id: str, index: int, result: CrawlResult) -> int:
+        data = result.model_dump_json()
+
+        def _append(conn: sqlite3.Connection):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq = conn.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM task_results WHERE task_id = ?",
+                    (task_id,),
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO task_results (task_id, seq, url_index, success, result) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (task_id, seq, index, int(result.success), data),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return seq
+
+        return await self._run(_append)
+
+    async def read_raw(
+        self,
+        task_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        def _read(conn: sqlite3.Connection):
+            return conn.execute(
+                "SELECT url_index, result FROM task_results WHERE task_id = ? AND seq >= ? "
+                "ORDER BY seq LIMIT ?",
+                (task_id, max(0, offset), -1 if limit is None else limit),
+            ).fetchall()
+
+        rows = await self._run(_read)
+        return [(index, json_loads(data)) for index, data in rows]
+
+    async def count(self, task_id: str) -> int:
+        def _count(conn: sqlite3.Connection):
+            return conn.execute(
+                "SELECT COUNT(*) FROM task_results WHERE task_id = ?", (task_id,)
+            ).fetchone()[0]
+
+        return await self._run(_count)
+
+    async def completed_indices(self, task_id: str) -> Dict[int, bool]:
+        def _scan(conn: sqlite3.Connection):
+            return conn.execute(
+                "SELECT url_index, success FROM task_results WHERE task_id = ?", (task_id,)
+            ).fetchall()
+
+        rows = await self._run(_scan)
+        return {index: bool(success) for index, success in rows}
+
+    async def delete(self, task_id: str) -> None:
+        def _delete(conn: sqlite3.Connection):
+            conn.execute("DELETE FROM task_results WHERE task_id = ?", (task_id,))
+
+        await self._run(_delete)
+
+    async def close(self) -> None:
+        def _close():
+            with self._conn_lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+        await asyncio.to_thread(_close)
+
+
+def create_result_sink(backend: Optional[str] = None) -> ResultSink:
+    """
+    根据配置创建结果存储
+
+    Args:
+        backend: 存储类型 ("jsonl" 或 "sqlite")，默认读取配置
+
+    Returns:
+        ResultSink: 结果存储实例
+    """
+    backend = (backend or settings.result_sink_backend).lower()
+    if backend == "jsonl":
+        return JsonlResultSink()
+    if backend == "sqlite":
+        return SQLiteResultSink()
+    raise ValueError(f"不支持的结果存储类型: {backend}")
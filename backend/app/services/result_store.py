@@ -0,0 +1,116 @@
+"""
+爬取结果内容存储
+
+markdown / HTML 等大字段按内容哈希 (SHA-256) 寻址，gzip 压缩后写入 data/results，
+相同内容只存储一次；CrawlResult 中仅保留引用ID，客户端按需懒加载。
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+from app.models.schemas import CrawlResult
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+BLOB_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ResultBlobStore:
+    """
+    内容寻址的压缩 Blob 存储
+
+    文件布局: {base_dir}/{id[:2]}/{id}.gz
+    """
+
+    def __init__(self, base_dir: Optional[str] = None, inline_max_chars: Optional[int] = None):
+        self.base_dir = Path(base_dir or settings.result_blob_dir)
+        # 不超过该长度的内容仍内联存储在结果中
+        self.inline_max_chars = (
+            settings.result_inline_max_chars if inline_max_chars is None else inline_max_chars
+        )
+
+    @staticmethod
+    def is_valid_id(blob_id: str) -> bool:
+        return bool(BLOB_ID_PATTERN.match(blob_id))
+
+    def _path(self, blob_id: str) -> Path:
+        return self.base_dir / blob_id[:2] / f"{blob_id}.gz"
+
+    def _write(self, blob_id: str, data: bytes):
+        path = self._path(blob_id)
+        if path.exists():
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再原子替换，避免读到不完整的内容
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read(self, blob_id: str) -> Optional[bytes]:
+        path = self._path(blob_id)
+        if not path.exists():
+            return None
+        with open(path, "rb") as f:
+            return gzip.decompress(f.read())
+
+    async def put(self, content: str) -> str:
+        """
+        写入内容 (已存在则跳过)
+
+        Args:
+            content: 文本内容
+
+        Returns:
+            str: 内容ID (SHA-256)
+        """
+        data = content.encode("utf-8")
+        blob_id = hashlib.sha256(data).hexdigest()
+        await asyncio.to_thread(self._write, blob_id, data)
+        return blob_id
+
+    async def get(self, blob_id: str) -> Optional[bytes]:
+        """
+        读取内容
+
+        Args:
+            blob_id: 内容ID
+
+        Returns:
+            Optional[bytes]: 解压后的 UTF-8 字节，不存在则返回None
+        """
+        if not self.is_valid_id(blob_id):
+            return None
+        return await asyncio.to_thread(self._read, blob_id)
+
+    async def offload(self, result: CrawlResult) -> CrawlResult:
+        """
+        将结果中的大字段转存到 Blob 存储，并替换为引用ID
+
+        Args:
+            result: 爬取结果 (原地修改)
+
+        Returns:
+            CrawlResult: 修改后的结果
+        """
+        if result.markdown and len(result.markdown) > self.inline_max_chars:
+            result.markdown_ref = await self.put(result.markdown)
+            result.markdown = None
+        if result.cleaned_html and len(result.cleaned_html) > self.inline_max_chars:
+            result.html_ref = await self.put(result.cleaned_html)
+            result.cleaned_html = None
+        return result
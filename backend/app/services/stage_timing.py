@@ -0,0 +1,197 @@
+"""
+单个URL爬取的分阶段计时
+
+计时器保存在 contextvar 中，crawl4ai 内部的调用 (在同一任务或其派生任务中执行)
+也能记录到当前URL的计时，多个页面共享同一浏览器时互不干扰。
+
+阶段 (秒):
+- queue_wait: 等待调度槽位 (主机并发/限速/退避 + 全局并发)
+- browser_acquire: 等待浏览器池页面槽位
+- navigation: 页面导航 (goto 开始到返回)
+- wait_for: 导航完成到开始读取 HTML (wait_for 条件、延迟、js_code 等)
+- markdown: HTML 清理、链接提取与 Markdown 生成
+- fetch: crawl4ai arun 中除 markdown 以外的部分
+- postprocess: 将 crawl4ai 结果转换为 CrawlResult
+- total: crawl_single 总耗时
+- cache_lookup: 命中缓存时读取缓存的耗时
+- conditional_request: 增量重爬时条件请求 (ETag / Last-Modified) 的耗时
+- fingerprint: 计算内容指纹的耗时
+
+任务级统计 (TaskTimingStats) 额外包含 serialization: 结果编码并写入结果存储的耗时。
+"""
+
+import math
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 用于区分导航与等待阶段的 crawl4ai 钩子
+TIMING_HOOKS = ("before_goto", "after_goto", "before_retrieve_html")
+
+
+class StageTimer:
+    """单个URL的阶段计时"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._marks: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def mark(self, name: str):
+        self._marks[name] = time.perf_counter()
+
+    def between(self, stage: str, start_mark: str, end_mark: str):
+        """以两个时间点之差记录阶段耗时，任一时间点缺失时不记录"""
+        start, end = self._marks.get(start_mark), self._marks.get(end_mark)
+        if start is not None and end is not None and end >= start:
+            self.add(stage, end - start)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {stage: round(seconds, 4) for stage, seconds in self.stages.items()}
+
+
+_timer: ContextVar[Optional[StageTimer]] = ContextVar("crawl_stage_timer", default=None)
+
+
+def start_timing() -> StageTimer:
+    """为当前URL开始一组新的阶段计时"""
+    timer = StageTimer()
+    _timer.set(timer)
+    return timer
+
+
+def record_stage(stage: str, seconds: float):
+    """累加当前URL某个阶段的耗时，不在计时范围内时忽略"""
+    timer = _timer.get()
+    if timer is not None:
+        timer.add(stage, seconds)
+
+
+def _mark_hook(name: str, previous):
+    async def hook(*args, **kwargs):
+        timer = _timer.get()
+        if timer is not None:
+            timer.mark(name)
+        if previous is not None:
+            result = previous(*args, **kwargs)
+            if hasattr(result, "__await__"):
+                result = await result
+            return result
+        # 与 crawl4ai 未设置钩子时的返回值一致
+        return args[0] if args else None
+    return hook
+
+
+def instrument_crawler(crawler):
+    """
+    为 crawl4ai 爬虫实例加上阶段计时
+
+    - 包装 aprocess_html，计为 "markdown" 阶段
+    - 通过爬取策略的钩子记录导航开始/结束与读取 HTML 的时间点
+
+    crawl4ai 版本不提供对应接口时跳过该部分计时。
+
+    Args:
+        crawler: AsyncWebCrawler 实例
+    """
+    process_html = getattr(crawler, "aprocess_html", None)
+    if process_html is None:
+        logger.warning("当前 crawl4ai 版本不支持 Markdown 阶段计时")
+    else:
+        async def timed_process_html(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await process_html(*args, **kwargs)
+            finally:
+                record_stage("markdown", time.perf_counter() - start)
+
+        crawler.aprocess_html = timed_process_html
+
+    strategy = getattr(crawler, "crawler_strategy", None)
+    if strategy is None or not hasattr(strategy, "set_hook"):
+        logger.warning("当前 crawl4ai 版本不支持导航阶段计时")
+        return
+    existing = getattr(strategy, "hooks", {}) or {}
+    for name in TIMING_HOOKS:
+        strategy.set_hook(name, _mark_hook(name, existing.get(name)))
+
+
+class TimingHistogram:
+    """
+    对数分桶直方图
+
+    相邻桶边界相差 GROWTH 倍，分位数相对误差约 5%；
+    内存占用与样本数无关，适合百万级URL的批量任务。
+    """
+
+    MIN_SECONDS = 0.001
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.count = 0
+        self._buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float):
+        if seconds <= self.MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = math.ceil(math.log(seconds / self.MIN_SECONDS, self.GROWTH))
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self.count += 1
+
+    def _value(self, bucket: int) -> float:
+        # 桶内取几何中点
+        if bucket == 0:
+            return self.MIN_SECONDS
+        return self.MIN_SECONDS * self.GROWTH ** (bucket - 0.5)
+
+    def percentile(self, p: float) -> float:
+        """第 p 百分位数 (秒)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return self._value(bucket)
+        return self._value(max(self._buckets))
+
+
+class TaskTimingStats:
+    """按阶段汇总一个任务内所有URL的耗时"""
+
+    def __init__(self):
+        self._histograms: Dict[str, TimingHistogram] = {}
+
+    def add(self, stage: str, seconds: float):
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            histogram = self._histograms[stage] = TimingHistogram()
+        histogram.add(seconds)
+
+    def add_timings(self, timings: Optional[Dict[str, float]]):
+        for stage, seconds in (timings or {}).items():
+            self.add(stage, seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        各阶段的 p50 / p95
+
+        Returns:
+            Dict[str, Dict[str, float]]: {阶段: {"count", "p50", "p95"}}，耗时单位为秒
+        """
+        return {
+            stage: {
+                "count": histogram.count,
+                "p50": round(histogram.percentile(50), 4),
+                "p95": round(histogram.percentile(95), 4),
+            }
+            for stage, histogram in self._histograms.items()
+        }
@@ -0,0 +1,116 @@
+"""
+任务事件广播
+
+批量爬取过程中的进度与单个URL完成事件通过 TaskEventBroker 推送给
+SSE / WebSocket 订阅者，前端无需轮询任务列表。
+"""
+
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.models.schemas import CrawlResult, CrawlStatus, TaskProgress
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 终态事件名，订阅者收到后结束订阅
+TERMINAL_EVENTS = {
+    CrawlStatus.COMPLETED.value,
+    CrawlStatus.FAILED.value,
+    CrawlStatus.CANCELLED.value,
+}
+
+
+def summarize_result(result: CrawlResult) -> Dict[str, Any]:
+    """
+    生成爬取结果的精简摘要 (不包含 markdown/HTML 正文)
+
+    Args:
+        result: 爬取结果
+
+    Returns:
+        Dict[str, Any]: 结果摘要
+    """
+    return {
+        "url": result.url,
+        "success": result.success,
+        "status_code": result.status_code,
+        "title": result.title,
+        "content_length": len(result.markdown) if result.markdown else 0,
+        "execution_time": result.execution_time,
+        "error_message": result.error_message,
+    }
+
+
+class TaskEventBroker:
+    """
+    按任务ID分发事件的内存广播器
+
+    每个订阅者持有一个有界队列；消费过慢时丢弃最旧的事件，
+    保证发布方 (爬取流程) 永远不会被阻塞。
+    """
+
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def subscriber_count(self, task_id: Optional[str] = None) -> int:
+        if task_id is not None:
+            return len(self._subscribers.get(task_id, []))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    @contextmanager
+    def subscribe(self, task_id: str) -> Iterator[asyncio.Queue]:
+        """
+        订阅任务事件
+
+        用法:
+            with broker.subscribe(task_id) as queue:
+                event = await queue.get()
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(task_id, []).append(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(task_id, [])
+            if queue in queues:
+                queues.remove(queue)
+            if not queues:
+                self._subscribers.pop(task_id, None)
+
+    def publish(self, task_id: str, event: str, data: Dict[str, Any]):
+        """
+        发布事件 (非阻塞)
+
+        Args:
+            task_id: 任务ID
+            event: 事件名 (progress / result / completed / failed / cancelled)
+            data: 事件数据
+        """
+        queues = self._subscribers.get(task_id)
+        if not queues:
+            return
+
+        message = {"event": event, "data": data}
+        for queue in queues:
+            if queue.full():
+                # 丢弃最旧的事件，为新事件腾出空间
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def publish_progress(self, progress: TaskProgress):
+        """发布进度快照，终态时同时发布终态事件"""
+        data = progress.model_dump(mode="json")
+        self.publish(progress.task_id, "progress", data)
+        if progress.status.value in TERMINAL_EVENTS:
+            self.publish(progress.task_id, progress.status.value, data)
+
+    def publish_result(self, task_id: str, result: CrawlResult, completed: int, total: int):
+        """发布单个URL完成事件"""
+        self.publish(task_id, "result", {
+            "completed": completed,
+            "total": total,
+            "result": summarize_result(result),
+        })
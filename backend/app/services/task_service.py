@@ -2,12 +2,19 @@
 任务管理服务
 """
 
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
 import asyncio
+import weakref
 
-from app.models.schemas import TaskInfo, CrawlStatus, CrawlResult
+from app.config import settings
+from app.models.schemas import TaskInfo, TaskProgress, CrawlStatus, CrawlResult
+from app.services.result_sink import ResultSink, create_result_sink
+from app.services.result_store import ResultBlobStore
+from app.services.task_events import TaskEventBroker
+from app.services.task_store import FINISHED_STATUSES, TaskStore, create_task_store
 from app.utils.logging import get_logger
+from app.utils.metrics import TASK_RESULTS_WRITTEN, TASK_TRANSITIONS
 
 logger = get_logger(__name__)
 
@@ -16,13 +23,118 @@ class TaskService:
     任务管理服务
     
     管理爬取任务的生命周期，包括创建、更新状态、进度追踪等。
-    目前使用内存存储，生产环境建议使用数据库。
+    任务通过可插拔的 TaskStore 持久化 (默认 SQLite)，
+    每个任务使用独立的锁，不同批量任务之间的更新互不阻塞。
     """
     
-    def __init__(self):
-        # 内存存储任务信息 (生产环境应使用数据库)
-        self.tasks: Dict[str, TaskInfo] = {}
-        self._lock = asyncio.Lock()
+    def __init__(
+        self,
+        store: Optional[TaskStore] = None,
+        events: Optional[TaskEventBroker] = None,
+        blob_store: Optional[ResultBlobStore] = None,
+        result_sink: Optional[ResultSink] = None
+    ):
+        self.store = store or create_task_store()
+        # 结果大字段存储，任务中仅保存引用
+        self.blob_store = blob_store or ResultBlobStore()
+        # 批量任务结果按URL增量写入，任务记录只保存结果数量
+        self.results = result_sink or create_result_sink()
+        # 任务事件广播 (SSE / WebSocket)
+        self.events = events or TaskEventBroker()
+        # 任务级锁，不再使用时自动回收
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        # 未结束任务的进度快照，进度查询无需访问存储
+        self._progress: Dict[str, TaskProgress] = {}
+        # 本进程内正在执行的任务，取消时中止
+        self._runners: Dict[str, asyncio.Task] = {}
+    
+    def _record_progress(self, task: TaskInfo, cache: bool = True):
+        """刷新进度快照并推送给订阅者，任务结束后移除快照 (之后从存储读取)"""
+        snapshot = TaskProgress.from_task(task)
+        if task.status in FINISHED_STATUSES or not cache:
+            self._progress.pop(task.task_id, None)
+        else:
+            self._progress[task.task_id] = snapshot
+        self.events.publish_progress(snapshot)
+    
+    def register_runner(self, task_id: str, runner: asyncio.Task):
+        """
+        登记执行任务的 asyncio.Task，取消任务时将其中止
+        
+        Args:
+            task_id: 任务ID
+            runner: 执行爬取的 asyncio.Task
+        """
+        self._runners[task_id] = runner
+        
+        def _unregister(_):
+            if self._runners.get(task_id) is runner:
+                del self._runners[task_id]
+        
+        runner.add_done_callback(_unregister)
+    
+    def abort_runner(self, task_id: str) -> bool:
+        """
+        中止本进程内正在执行的任务
+        
+        Args:
+            task_id: 任务ID
+            
+        Returns:
+            bool: 是否找到并中止了执行中的任务
+        """
+        runner = self._runners.pop(task_id, None)
+        if runner is None or runner.done():
+            return False
+        runner.cancel()
+        logger.info(f"已中止执行中的任务: {task_id}")
+        return True
+    
+    async def is_cancelled(self, task_id: str) -> bool:
+        """
+        从存储读取任务是否已被取消 (取消可能发生在其他进程)
+        
+        Args:
+            task_id: 任务ID
+            
+        Returns:
+            bool: 任务是否已取消
+        """
+        task = await self.store.get(task_id, include_results=False)
+        return task is not None and task.status == CrawlStatus.CANCELLED
+    
+    def _task_lock(self, task_id: str) -> asyncio.Lock:
+        """获取任务级别的锁"""
+        lock = self._locks.get(task_id)
+        if lock is None:
+            lock = self._locks[task_id] = asyncio.Lock()
+        return lock
+    
+    async def _update(self, task_id: str, mutate: Callable[[TaskInfo], bool]) -> bool:
+        """
+        在任务锁内读取-修改-保存任务
+        
+        任务锁只在本进程内有效，跨进程 (API 与 worker) 的并发更新由 store.update 保证原子性，
+        mutate 总是基于最新的任务状态执行。
+        
+        Args:
+            task_id: 任务ID
+            mutate: 修改函数，返回False表示不保存
+            
+        Returns:
+            bool: 是否更新成功
+        """
+        def apply(task: TaskInfo):
+            if mutate(task) is False:
+                return False
+            task.updated_at = datetime.now()
+        
+        async with self._task_lock(task_id):
+            task = await self.store.update(task_id, apply)
+            if task is None:
+                return False
+            self._record_progress(task)
+            return True
     
     async def create_task(self, task_info: TaskInfo) -> TaskInfo:
         """
@@ -34,8 +146,11 @@ class TaskService:
         Returns:
             TaskInfo: 创建的任务信息
         """
-        async with self._lock:
-            self.tasks[task_info.task_id] = task_info
+        async with self._task_lock(task_info.task_id):
+            await self.store.save(task_info)
+            # 任务可能由其他 worker 进程执行，只有本进程更新过的任务才缓存快照
+            self._record_progress(task_info, cache=False)
+            TASK_TRANSITIONS.labels(task_info.status.value).inc()
             logger.info(f"任务已创建: {task_info.task_id}")
             return task_info
     
@@ -43,22 +158,110 @@ class TaskService:
         """
         获取任务信息
         
+        增量写入的结果不超过 task_inline_results_max 条时按URL原始顺序内联返回，
+        更多结果不再整体加载到内存，由调用方通过 get_results 分页读取。
+        
         Args:
             task_id: 任务ID
             
         Returns:
             Optional[TaskInfo]: 任务信息，如果不存在则返回None
         """
-        return self.tasks.get(task_id)
+        task = await self.store.get(task_id)
+        if (
+            task is not None
+            and task.results is None
+            and 0 < task.result_count <= settings.task_inline_results_max
+        ):
+            entries = await self.results.read(task_id, limit=task.result_count)
+            task.results = [result for _, result in sorted(entries, key=lambda e: e[0])]
+        return task
     
-    async def get_all_tasks(self) -> List[TaskInfo]:
+    async def append_result(self, task_id: str, index: int, result: CrawlResult) -> int:
         """
-        获取所有任务信息
+        写入单个URL的结果 (大字段先转存到内容存储)
         
+        Args:
+            task_id: 任务ID
+            index: URL在批次中的序号
+            result: 爬取结果
+            
         Returns:
-            List[TaskInfo]: 任务信息列表
+            int: 写入后的结果数量
         """
-        return list(self.tasks.values())
+        await self.blob_store.offload(result)
+        count = await self.results.append(task_id, index, result) + 1
+        TASK_RESULTS_WRITTEN.inc()
+        return count
+    
+    async def get_results(
+        self,
+        task_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        按写入顺序分页读取已写入的结果 (任务运行中也可读取)
+        
+        返回未经模型校验的字典，供接口直接投影字段；
+        结果保存在任务记录中的任务 (未使用增量写入) 从记录中切片。
+        
+        Args:
+            task_id: 任务ID
+            offset: 起始偏移
+            limit: 最多返回条数
+            
+        Returns:
+            List[Tuple[int, Dict[str, Any]]]: [(URL序号, 结果)]
+        """
+        entries = await self.results.read_raw(task_id, offset, limit)
+        if entries:
+            return entries
+        
+        task = await self.store.get(task_id)
+        if task is None or not task.results:
+            return []
+        end = None if limit is None else offset + limit
+        return [
+            (offset + i, result.model_dump(mode="json"))
+            for i, result in enumerate(task.results[offset:end])
+        ]
+    
+    async def get_progress(self, task_id: str) -> Optional[TaskProgress]:
+        """
+        获取任务进度快照 (不加载爬取结果)
+        
+        Args:
+            task_id: 任务ID
+            
+        Returns:
+            Optional[TaskProgress]: 进度快照，如果任务不存在则返回None
+        """
+        snapshot = self._progress.get(task_id)
+        if snapshot is not None:
+            return snapshot
+        
+        task = await self.store.get(task_id, include_results=False)
+        return TaskProgress.from_task(task) if task else None
+    
+    async def list_tasks(
+        self,
+        status: Optional[CrawlStatus] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[List[TaskInfo], int]:
+        """
+        分页获取任务列表 (不包含爬取结果)
+        
+        Args:
+            status: 按状态过滤
+            offset: 偏移量
+            limit: 每页数量
+            
+        Returns:
+            Tuple[List[TaskInfo], int]: 任务列表和符合条件的总数
+        """
+        return await self.store.list(status=status, offset=offset, limit=limit)
     
     async def update_task_status(self, task_id: str, status: CrawlStatus) -> bool:
         """
@@ -71,19 +274,28 @@ class TaskService:
         Returns:
             bool: 是否更新成功
         """
-        async with self._lock:
-            if task_id in self.tasks:
-                self.tasks[task_id].status = status
-                self.tasks[task_id].updated_at = datetime.now()
-                
-                if status == CrawlStatus.COMPLETED or status == CrawlStatus.FAILED:
-                    self.tasks[task_id].completed_at = datetime.now()
-                
-                logger.info(f"任务状态已更新: {task_id} -> {status}")
-                return True
-            return False
+        def mutate(task: TaskInfo):
+            # 已结束 (如已取消) 的任务不再变更状态
+            if task.status in FINISHED_STATUSES:
+                return False
+            task.status = status
+            if status == CrawlStatus.COMPLETED or status == CrawlStatus.FAILED:
+                task.completed_at = datetime.now()
+        
+        updated = await self._update(task_id, mutate)
+        if updated:
+            TASK_TRANSITIONS.labels(status.value).inc()
+            logger.info(f"任务状态已更新: {task_id} -> {status}")
+        return updated
     
-    async def update_task_progress(self, task_id: str, completed: int, total: int) -> bool:
+    async def update_task_progress(
+        self,
+        task_id: str,
+        completed: int,
+        total: int,
+        result_count: Optional[int] = None,
+        failed: Optional[int] = None
+    ) -> bool:
         """
         更新任务进度
         
@@ -91,53 +303,86 @@ class TaskService:
             task_id: 任务ID
             completed: 已完成数量
             total: 总数量
+            result_count: 已写入的结果数量
+            failed: 已失败数量
             
         Returns:
             bool: 是否更新成功
         """
-        async with self._lock:
-            if task_id in self.tasks:
-                self.tasks[task_id].completed_urls = completed
-                self.tasks[task_id].progress = (completed / total * 100) if total > 0 else 0
-                self.tasks[task_id].updated_at = datetime.now()
-                
-                logger.debug(f"任务进度已更新: {task_id} -> {completed}/{total}")
-                return True
-            return False
+        def mutate(task: TaskInfo):
+            if task.status in FINISHED_STATUSES:
+                return False
+            task.completed_urls = completed
+            if failed is not None:
+                task.failed_urls = failed
+            # 深度爬取时总数随链接发现而增长
+            task.total_urls = max(task.total_urls, total)
+            task.progress = (completed / total * 100) if total > 0 else 0
+            if result_count is not None:
+                # 结果写入可能乱序完成，只前进不后退
+                task.result_count = max(task.result_count, result_count)
+        
+        updated = await self._update(task_id, mutate)
+        if updated:
+            logger.debug("任务进度已更新: %s -> %d/%d", task_id, completed, total)
+        return updated
     
     async def complete_task(
         self, 
         task_id: str, 
-        results: List[CrawlResult],
         completed_urls: int,
-        failed_urls: int
+        failed_urls: int,
+        result_count: Optional[int] = None,
+        results: Optional[List[CrawlResult]] = None,
+        timing_stats: Optional[Dict[str, Dict[str, float]]] = None
     ) -> bool:
         """
         完成任务
         
         Args:
             task_id: 任务ID
-            results: 爬取结果列表
             completed_urls: 成功完成的URL数量
             failed_urls: 失败的URL数量
+            result_count: 已增量写入的结果数量
+            results: 直接保存在任务记录中的结果 (未使用增量写入时)
+            timing_stats: 各阶段耗时统计
             
         Returns:
-            bool: 是否更新成功
+            bool: 任务是否由本次调用标记为已完成 (已取消的任务只保存部分结果，返回False)
         """
-        async with self._lock:
-            if task_id in self.tasks:
-                task = self.tasks[task_id]
+        # 大字段转存到内容存储，任务记录只保留引用
+        for result in results or []:
+            await self.blob_store.offload(result)
+        
+        cancelled = False
+        
+        def mutate(task: TaskInfo):
+            nonlocal cancelled
+            # 已取消的任务只保存已完成的部分结果，保留取消状态
+            cancelled = task.status == CrawlStatus.CANCELLED
+            if task.status in FINISHED_STATUSES and not cancelled:
+                return False
+            if not cancelled:
                 task.status = CrawlStatus.COMPLETED
                 task.progress = 100.0
-                task.completed_urls = completed_urls
-                task.failed_urls = failed_urls
-                task.results = results
-                task.updated_at = datetime.now()
                 task.completed_at = datetime.now()
-                
-                logger.info(f"任务已完成: {task_id}, 成功: {completed_urls}, 失败: {failed_urls}")
-                return True
+            task.completed_urls = completed_urls
+            task.failed_urls = failed_urls
+            if result_count is not None:
+                task.result_count = result_count
+            if results is not None:
+                task.results = results
+            if timing_stats is not None:
+                task.timing_stats = timing_stats
+        
+        updated = await self._update(task_id, mutate)
+        if updated and cancelled:
+            logger.info(f"已保存取消任务的部分结果: {task_id}, 成功: {completed_urls}, 失败: {failed_urls}")
             return False
+        if updated:
+            TASK_TRANSITIONS.labels(CrawlStatus.COMPLETED.value).inc()
+            logger.info(f"任务已完成: {task_id}, 成功: {completed_urls}, 失败: {failed_urls}")
+        return updated
     
     async def fail_task(self, task_id: str, error_message: str) -> bool:
         """
@@ -150,39 +395,45 @@ class TaskService:
         Returns:
             bool: 是否更新成功
         """
-        async with self._lock:
-            if task_id in self.tasks:
-                task = self.tasks[task_id]
-                task.status = CrawlStatus.FAILED
-                task.error_message = error_message
-                task.updated_at = datetime.now()
-                task.completed_at = datetime.now()
-                
-                logger.error(f"任务失败: {task_id}, 错误: {error_message}")
-                return True
-            return False
+        def mutate(task: TaskInfo):
+            # 已取消或已结束的任务保留原状态
+            if task.status in FINISHED_STATUSES:
+                return False
+            task.status = CrawlStatus.FAILED
+            task.error_message = error_message
+            task.completed_at = datetime.now()
+        
+        updated = await self._update(task_id, mutate)
+        if updated:
+            TASK_TRANSITIONS.labels(CrawlStatus.FAILED.value).inc()
+            logger.error(f"任务失败: {task_id}, 错误: {error_message}")
+        return updated
     
     async def cancel_task(self, task_id: str) -> bool:
         """
         取消任务
         
+        标记为已取消并中止本进程内的执行；由 worker 进程执行的任务，
+        worker 检测到取消状态后自行中止。已完成的URL结果会保留。
+        
         Args:
             task_id: 任务ID
             
         Returns:
-            bool: 是否取消成功
+            bool: 任务是否由本次调用标记为已取消 (已结束的任务返回False)
         """
-        async with self._lock:
-            if task_id in self.tasks:
-                task = self.tasks[task_id]
-                if task.status in [CrawlStatus.PENDING, CrawlStatus.RUNNING]:
-                    task.status = CrawlStatus.CANCELLED
-                    task.updated_at = datetime.now()
-                    task.completed_at = datetime.now()
-                    
-                    logger.info(f"任务已取消: {task_id}")
-                    return True
-            return False
+        def mutate(task: TaskInfo):
+            if task.status not in [CrawlStatus.PENDING, CrawlStatus.RUNNING]:
+                return False
+            task.status = CrawlStatus.CANCELLED
+            task.completed_at = datetime.now()
+        
+        updated = await self._update(task_id, mutate)
+        if updated:
+            self.abort_runner(task_id)
+            TASK_TRANSITIONS.labels(CrawlStatus.CANCELLED.value).inc()
+            logger.info(f"任务已取消: {task_id}")
+        return updated
     
     async def delete_task(self, task_id: str) -> bool:
         """
@@ -194,12 +445,16 @@ class TaskService:
         Returns:
             bool: 是否删除成功
         """
-        async with self._lock:
-            if task_id in self.tasks:
-                del self.tasks[task_id]
-                logger.info(f"任务已删除: {task_id}")
-                return True
-            return False
+        async with self._task_lock(task_id):
+            deleted = await self.store.delete(task_id)
+            self._progress.pop(task_id, None)
+        
+        # 删除执行中的任务时一并中止爬取
+        self.abort_runner(task_id)
+        await self.results.delete(task_id)
+        if deleted:
+            logger.info(f"任务已删除: {task_id}")
+        return deleted
     
     async def cleanup_completed_tasks(self, max_age_hours: int = 24) -> int:
         """
@@ -211,21 +466,18 @@ class TaskService:
         Returns:
             int: 清理的任务数量
         """
-        async with self._lock:
-            current_time = datetime.now()
-            tasks_to_delete = []
-            
-            for task_id, task in self.tasks.items():
-                if (task.status in [CrawlStatus.COMPLETED, CrawlStatus.FAILED, CrawlStatus.CANCELLED] 
-                    and task.completed_at):
-                    age_hours = (current_time - task.completed_at).total_seconds() / 3600
-                    if age_hours > max_age_hours:
-                        tasks_to_delete.append(task_id)
-            
-            for task_id in tasks_to_delete:
-                del self.tasks[task_id]
-            
-            if tasks_to_delete:
-                logger.info(f"已清理 {len(tasks_to_delete)} 个旧任务")
-            
-            return len(tasks_to_delete) 
\ No newline at end of file
+        cutoff = datetime.now() - timedelta(hours=max_age_hours)
+        expired = await self.store.delete_finished_before(cutoff)
+        for task_id in expired:
+            await self.results.delete(task_id)
+        cleaned_count = len(expired)
+        
+        if cleaned_count:
+            logger.info(f"已清理 {cleaned_count} 个旧任务")
+        
+        return cleaned_count
+    
+    async def close(self):
+        """关闭任务存储"""
+        await self.store.close()
+        await self.results.close() 
\ No newline at end of file
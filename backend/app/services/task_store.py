@@ -0,0 +1,299 @@
+"""
+任务存储后端
+
+TaskService 通过 TaskStore 接口持久化任务信息，默认使用 SQLite (WAL 模式)，
+也可切换为内存存储 (仅用于开发/测试)。
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models.schemas import CrawlResult, CrawlStatus, TaskInfo
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 终态任务，可被清理
+FINISHED_STATUSES = (CrawlStatus.COMPLETED, CrawlStatus.FAILED, CrawlStatus.CANCELLED)
+
+
+class TaskStore(ABC):
+    """任务存储接口"""
+
+    @abstractmethod
+    async def save(self, task: TaskInfo) -> None:
+        """保存(插入或覆盖)任务"""
+
+    @abstractmethod
+    async def get(self, task_id: str, include_results: bool = True) -> Optional[TaskInfo]:
+        """获取任务，include_results=False 时不加载结果"""
+
+    @abstractmethod
+    async def update(self, task_id: str, mutate: Callable[[TaskInfo], Optional[bool]]) -> Optional[TaskInfo]:
+        """
+        原子地读取-修改-保存任务 (API 进程与 worker 进程可能同时更新同一任务)
+
+        Args:
+            task_id: 任务ID
+            mutate: 修改函数，返回False表示不保存
+
+        Returns:
+            Optional[TaskInfo]: 保存后的任务，任务不存在或未保存时返回None
+        """
+
+    @abstractmethod
+    async def delete(self, task_id: str) -> bool:
+        """删除任务"""
+
+    @abstractmethod
+    async def list(
+        self,
+        status: Optional[CrawlStatus] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[List[TaskInfo], int]:
+        """按创建时间倒序分页列出任务 (不包含结果)，返回 (任务列表, 总数)"""
+
+    @abstractmethod
+    async def delete_finished_before(self, cutoff: datetime) -> List[str]:
+        """删除在 cutoff 之前结束的终态任务，返回被删除的任务ID"""
+
+    async def close(self) -> None:
+        """释放存储资源"""
+
+
+class MemoryTaskStore(TaskStore):
+    """内存存储，进程重启后任务丢失"""
+
+    def __init__(self):
+        self.tasks: Dict[str, TaskInfo] = {}
+
+    async def save(self, task: TaskInfo) -> None:
+        self.tasks[task.task_id] = task
+
+    async def get(self, task_id: str, include_results: bool = True) -> Optional[TaskInfo]:
+        return self.tasks.get(task_id)
+
+    async def update(self, task_id: str, mutate: Callable[[TaskInfo], Optional[bool]]) -> Optional[TaskInfo]:
+        task = self.tasks.get(task_id)
+        if task is None or mutate(task) is False:
+            return None
+        return task
+
+    async def delete(self, task_id: str) -> bool:
+        return self.tasks.pop(task_id, None) is not None
+
+    async def list(
+        self,
+        status: Optional[CrawlStatus] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[List[TaskInfo], int]:
+        tasks = [t for t in self.tasks.values() if status is None or t.status == status]
+        tasks.sort(key=lambda t: t.created_at, reverse=True)
+        page = [t.model_copy(update={"results": None}) for t in tasks[offset:offset + limit]]
+        return page, len(tasks)
+
+    async def delete_finished_before(self, cutoff: datetime) -> List[str]:
+        expired = [
+            task_id for task_id, task in self.tasks.items()
+            if task.status in FINISHED_STATUSES and task.completed_at and task.completed_at < cutoff
+        ]
+        for task_id in expired:
+            del self.tasks[task_id]
+        return expired
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    SQLite 存储 (WAL 模式)
+
+    任务元数据与结果分列存储，列表查询只读取元数据列；
+    所有数据库操作在线程池中执行，不阻塞事件循环。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            completed_at TEXT,
+            data TEXT NOT NULL,
+            results TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+        CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at);
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or settings.task_db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+            logger.info(f"任务数据库已打开: {self.db_path}")
+        return self._conn
+
+    def _execute(self, fn, *args):
+        with self._conn_lock:
+            return fn(self._connect(), *args)
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(self._execute, fn, *args)
+
+    @staticmethod
+    def _to_row(task: TaskInfo) -> tuple:
+        data = task.model_dump_json(exclude={"results"})
+        results = None
+        if task.results is not None:
+            results = json.dumps([r.model_dump(mode="json") for r in task.results], ensure_ascii=False)
+        return (
+            task.task_id,
+            task.status.value,
+            task.created_at.isoformat(),
+            task.completed_at.isoformat() if task.completed_at else None,
+            data,
+            results,
+        )
+
+    @staticmethod
+    def _from_row(data: str, results: Optional[str] = None) -> TaskInfo:
+        task = TaskInfo.model_validate_json(data)
+        if results is not None:
+            task.results = [CrawlResult.model_validate(r) for r in json.loads(results)]
+        return task
+
+    async def save(self, task: TaskInfo) -> None:
+        row = self._to_row(task)
+
+        def _save(conn: sqlite3.Connection):
+            conn.execute(
+                "INSERT OR REPLACE INTO tasks "
+                "(task_id, status, created_at, completed_at, data, results) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                row,
+            )
+
+        await self._run(_save)
+
+    async def get(self, task_id: str, include_results: bool = True) -> Optional[TaskInfo]:
+        columns = "data, results" if include_results else "data"
+
+        def _get(conn: sqlite3.Connection):
+            return conn.execute(
+                f"SELECT {columns} FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+
+        row = await self._run(_get)
+        return self._from_row(*row) if row else None
+
+    async def update(self, task_id: str, mutate: Callable[[TaskInfo], Optional[bool]]) -> Optional[TaskInfo]:
+        # BEGIN IMMEDIATE 立即获取写锁，其他进程的更新在此期间等待，
+        # 不会出现 worker 的进度写入覆盖 API 进程刚写入的取消状态
+        def _update(conn: sqlite3.Connection):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT data, results FROM tasks WHERE task_id = ?", (task_id,)
+                ).fetchone()
+                task = self._from_row(*row) if row else None
+                if task is None or mutate(task) is False:
+                    conn.execute("ROLLBACK")
+                    return None
+                _, status, _, completed_at, data, results = self._to_row(task)
+                conn.execute(
+                    "UPDATE tasks SET status = ?, completed_at = ?, data = ?, results = ? WHERE task_id = ?",
+                    (status, completed_at, data, results, task_id),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return task
+
+        return await self._run(_update)
+
+    async def delete(self, task_id: str) -> bool:
+        def _delete(conn: sqlite3.Connection):
+            return conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,)).rowcount
+
+        return await self._run(_delete) > 0
+
+    async def list(
+        self,
+        status: Optional[CrawlStatus] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[List[TaskInfo], int]:
+        where = "WHERE status = ?" if status else ""
+        params = (status.value,) if status else ()
+
+        def _list(conn: sqlite3.Connection):
+            total = conn.execute(f"SELECT COUNT(*) FROM tasks {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT data FROM tasks {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + (limit, offset),
+            ).fetchall()
+            return rows, total
+
+        rows, total = await self._run(_list)
+        return [self._from_row(row[0]) for row in rows], total
+
+    async def delete_finished_before(self, cutoff: datetime) -> List[str]:
+        statuses = tuple(s.value for s in FINISHED_STATUSES)
+        where = "status IN (?, ?, ?) AND completed_at IS NOT NULL AND completed_at < ?"
+        params = statuses + (cutoff.isoformat(),)
+
+        def _cleanup(conn: sqlite3.Connection):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(f"SELECT task_id FROM tasks WHERE {where}", params).fetchall()
+                conn.execute(f"DELETE FROM tasks WHERE {where}", params)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return [row[0] for row in rows]
+
+        return await self._run(_cleanup)
+
+    async def close(self) -> None:
+        def _close():
+            with self._conn_lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+        await asyncio.to_thread(_close)
+
+
+def create_task_store(backend: Optional[str] = None) -> TaskStore:
+    """
+    根据配置创建任务存储
+
+    Args:
+        backend: 存储类型 ("sqlite" 或 "memory")，默认读取配置
+
+    Returns:
+        TaskStore: 任务存储实例
+    """
+    backend = (backend or settings.task_store_backend).lower()
+    if backend == "memory":
+        return MemoryTaskStore()
+    if backend == "sqlite":
+        return SQLiteTaskStore()
+    raise ValueError(f"不支持的任务存储类型: {backend}")
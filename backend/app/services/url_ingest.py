@@ -0,0 +1,235 @@
+"""
+批量URL的流式接收
+
+大规模批量任务的URL列表不经 Pydantic 一次性解析，而是边接收边校验、去重，
+并写入磁盘上的 URL 文件 (每行一个URL)；执行时再按批读取，
+内存占用与URL总数基本无关 (去重集合每个URL仅占一个64位哈希)。
+
+支持的请求体格式:
+- 换行分隔的URL列表 (text/plain)，空行和 # 开头的注释行会被忽略
+- NDJSON (application/x-ndjson)，每行一个 JSON 字符串或 {"url": ...} 对象
+"""
+
+import asyncio
+import codecs
+import json
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Container, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.config import settings
+from app.services.deep_crawl import HashedSeenSet
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 单个URL的最大长度
+MAX_URL_LENGTH = 2048
+# 单行的最大字节数，超过视为格式错误 (防止无换行的超大请求体占满内存)
+MAX_LINE_LENGTH = 64 * 1024
+# 写入/读取 URL 文件的批大小 (行)
+IO_BATCH_LINES = 1000
+# 记录的无效行样例数
+MAX_ERROR_SAMPLES = 10
+
+
+def parse_url_line(line: str) -> Optional[str]:
+    """
+    解析一行输入
+
+    Args:
+        line: 一行文本 (URL、JSON 字符串或 {"url": ...} 对象)
+
+    Returns:
+        Optional[str]: URL，空行或注释行返回 None
+
+    Raises:
+        ValueError: 行内容不是合法的 http(s) URL
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    if line[0] in "{\"":
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON 格式错误: {e.msg}")
+        if isinstance(value, dict):
+            value = value.get("url")
+        if not isinstance(value, str):
+            raise ValueError("缺少 url 字段")
+        line = value.strip()
+
+    if len(line) > MAX_URL_LENGTH:
+        raise ValueError("URL 过长")
+    parts = urlsplit(line)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("不是合法的 http(s) URL")
+    return line
+
+
+async def enumerate_urls(
+    urls: Iterable[str],
+    skip: Container[int] = ()
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    将内存中的URL列表转换为 (URL序号, URL) 异步迭代器
+
+    Args:
+        urls: URL列表
+        skip: 跳过的URL序号
+    """
+    for index, url in enumerate(urls):
+        if index not in skip:
+            yield index, url
+
+
+class IngestStats:
+    """URL 接收统计"""
+
+    def __init__(self):
+        self.accepted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors: List[str] = []
+
+    def add_error(self, line_no: int, reason: str):
+        self.invalid += 1
+        if len(self.errors) < MAX_ERROR_SAMPLES:
+            self.errors.append(f"第 {line_no} 行: {reason}")
+
+    def to_dict(self):
+        return {
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "errors": self.errors,
+        }
+
+
+class UrlSpool:
+    """
+    磁盘上的批量任务URL文件
+
+    Args:
+        path: 文件路径
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    @classmethod
+    def for_task(cls, task_id: str) -> "UrlSpool":
+        """任务对应的 URL 文件"""
+        return cls(str(Path(settings.batch_spool_dir) / f"{task_id}.txt"))
+
+    async def ingest(
+        self,
+        chunks: AsyncIterable[bytes],
+        max_urls: Optional[int] = None
+    ) -> IngestStats:
+        """
+        从字节流接收URL，校验、去重后写入文件
+
+        Args:
+            chunks: 请求体字节流
+            max_urls: 最多接收的URL数量
+
+        Returns:
+            IngestStats: 接收统计
+
+        Raises:
+            ValueError: URL 数量超过上限或单行过长
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        stats = IngestStats()
+        seen = HashedSeenSet()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        line_no = 0
+        buffer: List[str] = []
+
+        f = await asyncio.to_thread(open, self.path, "w", encoding="utf-8")
+        try:
+            async def flush():
+                if buffer:
+                    data = "".join(buffer)
+                    buffer.clear()
+                    await asyncio.to_thread(f.write, data)
+
+            async def handle(line: str):
+                nonlocal line_no
+                line_no += 1
+                try:
+                    url = parse_url_line(line)
+                except ValueError as e:
+                    stats.add_error(line_no, str(e))
+                    return
+                if url is None:
+                    return
+                if not seen.add(url):
+                    stats.duplicates += 1
+                    return
+                if max_urls is not None and stats.accepted >= max_urls:
+                    raise ValueError(f"URL 数量超过上限 {max_urls}")
+                stats.accepted += 1
+                buffer.append(url + "\n")
+                if len(buffer) >= IO_BATCH_LINES:
+                    await flush()
+
+            async for chunk in chunks:
+                pending += decoder.decode(chunk)
+                *lines, pending = pending.split("\n")
+                for line in lines:
+                    await handle(line)
+                if len(pending) > MAX_LINE_LENGTH:
+                    raise ValueError(f"第 {line_no + 1} 行超过 {MAX_LINE_LENGTH} 字节")
+
+            pending += decoder.decode(b"", final=True)
+            if pending:
+                await handle(pending)
+            await flush()
+        finally:
+            await asyncio.to_thread(f.close)
+
+        logger.info(
+            f"URL 接收完成: {self.path.name}, 有效 {stats.accepted}, "
+            f"重复 {stats.duplicates}, 无效 {stats.invalid}"
+        )
+        return stats
+
+    async def iter_urls(self, skip: Container[int] = ()) -> AsyncIterator[Tuple[int, str]]:
+        """
+        按批读取URL
+
+        Args:
+            skip: 跳过的URL序号 (续跑时已完成的URL)
+
+        Yields:
+            Tuple[int, str]: (URL序号, URL)
+        """
+        f = await asyncio.to_thread(open, self.path, "r", encoding="utf-8")
+        try:
+            index = 0
+            while True:
+                lines = await asyncio.to_thread(f.readlines, IO_BATCH_LINES * 128)
+                if not lines:
+                    return
+                for line in lines:
+                    if index not in skip:
+                        yield index, line.rstrip("\n")
+                    index += 1
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def read_all(self) -> List[str]:
+        """读取全部URL (深度爬取的起始URL)"""
+        return [url async for _, url in self.iter_urls()]
+
+    def remove(self):
+        """删除 URL 文件"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
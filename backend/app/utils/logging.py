@@ -1,55 +1,201 @@
 """
 日志工具模块
+
+日志记录不阻塞事件循环:
+- 应用日志器只挂一个 QueueHandler，记录放入内存队列后立即返回；
+  控制台与文件的写入由 QueueListener 的后台线程完成
+- 文件按大小轮转 (LOG_MAX_BYTES / LOG_BACKUP_COUNT)
+- LOG_FORMAT=json 时通过 structlog 输出结构化 JSON，extra 中的字段作为独立的键输出
+- 高频日志 (如批量爬取的进度) 通过 extra={"sample": True} 标记，同一条日志模板
+  每 LOG_SAMPLE_INTERVAL 秒最多输出一次，被跳过的条数记在下一条的 suppressed 字段中
+- 热路径上使用 %s 占位符而不是 f-string，未启用的级别不做任何格式化
+
+setup_logging 可重复调用，只有第一次调用会添加处理器。
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+
+ROOT_LOGGER = "crawl4ai_visual"
+
+# LogRecord 的标准属性，其余属性视为 extra 字段
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    高频日志采样
+
+    只处理带有 sample=True 标记的记录，按 (日志器, 日志模板) 分组，
+    每组每 interval 秒最多放行一条，并在放行的记录上附加 suppressed (期间跳过的条数)。
+
+    Args:
+        interval: 同一组日志的最小输出间隔 (秒)
+    """
+
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self._last: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sample", False) or self.interval <= 0:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._last.get(key, (0.0, 0))
+            if last and now - last < self.interval:
+                self._last[key] = (last, suppressed + 1)
+                return False
+            self._last[key] = (now, 0)
+        record.suppressed = suppressed
+        return True
 
-def setup_logging(log_level: str = "INFO") -> logging.Logger:
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    在调用方线程中只做最少的工作: 合并消息参数、记录异常文本，
+    原始的 extra 字段保留在记录上供结构化输出使用
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            # 异常对象 (及其 traceback 引用的栈帧) 不跨线程传递
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _add_record_fields(logger, method_name, event_dict):
+    """structlog 处理器: 补充 extra 字段与异常文本"""
+    record: logging.LogRecord = event_dict["_record"]
+    for key, value in vars(record).items():
+        if key not in _RECORD_ATTRS and key != "sample" and not key.startswith("_"):
+            event_dict.setdefault(key, value)
+    if record.exc_text:
+        event_dict["exception"] = record.exc_text
+    return event_dict
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    if log_format != "json":
+        return logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    import structlog
+
+    return structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=[
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            _add_record_fields,
+        ],
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.JSONRenderer(ensure_ascii=False, default=str),
+        ],
+    )
+
+
+def setup_logging(log_level: Optional[str] = None) -> logging.Logger:
     """
     设置应用日志
-    
+
+    重复调用时直接返回已配置的日志器，不会重复添加处理器。
+
     Args:
-        log_level: 日志级别
-        
+        log_level: 日志级别，默认读取 LOG_LEVEL
+
     Returns:
         logging.Logger: 配置好的日志器
     """
-    # 创建日志目录
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    # 配置日志格式
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # 创建根日志器
-    logger = logging.getLogger("crawl4ai_visual")
-    logger.setLevel(getattr(logging, log_level.upper()))
-    
-    # 控制台处理器
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # 文件处理器
-    file_handler = logging.FileHandler(log_dir / "app.log")
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
+    global _listener
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    with _setup_lock:
+        if _listener is not None:
+            return logger
+
+        level = getattr(logging, (log_level or settings.log_level).upper(), logging.INFO)
+        logger.setLevel(level)
+        formatter = _build_formatter(settings.log_format)
+
+        handlers: List[logging.Handler] = []
+
+        # 控制台处理器
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+        # 文件处理器 (按大小轮转)
+        if settings.log_dir:
+            log_dir = Path(settings.log_dir)
+            log_dir.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_dir / "app.log",
+                maxBytes=settings.log_max_bytes,
+                backupCount=settings.log_backup_count,
+                encoding="utf-8",
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+
+        # 队列无界: 写入端不能阻塞事件循环，积压只会出现在磁盘持续不可写时
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(settings.log_sample_interval))
+
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(queue_handler)
+        # 不再传播到根日志器，避免 uvicorn 等配置的处理器重复输出
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
     return logger
 
+
+def shutdown_logging():
+    """停止后台写入线程并输出队列中剩余的日志"""
+    global _listener
+
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     获取指定名称的日志器
-    
+
     Args:
         name: 日志器名称
-        
+
     Returns:
         logging.Logger: 日志器实例
     """
-    return logging.getLogger(f"crawl4ai_visual.{name}") 
\ No newline at end of file
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,215 @@
+"""
+Prometheus 指标
+
+热路径上只做 Histogram.observe / Gauge.inc 等常数时间操作；
+浏览器池、缓存、任务存储、队列等状态在抓取 /metrics 时由 collect_service_metrics 读取。
+
+域名标签数量有上限 (METRIC_MAX_DOMAINS)，超出的域名归入 "other"，避免标签基数失控。
+"""
+
+import asyncio
+from typing import Any, Dict, Optional, Set
+from urllib.parse import urlparse
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest, start_http_server
+)
+
+from app.config import settings
+from app.models.schemas import CrawlStatus
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 单页爬取耗时分布 (秒)
+CRAWL_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 21, 34, 60, 120)
+# 阶段耗时分布 (秒)
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# 事件循环延迟分布 (秒)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+CRAWL_DURATION = Histogram(
+    "crawler_crawl_duration_seconds",
+    "单个URL爬取耗时 (含缓存读取)",
+    ["outcome", "domain"],
+    buckets=CRAWL_BUCKETS,
+)
+CRAWL_STAGE_DURATION = Histogram(
+    "crawler_stage_duration_seconds",
+    "单个URL各阶段耗时 (阶段定义见 app.services.stage_timing)",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "crawler_cache_lookups_total",
+    "爬取缓存查询次数",
+    ["result"],
+)
+CONTENT_CHANGES = Counter(
+    "crawler_content_changes_total",
+    "内容变化检测结果 (new / unchanged / similar / changed)",
+    ["status"],
+)
+BATCH_QUEUE_DEPTH = Gauge(
+    "crawler_batch_queue_depth",
+    "流式批量爬取中等待 worker 处理的URL数量",
+)
+BATCH_ACTIVE_WORKERS = Gauge(
+    "crawler_batch_active_workers",
+    "正在爬取URL的批量 worker 数量",
+)
+TASK_TRANSITIONS = Counter(
+    "tasks_status_transitions_total",
+    "任务状态变更次数",
+    ["status"],
+)
+TASK_RESULTS_WRITTEN = Counter(
+    "tasks_results_written_total",
+    "写入结果存储的结果条数",
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "事件循环调度延迟 (定时唤醒的实际延迟)",
+    buckets=LAG_BUCKETS,
+)
+
+GC_PAUSE = Histogram(
+    "gc_pause_seconds",
+    "Python 垃圾回收暂停时长",
+    ["generation"],
+    buckets=LAG_BUCKETS,
+)
+GOVERNOR_GC_RUNS = Counter(
+    "memory_governor_gc_runs_total",
+    "内存压力触发的完整 GC 次数",
+)
+MEMORY_RSS = Gauge("memory_rss_bytes", "进程树 (含浏览器) 常驻内存")
+MEMORY_PRESSURE = Gauge("memory_pressure_ratio", "常驻内存占内存上限的比例")
+
+# 以下指标在抓取时刷新
+BROWSER_PAGES = Gauge("browser_pool_pages", "浏览器池页面槽位", ["state"])
+BROWSER_WAITING = Gauge("browser_pool_waiting", "等待浏览器槽位的请求数")
+BROWSER_LAUNCHES = Gauge("browser_pool_launches", "浏览器累计启动次数")
+CACHE_HIT_RATIO = Gauge("crawler_cache_hit_ratio", "爬取缓存命中率")
+CACHE_SIZE_BYTES = Gauge("crawler_cache_size_bytes", "爬取缓存占用字节数")
+TASKS = Gauge("tasks_stored", "任务存储中的任务数量", ["status"])
+JOB_QUEUE_JOBS = Gauge("job_queue_jobs", "批量任务队列中的任务数量", ["state"])
+
+_domains: Set[str] = set()
+
+
+def domain_label(url: str) -> str:
+    """URL 对应的域名标签，超过上限的新域名返回 "other" """
+    try:
+        domain = (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return "invalid"
+    if not domain:
+        return "invalid"
+    if domain in _domains:
+        return domain
+    if len(_domains) >= settings.metric_max_domains:
+        return "other"
+    _domains.add(domain)
+    return domain
+
+
+def observe_crawl(url: str, outcome: str, seconds: float):
+    """
+    记录单个URL的爬取耗时
+
+    Args:
+        url: URL
+        outcome: success / failure / timeout / cached / unchanged / not_modified
+        seconds: 耗时 (秒)
+    """
+    CRAWL_DURATION.labels(outcome, domain_label(url)).observe(seconds)
+
+
+class EventLoopMonitor:
+    """
+    事件循环延迟监控
+
+    每隔 interval 秒请求一次唤醒，实际唤醒时间与预期之差即为循环被阻塞的时长。
+
+    Args:
+        interval: 采样间隔 (秒)
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or settings.loop_lag_interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            EVENT_LOOP_LAG.observe(lag)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def collect_service_metrics(services) -> None:
+    """
+    刷新抓取时读取的状态指标
+
+    Args:
+        services: 应用服务容器 (ServiceContainer)
+    """
+    pool = services.browser_pool.get_stats()
+    BROWSER_PAGES.labels("active").set(pool["active_pages"])
+    BROWSER_PAGES.labels("available").set(pool["available_pages"])
+    BROWSER_PAGES.labels("capacity").set(pool["capacity"])
+    BROWSER_WAITING.set(pool["waiting"])
+    BROWSER_LAUNCHES.set(pool["launch_count"])
+
+    cache = services.crawl_cache.get_stats()
+    CACHE_HIT_RATIO.set(cache["hit_ratio"])
+    CACHE_SIZE_BYTES.set(cache["disk_bytes"])
+
+    try:
+        for status in CrawlStatus:
+            _, total = await services.task_service.store.list(status=status, offset=0, limit=1)
+            TASKS.labels(status.value).set(total)
+    except Exception as e:
+        logger.warning(f"读取任务存储统计失败: {e}")
+
+    try:
+        stats: Dict[str, Any] = await services.job_queue.get_stats()
+        for state, count in stats.get("jobs", {}).items():
+            JOB_QUEUE_JOBS.labels(state).set(count)
+    except Exception as e:
+        logger.warning(f"读取任务队列统计失败: {e}")
+
+
+def render_metrics() -> bytes:
+    """以 Prometheus 文本格式输出全部指标"""
+    return generate_latest()
+
+
+def start_metrics_server(port: int):
+    """
+    在独立线程中暴露指标 (供没有 HTTP 接口的 worker 进程使用)
+
+    Args:
+        port: 监听端口
+    """
+    start_http_server(port)
+    logger.info(f"Prometheus 指标已在端口 {port} 暴露")
@@ -0,0 +1,41 @@
+"""
+JSON 序列化
+
+优先使用 orjson (直接输出 bytes，比标准库 json 快数倍)，未安装时回退到标准库。
+FastJSONResponse 作为应用默认响应类；路由直接返回 FastJSONResponse(模型) 时
+FastAPI 跳过 response_model 的二次校验，模型由 pydantic-core 直接序列化。
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+
+def json_dumps(obj: Any) -> bytes:
+    """序列化为 UTF-8 JSON 字节串"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def json_loads(data: Any) -> Any:
+    """解析 JSON 字符串或字节串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """使用 orjson / pydantic-core 序列化的 JSON 响应"""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
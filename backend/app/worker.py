@@ -0,0 +1,228 @@
+"""
+批量爬取 worker 进程
+
+从任务队列领取批量爬取任务并执行，与 API 进程共享任务存储与结果存储。
+
+用法:
+    BATCH_EXECUTOR=queue uvicorn app.main:app      # API 只负责入队
+    python -m app.worker --concurrency 2           # 启动 worker
+    python -m app.worker --metrics-port 9100       # 同时在 9100 端口暴露 Prometheus 指标
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import uuid
+from typing import Optional
+
+from app.config import settings
+from app.models.schemas import CrawlConfig
+from app.services.batch_runner import run_batch_task
+from app.services.browser_pool import BrowserPool
+from app.services.change_detection import FingerprintStore
+from app.services.crawl_cache import CrawlCache
+from app.services.crawler_service import CrawlerService
+from app.services.job_queue import Job, JobQueue, create_job_queue
+from app.services.memory_governor import MemoryGovernor
+from app.services.task_service import TaskService
+from app.services.url_ingest import UrlSpool
+from app.utils.logging import get_logger, setup_logging
+from app.utils.metrics import EventLoopMonitor, start_metrics_server
+
+logger = get_logger(__name__)
+
+# 检查任务是否已被取消的间隔 (秒)
+CANCEL_CHECK_SECONDS = 2.0
+
+
+class BatchWorker:
+    """
+    批量爬取 worker
+
+    Args:
+        queue: 任务队列
+        concurrency: 同时执行的批量任务数
+    """
+
+    def __init__(self, queue: JobQueue, concurrency: int = 1):
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.browser_pool = BrowserPool()
+        self.task_service = TaskService()
+        self.crawl_cache = CrawlCache()
+        self.fingerprints = FingerprintStore()
+        self.memory_governor = MemoryGovernor(browser_pool=self.browser_pool)
+        self.crawler_service = CrawlerService(
+            browser_pool=self.browser_pool,
+            crawl_cache=self.crawl_cache,
+            memory_governor=self.memory_governor,
+            fingerprints=self.fingerprints
+        )
+        self.loop_monitor = EventLoopMonitor()
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """停止领取新任务，执行中的任务完成后退出"""
+        if not self._stopping.is_set():
+            logger.info(f"worker 正在停止: {self.worker_id}")
+            self._stopping.set()
+
+    async def run(self):
+        """启动 worker 循环直到收到停止信号"""
+        self.loop_monitor.start()
+        await self.browser_pool.start()
+        self.memory_governor.start()
+        logger.info(f"worker 已启动: {self.worker_id}, 并发 {self.concurrency}")
+        try:
+            await asyncio.gather(*[self._loop() for _ in range(self.concurrency)])
+        finally:
+            await self.loop_monitor.stop()
+            await self.memory_governor.stop()
+            await self.browser_pool.close()
+            await self.task_service.close()
+            await self.crawl_cache.close()
+            await self.fingerprints.close()
+            await self.queue.close()
+            logger.info(f"worker 已退出: {self.worker_id}")
+
+    async def _loop(self):
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.claim(self.worker_id, settings.job_lease_seconds)
+            except Exception as e:
+                logger.error(f"领取任务失败: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=settings.worker_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._execute(job)
+
+    async def _heartbeat(self, job: Job, run: asyncio.Task) -> bool:
+        """
+        定期续租，租约被其他 worker 接管时中止本进程内的执行
+
+        Returns:
+            bool: 租约是否已丢失
+        """
+        interval = max(1.0, settings.job_lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.queue.heartbeat(job.job_id, self.worker_id, settings.job_lease_seconds):
+                    logger.warning(f"任务租约已被接管，中止执行: {job.job_id}")
+                    run.cancel()
+                    return True
+            except Exception as e:
+                logger.error(f"任务续租失败: {job.job_id}, 错误: {e}")
+
+    async def _watch_cancel(self, job: Job):
+        """任务在 API 进程中被取消后，中止本进程内的执行"""
+        while True:
+            await asyncio.sleep(CANCEL_CHECK_SECONDS)
+            try:
+                if await self.task_service.is_cancelled(job.task_id):
+                    self.task_service.abort_runner(job.task_id)
+                    return
+            except Exception as e:
+                logger.error(f"检查任务取消状态失败: {job.task_id}, 错误: {e}")
+
+    async def _give_up(self, job: Job, error_message: str):
+        """任务不再重试: 标记失败并清理 URL 文件 (租约已被接管时由新的 worker 处理)"""
+        if not await self.queue.fail(job.job_id, self.worker_id, error_message, retry=False):
+            logger.warning(f"任务租约已被接管，不再标记失败: {job.job_id}")
+            return
+        await self.task_service.fail_task(job.task_id, error_message)
+        if "url_file" in job.payload:
+            UrlSpool(job.payload["url_file"]).remove()
+
+    async def _execute(self, job: Job):
+        if job.attempts > settings.job_max_attempts:
+            await self._give_up(job, f"超过最大重试次数 ({settings.job_max_attempts})")
+            return
+
+        logger.info(f"领取批量任务: {job.task_id} (job {job.job_id}, 第 {job.attempts} 次)")
+        heartbeat: Optional[asyncio.Task] = None
+        watcher = asyncio.create_task(self._watch_cancel(job))
+        try:
+            payload = job.payload
+
+            # 流式接收的任务只在队列中保存 URL 文件路径
+            if "url_file" in payload:
+                urls = UrlSpool(payload["url_file"])
+            else:
+                urls = payload["urls"]
+
+            # 在独立的 Task 中执行，租约被接管时整体中止 (不再写入结果与完成状态)
+            run = asyncio.create_task(run_batch_task(
+                crawler_service=self.crawler_service,
+                task_service=self.task_service,
+                task_id=job.task_id,
+                urls=urls,
+                config=CrawlConfig.model_validate(payload["config"]),
+                concurrent_limit=payload["concurrent_limit"],
+                total_urls=payload.get("total_urls")
+            ))
+            heartbeat = asyncio.create_task(self._heartbeat(job, run))
+            try:
+                await run
+            except asyncio.CancelledError:
+                if heartbeat.done() and not heartbeat.cancelled() and heartbeat.result():
+                    logger.warning(f"批量任务已由其他 worker 接管: {job.task_id} (job {job.job_id})")
+                    return
+                raise
+
+            if not await self.queue.ack(job.job_id, self.worker_id):
+                logger.warning(f"任务租约已被接管，确认无效: {job.job_id}")
+
+        except Exception as e:
+            retry = job.attempts < settings.job_max_attempts
+            logger.error(f"批量任务执行失败: {job.task_id}, 错误: {e}, {'将重试' if retry else '不再重试'}")
+            if retry:
+                if not await self.queue.fail(job.job_id, self.worker_id, str(e), retry=True):
+                    logger.warning(f"任务租约已被接管，不再重新入队: {job.job_id}")
+            else:
+                await self._give_up(job, str(e))
+
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            watcher.cancel()
+
+
+async def _main(concurrency: int, backend: Optional[str]):
+    worker = BatchWorker(create_job_queue(backend), concurrency=concurrency)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            # Windows 不支持 add_signal_handler
+            pass
+
+    await worker.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl4AI 批量爬取 worker")
+    parser.add_argument("--concurrency", type=int, default=1, help="同时执行的批量任务数")
+    parser.add_argument("--backend", default=None, help="队列类型 (sqlite / redis)，默认读取 JOB_QUEUE_BACKEND")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Prometheus 指标端口，默认不暴露")
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    asyncio.run(_main(args.concurrency, args.backend))
+
+
+if __name__ == "__main__":
+    main()
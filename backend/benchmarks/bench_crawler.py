@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+爬虫基准测试
+
+在本地测试站点 (fixture_server) 上测量:
+- crawl_single: 各类页面 (静态/JS渲染/慢响应/大页面/跳转链) 的延迟分布
+- crawl_batch: 不同 concurrent_limit 下的吞吐量
+- 各阶段进程树 (含 Chromium) 的常驻内存峰值
+- 浏览器启动与回收次数
+- 批量爬取期间事件循环的最大延迟 (GC 暂停、同步阻塞调用都会体现在这里)
+
+结果写入 benchmarks/results/crawler-{时间}.json，可用 compare.py 与历史结果对比。
+
+用法 (在 backend 目录下):
+    python benchmarks/bench_crawler.py [--iterations 10] [--batch-size 60] [--concurrency 1,2,4,8]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import RSSSampler, percentiles, write_results
+from fixture_server import FixtureServer
+
+from app.config import settings
+from app.models.schemas import CacheMode, CrawlConfig
+from app.services.browser_pool import BrowserPool
+from app.services.change_detection import FingerprintStore
+from app.services.crawl_cache import CrawlCache
+from app.services.crawler_service import CrawlerService
+from app.utils.metrics import EventLoopMonitor
+
+# crawl_single 测量的页面类型
+SINGLE_PAGES = {
+    "static": "static/{i}",
+    "js": "js/{i}",
+    "slow_500ms": "slow/500",
+    "large_1mb": "large/1024",
+    "redirect_5": "redirect/5",
+}
+
+# 事件循环延迟采样间隔 (秒)
+LOOP_LAG_INTERVAL = 0.05
+
+# crawl_batch 使用的混合页面 (按序循环)
+BATCH_MIX = ["static/{i}", "static/{i}", "js/{i}", "slow/200", "large/256"]
+
+
+def batch_urls(server: FixtureServer, size: int) -> List[str]:
+    return [server.url(BATCH_MIX[i % len(BATCH_MIX)].format(i=i)) for i in range(size)]
+
+
+async def bench_single(
+    service: CrawlerService,
+    server: FixtureServer,
+    config: CrawlConfig,
+    iterations: int,
+    sampler: RSSSampler
+) -> Dict[str, Any]:
+    """逐个页面类型串行爬取，统计延迟分布"""
+    results: Dict[str, Any] = {}
+    for name, path in SINGLE_PAGES.items():
+        sampler.reset()
+        latencies: List[float] = []
+        failures = 0
+        for i in range(iterations):
+            url = server.url(path.format(i=i))
+            start = time.perf_counter()
+            result = await service.crawl_single(url, config)
+            latencies.append(time.perf_counter() - start)
+            if not result.success:
+                failures += 1
+        results[name] = {
+            "latency_ms": percentiles(latencies),
+            "failures": failures,
+            "peak_rss_bytes": sampler.peak,
+        }
+        print(
+            f"  {name:<12} p50 {results[name]['latency_ms']['p50']:8.1f} ms  "
+            f"p95 {results[name]['latency_ms']['p95']:8.1f} ms  失败 {failures}"
+        )
+    return results
+
+
+async def bench_batch(
+    service: CrawlerService,
+    server: FixtureServer,
+    config: CrawlConfig,
+    batch_size: int,
+    concurrency: List[int],
+    sampler: RSSSampler
+) -> List[Dict[str, Any]]:
+    """不同并发限制下整批爬取的吞吐量"""
+    runs = []
+    for limit in concurrency:
+        sampler.reset()
+        monitor = EventLoopMonitor(interval=LOOP_LAG_INTERVAL)
+        monitor.start()
+        urls = batch_urls(server, batch_size)
+        start = time.perf_counter()
+        results = await service.crawl_batch(urls, config, concurrent_limit=limit)
+        wall = time.perf_counter() - start
+        await monitor.stop()
+        succeeded = sum(1 for r in results if r.success)
+        run = {
+            "name": f"concurrency_{limit}",
+            "concurrent_limit": limit,
+            "urls": len(urls),
+            "succeeded": succeeded,
+            "wall_seconds": round(wall, 3),
+            "pages_per_second": round(len(urls) / wall, 2) if wall else 0.0,
+            "peak_rss_bytes": sampler.peak,
+            "loop_lag_max_ms": round(monitor.max_lag * 1000, 2),
+        }
+        runs.append(run)
+        print(
+            f"  concurrent_limit={limit:<3} {run['pages_per_second']:7.2f} 页/秒  "
+            f"成功 {succeeded}/{len(urls)}  峰值内存 {sampler.peak / 1024 / 1024:.0f} MiB  "
+            f"最大循环延迟 {run['loop_lag_max_ms']:.1f} ms"
+        )
+    return runs
+
+
+async def run(args) -> Dict[str, Any]:
+    concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    # 测试站点只有一个主机，放开每主机并发与限速，使吞吐量只受 concurrent_limit 约束
+    settings.scheduler_per_host_limit = max(concurrency)
+    settings.scheduler_host_rate = 0
+
+    config = CrawlConfig(cache_mode=CacheMode.BYPASS)
+
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer() as server, RSSSampler() as sampler:
+        pool = BrowserPool()
+        cache = CrawlCache(db_path=str(Path(tmp) / "cache.db"))
+        fingerprints = FingerprintStore(db_path=str(Path(tmp) / "fingerprints.db"))
+        service = CrawlerService(browser_pool=pool, crawl_cache=cache, fingerprints=fingerprints)
+
+        baseline_rss = sampler.sample()
+        start = time.perf_counter()
+        await pool.start()
+        startup_seconds = time.perf_counter() - start
+        print(f"浏览器池启动: {pool.pool_size} 个浏览器, {startup_seconds:.2f}s")
+
+        try:
+            print(f"crawl_single ({args.iterations} 次/类型):")
+            single = await bench_single(service, server, config, args.iterations, sampler)
+            print(f"crawl_batch ({args.batch_size} 个URL):")
+            batch = await bench_batch(service, server, config, args.batch_size, concurrency, sampler)
+            stats = pool.get_stats()
+        finally:
+            await pool.close()
+            await cache.close()
+            await fingerprints.close()
+
+    peak_rss = max(
+        [phase["peak_rss_bytes"] for phase in single.values()] + [run["peak_rss_bytes"] for run in batch]
+    )
+
+    return {
+        "params": {
+            "iterations": args.iterations,
+            "batch_size": args.batch_size,
+            "concurrency": concurrency,
+            "pool_size": pool.pool_size,
+            "max_pages_per_browser": pool.max_pages_per_browser,
+            "recycle_after": pool.recycle_after,
+        },
+        "browser": {
+            "startup_seconds": round(startup_seconds, 3),
+            "launch_count": stats["launch_count"],
+            "recycle_count": stats["recycle_count"],
+        },
+        "baseline_rss_bytes": baseline_rss,
+        "peak_rss_bytes": peak_rss,
+        "single": single,
+        "batch": batch,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬虫基准测试")
+    parser.add_argument("--iterations", type=int, default=10, help="crawl_single 每类页面的爬取次数")
+    parser.add_argument("--batch-size", type=int, default=60, help="crawl_batch 的URL数量")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="逗号分隔的 concurrent_limit 列表")
+    parser.add_argument("--output", default=None, help="结果文件路径")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    path = write_results("crawler", results, args.output)
+    print(f"结果已保存: {path}")
+
+
+if __name__ == "__main__":
+    main()
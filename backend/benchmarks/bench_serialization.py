@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+响应序列化基准测试
+
+对比包含 100 条结果的 TaskResponse 的两种序列化路径:
+- 之前: response_model 二次校验 + model_dump(mode="json") + 标准库 json.dumps (FastAPI 默认 JSONResponse)
+- 之后: FastJSONResponse 直接由 pydantic-core 输出 JSON 字节
+
+并输出各压缩算法的响应体大小与压缩耗时，结果写入 benchmarks/results/serialization-{时间}.json。
+
+用法 (在 backend 目录下):
+    python benchmarks/bench_serialization.py [--results 100] [--repeat 20]
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime
+
+from common import write_results
+
+from app.middleware import available_encodings, compress_bytes
+from app.models.schemas import CrawlResult, CrawlStatus, TaskInfo, TaskResponse
+from app.utils.serialization import json_dumps
+
+
+def build_response(result_count: int) -> TaskResponse:
+    """构造接近真实爬取结果大小的任务响应"""
+    paragraph = "Crawl4AI 可视化工具基准测试段落，包含中文与 English mixed content. " * 40
+    results = []
+    for i in range(result_count):
+        results.append(CrawlResult(
+            url=f"https://example.com/articles/{i}",
+            success=True,
+            status_code=200,
+            title=f"示例文章 {i}",
+            markdown=f"# 示例文章 {i}\n\n" + paragraph,
+            cleaned_html=f"<article><h1>示例文章 {i}</h1><p>{paragraph}</p></article>",
+            links={
+                "internal": [{"href": f"https://example.com/articles/{i + j}", "text": f"链接 {j}"} for j in range(20)],
+                "external": [{"href": f"https://other.example.org/{j}", "text": "外部链接"} for j in range(5)],
+            },
+            media={"images": [{"src": f"https://example.com/img/{i}-{j}.png", "alt": "图片"} for j in range(5)]},
+            metadata={"description": "示例页面", "keywords": ["crawl", "benchmark"]},
+            execution_time=1.234,
+        ))
+    task = TaskInfo(
+        task_id="bench-task",
+        status=CrawlStatus.COMPLETED,
+        progress=100.0,
+        total_urls=result_count,
+        completed_urls=result_count,
+        created_at=datetime.now(),
+        completed_at=datetime.now(),
+        result_count=result_count,
+        results=results,
+    )
+    return TaskResponse(success=True, message="获取任务信息成功", data=task)
+
+
+def serialize_before(response: TaskResponse) -> bytes:
+    """FastAPI 默认路径: 按 response_model 重新校验，转为 JSON 兼容字典后由标准库编码"""
+    validated = TaskResponse.model_validate(response.model_dump())
+    content = validated.model_dump(mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def serialize_after(response: TaskResponse) -> bytes:
+    """FastJSONResponse 路径"""
+    return json_dumps(response)
+
+
+def measure(fn, repeat: int) -> float:
+    """返回单次调用的最短耗时 (毫秒)"""
+    timings = timeit.repeat(fn, number=1, repeat=repeat)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="响应序列化基准测试")
+    parser.add_argument("--results", type=int, default=100, help="任务结果条数")
+    parser.add_argument("--repeat", type=int, default=20, help="重复次数")
+    parser.add_argument("--output", default=None, help="结果文件路径")
+    args = parser.parse_args()
+
+    response = build_response(args.results)
+    before = serialize_before(response)
+    after = serialize_after(response)
+    assert json.loads(before) == json.loads(after), "两种序列化结果不一致"
+
+    before_ms = measure(lambda: serialize_before(response), args.repeat)
+    after_ms = measure(lambda: serialize_after(response), args.repeat)
+
+    print(f"TaskResponse ({args.results} 条结果), 响应体 {len(after) / 1024:.1f} KiB")
+    print(f"  之前 (校验 + json.dumps): {before_ms:8.2f} ms")
+    print(f"  之后 (FastJSONResponse):  {after_ms:8.2f} ms  ({before_ms / after_ms:.1f}x)")
+
+    print("压缩:")
+    compression = []
+    for encoding in available_encodings():
+        compressed = compress_bytes(after, encoding)
+        elapsed = measure(lambda: compress_bytes(after, encoding), args.repeat)
+        ratio = len(compressed) / len(after) * 100
+        compression.append({
+            "name": encoding,
+            "size_bytes": len(compressed),
+            "compress_ms": round(elapsed, 3),
+        })
+        print(f"  {encoding:<5} {len(compressed) / 1024:8.1f} KiB ({ratio:.1f}%)  {elapsed:6.2f} ms")
+
+    path = write_results("serialization", {
+        "params": {"results": args.results, "repeat": args.repeat},
+        "body_bytes": len(after),
+        "before_ms": round(before_ms, 3),
+        "after_ms": round(after_ms, 3),
+        "speedup": round(before_ms / after_ms, 2),
+        "compression": compression,
+    }, args.output)
+    print(f"结果已保存: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+基准测试公共工具
+
+- 运行环境信息 (版本、提交、CPU) 随结果一起保存，便于跨版本对比
+- RSSSampler 在后台采样本进程及其子进程 (Chromium) 的常驻内存峰值
+- 结果以 JSON 写入 benchmarks/results/，compare 对比两次结果中的关键指标
+"""
+
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def git_commit() -> Optional[str]:
+    """当前代码的提交号，不在 git 仓库中时返回None"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """运行环境信息"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": git_commit(),
+    }
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """
+    计算延迟分布
+
+    Args:
+        values: 样本 (秒)
+
+    Returns:
+        Dict[str, float]: count / mean / p50 / p90 / p95 / p99 / max，单位毫秒
+    """
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(p: float) -> float:
+        # 最近秩法
+        rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+        return round(ordered[rank] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50": pick(50),
+        "p90": pick(90),
+        "p95": pick(95),
+        "p99": pick(99),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+def _read_rss(pid: int) -> int:
+    with open(f"/proc/{pid}/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # 进程名可能包含空格，从最后一个 ')' 之后解析
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[1]) == pid:
+                children.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+def process_tree_rss(root: Optional[int] = None) -> int:
+    """进程及其全部子孙进程的常驻内存之和 (字节)"""
+    root = root or os.getpid()
+    total, pending = 0, [root]
+    while pending:
+        pid = pending.pop()
+        try:
+            total += _read_rss(pid)
+        except OSError:
+            continue
+        pending.extend(_children(pid))
+    return total
+
+
+class RSSSampler:
+    """
+    后台采样常驻内存峰值
+
+    Linux 上统计整个进程树 (包含浏览器子进程)；
+    没有 /proc 时退化为本进程的 ru_maxrss。
+
+    Args:
+        interval: 采样间隔 (秒)
+    """
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak = 0
+        self.tree = os.path.isdir("/proc")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> int:
+        if self.tree:
+            rss = process_tree_rss()
+        else:
+            # ru_maxrss 在 macOS 上以字节为单位，其余平台为 KiB
+            scale = 1 if sys.platform == "darwin" else 1024
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        self.peak = max(self.peak, rss)
+        return rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def reset(self):
+        self.peak = 0
+        self.sample()
+
+    def __enter__(self) -> "RSSSampler":
+        self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample()
+
+
+def write_results(name: str, results: Dict[str, Any], output: Optional[str] = None) -> Path:
+    """
+    保存基准测试结果
+
+    Args:
+        name: 基准测试名称
+        results: 测试结果
+        output: 输出文件路径，默认 benchmarks/results/{name}-{时间}.json
+
+    Returns:
+        Path: 结果文件路径
+    """
+    payload = {
+        "benchmark": name,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        **results,
+    }
+    if output:
+        path = Path(output)
+    else:
+        path = RESULTS_DIR / f"{name}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def flatten(data: Any, prefix: str = "") -> Dict[str, float]:
+    """把嵌套结果展开为 {"a.b.c": 数值}，列表元素以其 name 字段或下标为键"""
+    flat: Dict[str, float] = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            key = value.get("name", i) if isinstance(value, dict) else i
+            flat.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix.rstrip(".")] = data
+    return flat
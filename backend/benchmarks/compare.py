@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+对比两次基准测试结果
+
+逐项比较数值指标，变差超过阈值的指标视为回归，存在回归时以退出码 1 结束，
+可直接用于 CI。吞吐量/加速比类指标越大越好，其余 (延迟、内存、启动次数) 越小越好。
+
+用法:
+    python benchmarks/compare.py baseline.json current.json [--threshold 10]
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict
+
+from common import flatten
+
+# 越大越好的指标 (按键名后缀匹配)
+HIGHER_IS_BETTER = ("pages_per_second", "speedup")
+
+# 只比较这些后缀的指标，跳过参数与计数类字段
+COMPARED_SUFFIXES = (
+    "mean", "p50", "p90", "p95", "p99", "max",
+    "_ms", "_seconds", "_bytes", "launch_count", "recycle_count", "failures",
+) + HIGHER_IS_BETTER
+
+
+def load_metrics(path: str) -> Dict[str, float]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    # 参数与环境信息不参与对比
+    data.pop("params", None)
+    data.pop("environment", None)
+    return {
+        key: value for key, value in flatten(data).items()
+        if key.endswith(COMPARED_SUFFIXES)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比两次基准测试结果")
+    parser.add_argument("baseline", help="基线结果文件")
+    parser.add_argument("current", help="当前结果文件")
+    parser.add_argument("--threshold", type=float, default=10.0, help="回归阈值 (百分比)")
+    args = parser.parse_args()
+
+    baseline = load_metrics(args.baseline)
+    current = load_metrics(args.current)
+
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[key], current[key]
+        if before == 0:
+            change = 0.0 if after == 0 else float("inf")
+        else:
+            change = (after - before) / abs(before) * 100
+        worse = -change if key.endswith(HIGHER_IS_BETTER) else change
+        flag = ""
+        if worse > args.threshold:
+            flag = "  <-- 回归"
+            regressions += 1
+        print(f"{key:<50} {before:>14.2f} {after:>14.2f} {change:>+8.1f}%{flag}")
+
+    missing = sorted(baseline.keys() - current.keys())
+    if missing:
+        print(f"当前结果缺少 {len(missing)} 项指标: {', '.join(missing)}")
+
+    print(f"共 {regressions} 项指标回归 (阈值 {args.threshold:.0f}%)")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+本地基准测试站点
+
+在后台线程中运行的 HTTP 服务器，页面内容确定且不依赖外网:
+- /static/{n}            静态文章页
+- /js/{n}                内容由 JavaScript 渲染的页面
+- /slow/{ms}             延迟 ms 毫秒后返回
+- /large/{kb}            约 kb KiB 的大页面
+- /redirect/{n}          n 次 302 跳转后到达静态页
+- /site/{n}              带站内链接的页面，供深度爬取使用
+
+用法:
+    python benchmarks/fixture_server.py --port 8765     # 单独启动，便于手动调试
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+PARAGRAPH = (
+    "Crawl4AI benchmark fixture paragraph. 这是用于基准测试的固定段落，"
+    "包含中英文混合内容以接近真实页面的 Markdown 转换开销。"
+)
+
+# 单个路径允许的上限，避免误传参数拖垮测试
+MAX_SLOW_MS = 30000
+MAX_LARGE_KB = 20 * 1024
+MAX_REDIRECTS = 20
+SITE_LINKS = 5
+
+
+def _page(title: str, body: str, script: str = "") -> str:
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title></head><body>{body}{script}</body></html>"
+    )
+
+
+def _article(title: str, paragraphs: int) -> str:
+    content = "".join(f"<p>{PARAGRAPH} #{i}</p>" for i in range(paragraphs))
+    return f"<article><h1>{title}</h1>{content}</article>"
+
+
+def render_static(n: int) -> Tuple[int, Dict[str, str], str]:
+    title = f"Static page {n}"
+    return 200, {}, _page(title, _article(title, 20))
+
+
+def render_js(n: int) -> Tuple[int, Dict[str, str], str]:
+    title = f"JS page {n}"
+    # 正文在 DOMContentLoaded 后生成，并在 300ms 后追加一段，模拟前端渲染
+    script = (
+        "<script>"
+        "document.addEventListener('DOMContentLoaded', function () {"
+        "  var root = document.getElementById('app');"
+        f"  var html = '<h1>{title}</h1>';"
+        f"  for (var i = 0; i < 20; i++) {{ html += '<p>{PARAGRAPH} #' + i + '</p>'; }}"
+        "  root.innerHTML = html;"
+        "  setTimeout(function () {"
+        "    var p = document.createElement('p');"
+        "    p.textContent = 'late content';"
+        "    root.appendChild(p);"
+        "  }, 300);"
+        "});"
+        "</script>"
+    )
+    return 200, {}, _page(title, "<div id=\"app\">loading...</div>", script)
+
+
+def render_slow(ms: int) -> Tuple[int, Dict[str, str], str]:
+    time.sleep(min(ms, MAX_SLOW_MS) / 1000)
+    title = f"Slow page {ms}ms"
+    return 200, {}, _page(title, _article(title, 5))
+
+
+def render_large(kb: int) -> Tuple[int, Dict[str, str], str]:
+    kb = min(kb, MAX_LARGE_KB)
+    title = f"Large page {kb}KiB"
+    paragraph_bytes = len(f"<p>{PARAGRAPH} #0000</p>".encode("utf-8"))
+    return 200, {}, _page(title, _article(title, max(1, kb * 1024 // paragraph_bytes)))
+
+
+def render_redirect(n: int) -> Tuple[int, Dict[str, str], str]:
+    n = min(n, MAX_REDIRECTS)
+    location = f"/redirect/{n - 1}" if n > 1 else "/static/0"
+    return 302, {"Location": location}, ""
+
+
+def render_site(n: int) -> Tuple[int, Dict[str, str], str]:
+    title = f"Site page {n}"
+    links = "".join(
+        f"<li><a href=\"/site/{n * SITE_LINKS + i + 1}\">Page {n * SITE_LINKS + i + 1}</a></li>"
+        for i in range(SITE_LINKS)
+    )
+    return 200, {}, _page(title, _article(title, 5) + f"<ul>{links}</ul>")
+
+
+ROUTES: Dict[str, Callable[[int], Tuple[int, Dict[str, str], str]]] = {
+    "static": render_static,
+    "js": render_js,
+    "slow": render_slow,
+    "large": render_large,
+    "redirect": render_redirect,
+    "site": render_site,
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """按路径前缀分发到页面生成函数"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        render = ROUTES.get(parts[0]) if parts else None
+        try:
+            arg = int(parts[1]) if len(parts) > 1 else 0
+        except ValueError:
+            render = None
+
+        if render is None:
+            status, headers, body = 404, {}, _page("Not Found", "<p>Not Found</p>")
+        else:
+            status, headers, body = render(arg)
+
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # 基准测试期间不输出访问日志
+        pass
+
+
+class FixtureServer:
+    """
+    后台线程中运行的测试站点
+
+    Args:
+        host: 监听地址
+        port: 监听端口，0 表示随机分配
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def start(self) -> "FixtureServer":
+        self._server = ThreadingHTTPServer((self.host, self.port), FixtureHandler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地基准测试站点")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with FixtureServer(args.host, args.port) as server:
+        print(f"测试站点已启动: {server.base_url} (Ctrl+C 退出)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
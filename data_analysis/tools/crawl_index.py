@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Crawl4AI 爬取数据索引
+
+raw_data 目录旁的 SQLite 索引 (默认 {base_dir}/index.db)，由 CrawlDataSaver 在保存时同步写入，
+按 URL 哈希、域名、时间与 crawl_id 查询，无需扫描文件名或逐个打开文件:
+
+    python crawl_index.py --base-dir ../../data_analysis rebuild
+    python crawl_index.py latest https://httpbin.org/html
+    python crawl_index.py domain httpbin.org --since 2025-07-01 --until 2025-08-01
+
+批量结果 (JSONL) 按行索引，记录行的字节偏移，读取时直接定位到该行。
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawls (
+    crawl_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    url_hash TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    success INTEGER,
+    path TEXT NOT NULL,
+    offset INTEGER,
+    -- 单个爬取与结构化提取的 ID 生成方式相同，同一URL同一秒内会重复
+    PRIMARY KEY (kind, crawl_id)
+);
+CREATE INDEX IF NOT EXISTS idx_crawls_id ON crawls (crawl_id);
+CREATE INDEX IF NOT EXISTS idx_crawls_url ON crawls (url_hash, timestamp);
+CREATE INDEX IF NOT EXISTS idx_crawls_domain ON crawls (domain, timestamp);
+"""
+
+COLUMNS = ("crawl_id", "kind", "url", "url_hash", "domain", "timestamp", "success", "path", "offset")
+
+
+def url_hash(url: str) -> str:
+    """索引使用的 URL 哈希 (完整 MD5，文件名中的 8 位前缀可以由它截取)"""
+    return hashlib.md5(url.encode()).hexdigest()
+
+
+class CrawlIndex:
+    """
+    爬取数据索引
+
+    Args:
+        db_path: 索引数据库路径
+        base_dir: 数据目录，索引中的文件路径相对于该目录保存
+    """
+
+    def __init__(self, db_path: str, base_dir: str):
+        self.db_path = Path(db_path)
+        self.base_dir = Path(base_dir)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def entry(
+        self,
+        crawl_id: str,
+        kind: str,
+        url: str,
+        domain: str,
+        timestamp: str,
+        success: Optional[bool],
+        path: Path,
+        offset: Optional[int] = None
+    ) -> tuple:
+        """构造一条索引记录 (供 add_many 批量写入)，path 为数据目录下的文件"""
+        return (
+            crawl_id, kind, url, url_hash(url), domain, timestamp,
+            None if success is None else int(success), str(path.relative_to(self.base_dir)), offset,
+        )
+
+    def add_many(self, entries: Iterable[tuple]):
+        """
+        在一个事务中写入多条索引记录 (同类数据的相同 crawl_id 覆盖)
+
+        Args:
+            entries: entry() 构造的记录
+        """
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO crawls ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                entries,
+            )
+
+    def add(self, *args, **kwargs):
+        """写入一条索引记录，参数同 entry()"""
+        self.add_many([self.entry(*args, **kwargs)])
+
+    def latest_for_url(self, url: str, kind: Optional[str] = None) -> Optional[Dict]:
+        """
+        URL 最近一次爬取的索引记录
+
+        Args:
+            url: URL
+            kind: 只查询某一类数据 (single / batch / structured)
+
+        Returns:
+            Optional[Dict]: 索引记录，没有时返回None
+        """
+        sql = "SELECT * FROM crawls WHERE url_hash = ? AND url = ?"
+        params: List = [url_hash(url), url]
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        row = self.conn.execute(sql + " ORDER BY timestamp DESC LIMIT 1", params).fetchone()
+        return dict(row) if row else None
+
+    def crawls_for_domain(
+        self,
+        domain: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        某个域名在时间范围内的全部爬取 (按时间倒序)
+
+        Args:
+            domain: 域名 (与文件名中的形式相同，端口中的 ':' 替换为 '_')
+            since: 起始时间 (ISO 格式，含)
+            until: 结束时间 (ISO 格式，不含)
+            limit: 最多返回条数
+
+        Returns:
+            List[Dict]: 索引记录
+        """
+        sql = "SELECT * FROM crawls WHERE domain = ?"
+        params: List = [domain]
+        if since:
+            sql += " AND timestamp >= ?"
+            params.append(since)
+        if until:
+            sql += " AND timestamp < ?"
+            params.append(until)
+        sql += " ORDER BY timestamp DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def get(self, crawl_id: str) -> Optional[Dict]:
+        """按 crawl_id 查询索引记录"""
+        row = self.conn.execute("SELECT * FROM crawls WHERE crawl_id = ?", (crawl_id,)).fetchone()
+        return dict(row) if row else None
+
+    def load(self, entry: Dict) -> Dict:
+        """
+        读取索引记录对应的数据
+
+        Args:
+            entry: 索引记录
+
+        Returns:
+            Dict: 单个/结构化结果为保存的整个文件内容，批量结果为该行的爬取结果
+        """
+        path = self.base_dir / entry["path"]
+        if entry["offset"] is None:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        with open(path, "rb") as f:
+            f.seek(entry["offset"])
+            return json.loads(f.readline())
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM crawls")
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM crawls").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬取数据索引")
+    parser.add_argument("--base-dir", default="data_analysis", help="数据目录")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="扫描 raw_data 重建索引")
+    latest = commands.add_parser("latest", help="URL 最近一次爬取")
+    latest.add_argument("url")
+    domain = commands.add_parser("domain", help="域名在时间范围内的爬取")
+    domain.add_argument("domain")
+    domain.add_argument("--since", default=None)
+    domain.add_argument("--until", default=None)
+    domain.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    from save_crawl_data import CrawlDataSaver
+
+    saver = CrawlDataSaver(args.base_dir)
+    if args.command == "rebuild":
+        count = saver.rebuild_index()
+        print(f"✅ 索引已重建: {count} 条记录")
+    elif args.command == "latest":
+        print(json.dumps(saver.index.latest_for_url(args.url), ensure_ascii=False, indent=2))
+    else:
+        entries = saver.index.crawls_for_domain(
+            saver.get_domain_from_url(f"//{args.domain}"), args.since, args.until, args.limit
+        )
+        print(json.dumps(entries, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
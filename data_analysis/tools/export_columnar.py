@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Crawl4AI 列式导出工具
+
+把 raw_data/single_crawls 与 raw_data/batch_crawls 下的 JSON / JSONL 文件合并为
+按日期、域名分区的 Parquet 数据集 (Hive 目录格式，可直接被 pyarrow / pandas / DuckDB / Spark 读取):
+
+    exports/parquet/crawl_date=2025-07-22/domain=httpbin.org/part-0.parquet
+
+analysis 中的字段为带类型的独立列，Markdown 正文单独存为 large_string 列，
+只读统计列时不会读取正文。数据逐批写入，内存占用与文件数量无关。
+
+依赖 pyarrow: pip install pyarrow
+"""
+
+import argparse
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:  # pragma: no cover
+    pa = None
+
+from save_crawl_data import CrawlDataSaver, iter_batch_results, read_batch_header
+
+# 每个写入批次的行数
+BATCH_ROWS = 5000
+
+# analysis 字段 -> 列类型
+ANALYSIS_COLUMNS = {
+    "word_count": "int64",
+    "char_count": "int64",
+    "paragraph_count": "int32",
+    "has_content": "bool_",
+    "image_count": "int32",
+    "video_count": "int32",
+    "audio_count": "int32",
+    "internal_links": "int32",
+    "external_links": "int32",
+    "has_screenshot": "bool_",
+    "has_pdf": "bool_",
+    "has_structured_data": "bool_",
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        sys.exit("❌ 列式导出需要 pyarrow: pip install pyarrow")
+
+
+def crawl_schema() -> "pa.Schema":
+    """导出数据集的表结构"""
+    _require_pyarrow()
+    fields = [
+        pa.field("crawl_id", pa.string()),
+        pa.field("source", pa.string()),
+        pa.field("batch_id", pa.string()),
+        pa.field("timestamp", pa.timestamp("us")),
+        pa.field("url", pa.string()),
+        pa.field("title", pa.string()),
+        pa.field("success", pa.bool_()),
+        pa.field("status_code", pa.int16()),
+        pa.field("error_message", pa.string()),
+        pa.field("execution_time", pa.float64()),
+    ]
+    fields += [pa.field(name, getattr(pa, type_name)()) for name, type_name in ANALYSIS_COLUMNS.items()]
+    fields += [
+        pa.field("markdown", pa.large_string()),
+        # 分区列
+        pa.field("crawl_date", pa.date32()),
+        pa.field("domain", pa.string()),
+    ]
+    return pa.schema(fields)
+
+
+class ColumnarExporter:
+    """
+    爬取数据列式导出器
+
+    Args:
+        base_dir: 数据目录 (与 CrawlDataSaver 相同)
+        output_dir: 输出目录，默认为 {base_dir}/exports/parquet
+    """
+
+    def __init__(self, base_dir: str = "data_analysis", output_dir: Optional[str] = None):
+        _require_pyarrow()
+        self.saver = CrawlDataSaver(base_dir)
+        self.base_dir = Path(base_dir)
+        self.output_dir = Path(output_dir) if output_dir else self.base_dir / "exports/parquet"
+        self.schema = crawl_schema()
+
+    def _row(self, result: Dict, analysis: Optional[Dict], timestamp: datetime,
+             source: str, crawl_id: Optional[str] = None, batch_id: Optional[str] = None) -> Dict[str, Any]:
+        analysis = analysis or self.saver.analyze_crawl_result(result)
+        url = result.get("url") or ""
+        row = {
+            "crawl_id": crawl_id or self.saver.generate_crawl_id(url, timestamp.isoformat()),
+            "source": source,
+            "batch_id": batch_id,
+            "timestamp": timestamp,
+            "url": url,
+            "title": result.get("title"),
+            "success": bool(result.get("success", False)),
+            "status_code": result.get("status_code"),
+            "error_message": result.get("error_message"),
+            "execution_time": result.get("execution_time"),
+            "markdown": result.get("markdown"),
+            "crawl_date": timestamp.date(),
+            "domain": self.saver.get_domain_from_url(url) or "unknown",
+        }
+        for name in ANALYSIS_COLUMNS:
+            row[name] = analysis.get(name)
+        return row
+
+    def iter_single_rows(self) -> Iterator[Dict[str, Any]]:
+        """逐个读取单个爬取结果文件"""
+        for path in sorted((self.base_dir / "raw_data/single_crawls").glob("*.json")):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            yield self._row(
+                data.get("result", {}),
+                data.get("analysis"),
+                datetime.fromisoformat(data["timestamp"]),
+                source="single",
+                crawl_id=data.get("crawl_id"),
+            )
+
+    def iter_batch_rows(self) -> Iterator[Dict[str, Any]]:
+        """逐行读取批量爬取结果文件 (JSONL 与旧版 JSON)"""
+        batch_dir = self.base_dir / "raw_data/batch_crawls"
+        for path in sorted(batch_dir.glob("batch_*.json*")):
+            if path.name.endswith(".summary.json"):
+                continue
+            header = read_batch_header(path)
+            timestamp = datetime.fromisoformat(header["timestamp"]) if header.get("timestamp") \
+                else datetime.fromtimestamp(path.stat().st_mtime)
+            batch_id = header.get("batch_id")
+            for line_no, result in enumerate(iter_batch_results(str(path))):
+                # 与索引中批量结果的 crawl_id 一致
+                crawl_id = self.saver.generate_crawl_id(result.get("url") or "", f"{batch_id}_{line_no}") \
+                    if batch_id else None
+                yield self._row(result, None, timestamp, source="batch", crawl_id=crawl_id, batch_id=batch_id)
+
+    def _record_batches(self) -> Iterator["pa.RecordBatch"]:
+        rows: List[Dict[str, Any]] = []
+        for source in (self.iter_single_rows(), self.iter_batch_rows()):
+            for row in source:
+                rows.append(row)
+                if len(rows) >= BATCH_ROWS:
+                    yield pa.RecordBatch.from_pylist(rows, schema=self.schema)
+                    rows = []
+        if rows:
+            yield pa.RecordBatch.from_pylist(rows, schema=self.schema)
+
+    def export(self) -> str:
+        """
+        重新生成 Parquet 数据集
+
+        已存在的同名分区会被覆盖，重复导出不会产生重复数据。
+
+        Returns:
+            str: 数据集目录
+        """
+        ds.write_dataset(
+            self._record_batches(),
+            self.output_dir,
+            schema=self.schema,
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([self.schema.field("crawl_date"), self.schema.field("domain")]),
+                flavor="hive",
+            ),
+            existing_data_behavior="delete_matching",
+            basename_template="part-{i}.parquet",
+        )
+        print(f"✅ 列式数据已导出: {self.output_dir}")
+        return str(self.output_dir)
+
+
+def _group_stats(table: "pa.Table", key: str) -> List[Dict]:
+    """按 key 分组计算数量、成功率、耗时与内容大小"""
+    grouped = table.group_by(key).aggregate([
+        ("url", "count"),
+        ("success_rate", "mean"),
+        ("execution_time", "mean"),
+        ("execution_time", "approximate_median"),
+        ("char_count", "mean"),
+        ("image_count", "sum"),
+    ])
+    rows = grouped.sort_by([("url_count", "descending")]).to_pylist()
+    return [
+        {
+            key: str(row[key]),
+            "count": row["url_count"],
+            "success_rate": row["success_rate_mean"],
+            "avg_execution_time": row["execution_time_mean"],
+            "median_execution_time": row["execution_time_approximate_median"],
+            "avg_char_count": row["char_count_mean"],
+            "total_images": row["image_count_sum"],
+        }
+        for row in rows
+    ]
+
+
+def _quantiles(column: "pa.ChunkedArray", qs=(0.5, 0.9, 0.95, 0.99)) -> Dict[str, float]:
+    values = pc.quantile(column, q=list(qs), interpolation="nearest").to_pylist() \
+        if pc.count(column).as_py() else [None] * len(qs)
+    return {f"p{int(q * 100)}": value for q, value in zip(qs, values)}
+
+
+def aggregate(dataset_dir: str) -> Dict:
+    """
+    对导出的数据集做向量化统计 (只读取统计列，不读取 Markdown)
+
+    覆盖 README 中的分析维度: 响应时间分布、成功率、错误类型、内容大小分布、
+    域名分布、媒体内容统计与链接密度。
+
+    Args:
+        dataset_dir: Parquet 数据集目录
+
+    Returns:
+        Dict: 统计结果
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning="hive")
+    columns = [name for name in dataset.schema.names if name != "markdown"]
+    table = dataset.to_table(columns=columns)
+    if table.num_rows == 0:
+        return {"total_count": 0}
+
+    success = table["success"]
+    table = table.append_column("success_rate", pc.cast(success, pa.float64()))
+
+    status = table.group_by("status_code").aggregate([("url", "count")])
+    failed = table.filter(pc.invert(success))
+    errors = failed.group_by("error_message").aggregate([("url", "count")]) \
+        .sort_by([("url_count", "descending")]).slice(0, 20)
+
+    # 链接密度: 每千词的链接数 (没有正文的页面不计)
+    links = pc.add(table["internal_links"], table["external_links"])
+    with_words = pc.greater(table["word_count"], 0)
+    density = pc.multiply(
+        pc.divide(pc.cast(pc.filter(links, with_words), pa.float64()),
+                  pc.cast(pc.filter(table["word_count"], with_words), pa.float64())),
+        1000.0,
+    )
+
+    return {
+        "total_count": table.num_rows,
+        "success_count": pc.sum(success).as_py() or 0,
+        "success_rate": pc.mean(table["success_rate"]).as_py(),
+        "execution_time": {"mean": pc.mean(table["execution_time"]).as_py(), **_quantiles(table["execution_time"])},
+        "char_count": {"mean": pc.mean(table["char_count"]).as_py(), **_quantiles(table["char_count"])},
+        "word_count": {"mean": pc.mean(table["word_count"]).as_py(), **_quantiles(table["word_count"])},
+        "media": {
+            "images": pc.sum(table["image_count"]).as_py() or 0,
+            "videos": pc.sum(table["video_count"]).as_py() or 0,
+            "audios": pc.sum(table["audio_count"]).as_py() or 0,
+        },
+        "links_per_1k_words": {"mean": pc.mean(density).as_py(), **_quantiles(density)},
+        "status_codes": {str(row["status_code"]): row["url_count"] for row in status.to_pylist()},
+        "top_errors": {str(row["error_message"]): row["url_count"] for row in errors.to_pylist()},
+        "by_domain": _group_stats(table, "domain"),
+        "by_date": _group_stats(table, "crawl_date"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导出爬取数据为分区 Parquet 数据集并生成统计")
+    parser.add_argument("--base-dir", default="data_analysis", help="数据目录")
+    parser.add_argument("--output", default=None, help="数据集目录，默认 {base-dir}/exports/parquet")
+    parser.add_argument("--skip-export", action="store_true", help="只对已导出的数据集做统计")
+    args = parser.parse_args()
+
+    _require_pyarrow()
+    exporter = ColumnarExporter(args.base_dir, args.output)
+    if not args.skip_export:
+        exporter.export()
+
+    report = aggregate(str(exporter.output_dir))
+    report_path = exporter.base_dir / "exports/reports" / f"columnar_summary_{date.today():%Y%m%d}.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+    print(f"✅ 统计报告已保存: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,207 @@ Crawl4AI 数据保存工具
 """
 
 import json
+import math
 import os
+import re
 import hashlib
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
 from urllib.parse import urlparse
 import uuid
 
+from crawl_index import CrawlIndex
+
+# 批量结果写入索引的批次大小
+INDEX_BATCH_SIZE = 1000
+
+# 与 str.split() 相同的空白定义，逐个匹配计数而不生成单词列表
+WORD_PATTERN = re.compile(r'\S+')
+
+
+def count_text(markdown: str) -> Tuple[int, int, int]:
+    """
+    统计文本的单词数、字符数与段落分隔数
+
+    Args:
+        markdown: Markdown 文本
+
+    Returns:
+        Tuple[int, int, int]: (单词数, 字符数, 段落分隔数)
+    """
+    words = 0
+    for _ in WORD_PATTERN.finditer(markdown):
+        words += 1
+    return words, len(markdown), markdown.count('\n\n')
+
+
+class LatencySketch:
+    """
+    耗时分位数草图
+
+    对数分桶，相邻桶边界相差 1%，分位数相对误差不超过约 0.5%；
+    占用内存只与耗时范围有关，与结果数量无关。
+    """
+
+    MIN_SECONDS = 0.001
+    GROWTH = 1.01
+
+    def __init__(self):
+        self.count = 0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float):
+        if seconds <= self.MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = math.ceil(math.log(seconds / self.MIN_SECONDS, self.GROWTH))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """第 q 分位数 (0-1)，没有样本时返回0"""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                break
+        if bucket == 0:
+            return self.MIN_SECONDS
+        # 桶内取几何中点
+        return round(self.MIN_SECONDS * self.GROWTH ** (bucket - 0.5), 4)
+
+
+class BatchAnalyzer:
+    """
+    批量结果的增量统计
+
+    每次 add 一个结果，只保留计数、均值、状态码分布、域名集合和耗时草图，
+    不保留结果本身，适合逐行读取十万级结果的批量文件。
+    """
+
+    def __init__(self):
+        self.total_count = 0
+        self.success_count = 0
+        self.failure_count = 0
+        self.total_words = 0
+        self.total_images = 0
+        self.domains = set()
+        self.status_codes: Dict[Any, int] = {}
+        self.latency = LatencySketch()
+        self._mean_execution_time = 0.0
+
+    def add(self, result: Dict):
+        """
+        统计一个爬取结果
+
+        Args:
+            result: 爬取结果
+        """
+        self.total_count += 1
+
+        # 成功率统计
+        if result.get('success', False):
+            self.success_count += 1
+        else:
+            self.failure_count += 1
+
+        # 执行时间统计 (增量均值)
+        exec_time = result.get('execution_time') or 0
+        if exec_time > 0:
+            self.latency.add(exec_time)
+            self._mean_execution_time += (exec_time - self._mean_execution_time) / self.latency.count
+
+        # 内容统计
+        markdown = result.get('markdown') or ''
+        if markdown:
+            self.total_words += count_text(markdown)[0]
+
+        # 媒体统计
+        media = result.get('media') or {}
+        self.total_images += len(media.get('images') or [])
+
+        # 域名统计
+        url = result.get('url', '')
+        if url:
+            self.domains.add(CrawlDataSaver.get_domain_from_url(url))
+
+        # 状态码统计
+        status_code = result.get('status_code')
+        if status_code:
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+
+    def summary(self) -> Dict:
+        """
+        汇总统计结果
+
+        Returns:
+            Dict: 分析结果，没有结果时为空字典
+        """
+        if not self.total_count:
+            return {}
+        return {
+            'total_count': self.total_count,
+            'success_count': self.success_count,
+            'failure_count': self.failure_count,
+            'avg_execution_time': self._mean_execution_time,
+            'p50_execution_time': self.latency.quantile(0.5),
+            'p95_execution_time': self.latency.quantile(0.95),
+            'p99_execution_time': self.latency.quantile(0.99),
+            'total_words': self.total_words,
+            'total_images': self.total_images,
+            'domains': sorted(self.domains),
+            'status_codes': self.status_codes,
+            'success_rate': self.success_count / self.total_count,
+        }
+
+
+def read_batch_header(path: Path) -> Dict:
+    """
+    读取批次信息 (不含结果)
+
+    JSONL 批量文件读取同名的 .summary.json，旧版 JSON 文件读取文件本身。
+
+    Args:
+        path: 批量结果文件路径
+
+    Returns:
+        Dict: 批次信息，找不到时为空字典
+    """
+    if path.suffix == '.jsonl':
+        path = path.with_name(path.name[:-len('.jsonl')] + '.summary.json')
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data.pop('results', None)
+    return data
+
+
+def iter_batch_results(filepath: str) -> Iterator[Dict]:
+    """
+    逐个读取批量结果文件中的爬取结果
+
+    支持 save_batch_crawl 写入的 JSONL 文件，以及旧版整体写入的 JSON 文件
+    (旧格式需要一次性载入整个文件)。
+
+    Args:
+        filepath: 批量结果文件路径
+
+    Yields:
+        Dict: 爬取结果
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        if not filepath.endswith('.jsonl'):
+            yield from json.load(f).get('results', [])
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
 class CrawlDataSaver:
     """爬取数据保存器"""
     
@@ -26,6 +219,8 @@ class CrawlDataSaver:
         """
         self.base_dir = Path(base_dir)
         self.ensure_directories()
+        # 按 URL / 域名 / 时间查询已保存数据的索引
+        self.index = CrawlIndex(self.base_dir / "index.db", self.base_dir)
     
     def ensure_directories(self):
         """确保所有必要的目录存在"""
@@ -38,6 +233,7 @@ class CrawlDataSaver:
             "processed_data/aggregated",
             "exports/csv",
             "exports/json",
+            "exports/parquet",
             "exports/reports"
         ]
         
@@ -59,7 +255,8 @@ class CrawlDataSaver:
         content = f"{url}_{timestamp}"
         return str(uuid.uuid5(uuid.NAMESPACE_URL, content))
     
-    def get_domain_from_url(self, url: str) -> str:
+    @staticmethod
+    def get_domain_from_url(url: str) -> str:
         """从URL提取域名"""
         try:
             parsed = urlparse(url)
@@ -106,43 +303,66 @@ class CrawlDataSaver:
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(save_data, f, ensure_ascii=False, indent=2)
         
+        self.index.add(
+            save_data["crawl_id"], "single", url, domain, save_data["timestamp"],
+            crawl_result.get('success'), filepath
+        )
+        
         print(f"✅ 单个爬取结果已保存: {filepath}")
         return str(filepath)
     
-    def save_batch_crawl(self, task_id: str, results: List[Dict], config: Optional[Dict] = None) -> str:
+    def save_batch_crawl(self, task_id: str, results: Iterable[Dict], config: Optional[Dict] = None) -> str:
         """
         保存批量爬取结果
-        
+
+        结果逐行写入 JSONL 文件 (可以传入生成器，不需要把整批结果放在内存中)，
+        批次信息与统计写入同名的 .summary.json 文件。
+
         Args:
             task_id: 任务ID
-            results: 爬取结果列表
+            results: 爬取结果 (列表或迭代器)
             config: 爬取配置
-            
+
         Returns:
-            str: 保存的文件路径
+            str: 保存的结果文件路径
         """
         timestamp = datetime.now()
         timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
-        
-        filename = f"batch_{task_id}_{timestamp_str}.json"
-        filepath = self.base_dir / "raw_data/batch_crawls" / filename
-        
-        # 准备保存的数据
+
+        filename = f"batch_{task_id}_{timestamp_str}"
+        batch_dir = self.base_dir / "raw_data/batch_crawls"
+        filepath = batch_dir / f"{filename}.jsonl"
+
+        analyzer = BatchAnalyzer()
+        entries = []
+        offset = 0
+        with open(filepath, 'wb') as f:
+            for line_no, result in enumerate(results):
+                line = json.dumps(result, ensure_ascii=False).encode('utf-8') + b'\n'
+                f.write(line)
+                analyzer.add(result)
+                entries.append(self._batch_index_entry(task_id, line_no, result, timestamp.isoformat(), filepath, offset))
+                offset += len(line)
+                if len(entries) >= INDEX_BATCH_SIZE:
+                    self.index.add_many(entries)
+                    entries = []
+        self.index.add_many(entries)
+
+        batch_analysis = analyzer.summary()
         save_data = {
             "batch_id": task_id,
             "timestamp": timestamp.isoformat(),
             "config": config or {},
-            "total_urls": len(results),
-            "successful_crawls": sum(1 for r in results if r.get('success', False)),
-            "failed_crawls": sum(1 for r in results if not r.get('success', False)),
-            "results": results,
-            "batch_analysis": self.analyze_batch_results(results)
+            "results_file": filepath.name,
+            "total_urls": analyzer.total_count,
+            "successful_crawls": analyzer.success_count,
+            "failed_crawls": analyzer.failure_count,
+            "batch_analysis": batch_analysis
         }
-        
-        # 保存到文件
-        with open(filepath, 'w', encoding='utf-8') as f:
+
+        with open(batch_dir / f"{filename}.summary.json", 'w', encoding='utf-8') as f:
             json.dump(save_data, f, ensure_ascii=False, indent=2)
-        
+
         print(f"✅ 批量爬取结果已保存: {filepath}")
         return str(filepath)
     
@@ -183,9 +403,72 @@ class CrawlDataSaver:
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(save_data, f, ensure_ascii=False, indent=2)
         
+        self.index.add(
+            save_data["extraction_id"], "structured", url, domain, save_data["timestamp"],
+            result.get('success'), filepath
+        )
+        
         print(f"✅ 结构化提取结果已保存: {filepath}")
         return str(filepath)
     
+    def _batch_index_entry(self, batch_id: str, line_no: int, result: Dict, timestamp: str,
+                           filepath: Path, offset: int) -> tuple:
+        """批量结果中一行的索引记录"""
+        url = result.get('url') or ''
+        return self.index.entry(
+            self.generate_crawl_id(url, f"{batch_id}_{line_no}"), "batch", url,
+            self.get_domain_from_url(url), timestamp, result.get('success'), filepath, offset
+        )
+    
+    def rebuild_index(self) -> int:
+        """
+        扫描 raw_data 目录重建索引
+
+        旧版整体写入的批量 JSON 文件没有按行的位置信息，不建立索引。
+
+        Returns:
+            int: 索引记录数
+        """
+        self.index.clear()
+        raw_dir = self.base_dir / "raw_data"
+        entries = []
+        
+        def flush(force: bool = False):
+            nonlocal entries
+            if entries and (force or len(entries) >= INDEX_BATCH_SIZE):
+                self.index.add_many(entries)
+                entries = []
+        
+        for kind, dir_name, id_key in (("single", "single_crawls", "crawl_id"),
+                                       ("structured", "structured", "extraction_id")):
+            for path in (raw_dir / dir_name).glob("*.json"):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                result = data.get('result') or {}
+                url = data.get('url') or result.get('url') or ''
+                entries.append(self.index.entry(
+                    data.get(id_key) or self.generate_crawl_id(url, data.get('timestamp', '')), kind, url,
+                    self.get_domain_from_url(url), data.get('timestamp', ''), result.get('success'), path
+                ))
+                flush()
+        
+        for path in (raw_dir / "batch_crawls").glob("batch_*.jsonl"):
+            header = read_batch_header(path)
+            batch_id = header.get('batch_id') or path.stem
+            timestamp = header.get('timestamp') or datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+            offset = 0
+            with open(path, 'rb') as f:
+                for line_no, line in enumerate(f):
+                    if line.strip():
+                        entries.append(self._batch_index_entry(
+                            batch_id, line_no, json.loads(line), timestamp, path, offset
+                        ))
+                        flush()
+                    offset += len(line)
+        
+        flush(force=True)
+        return self.index.count()
+    
     def analyze_crawl_result(self, result: Dict) -> Dict:
         """
         分析单个爬取结果
@@ -206,10 +489,11 @@ class CrawlDataSaver:
         # 内容分析
         markdown = result.get('markdown', '')
         if markdown:
-            analysis['word_count'] = len(markdown.split())
-            analysis['char_count'] = len(markdown)
-            analysis['paragraph_count'] = markdown.count('\n\n')
-            analysis['has_content'] = len(markdown.strip()) > 0
+            word_count, char_count, paragraph_count = count_text(markdown)
+            analysis['word_count'] = word_count
+            analysis['char_count'] = char_count
+            analysis['paragraph_count'] = paragraph_count
+            analysis['has_content'] = word_count > 0
         else:
             analysis['word_count'] = 0
             analysis['char_count'] = 0
@@ -243,74 +527,20 @@ class CrawlDataSaver:
         
         return analysis
     
-    def analyze_batch_results(self, results: List[Dict]) -> Dict:
+    def analyze_batch_results(self, results: Iterable[Dict]) -> Dict:
         """
         分析批量爬取结果
         
         Args:
-            results: 结果列表
+            results: 结果列表或迭代器 (如 iter_batch_results 逐行读取的文件)
             
         Returns:
             Dict: 分析结果
         """
-        if not results:
-            return {}
-        
-        analysis = {
-            'total_count': len(results),
-            'success_count': 0,
-            'failure_count': 0,
-            'avg_execution_time': 0,
-            'total_words': 0,
-            'total_images': 0,
-            'domains': set(),
-            'status_codes': {},
-        }
-        
-        execution_times = []
-        
+        analyzer = BatchAnalyzer()
         for result in results:
-            # 成功率统计
-            if result.get('success', False):
-                analysis['success_count'] += 1
-            else:
-                analysis['failure_count'] += 1
-            
-            # 执行时间统计
-            exec_time = result.get('execution_time', 0)
-            if exec_time > 0:
-                execution_times.append(exec_time)
-            
-            # 内容统计
-            markdown = result.get('markdown', '')
-            if markdown:
-                analysis['total_words'] += len(markdown.split())
-            
-            # 媒体统计
-            media = result.get('media', {})
-            if media:
-                analysis['total_images'] += len(media.get('images', []))
-            
-            # 域名统计
-            url = result.get('url', '')
-            if url:
-                domain = self.get_domain_from_url(url)
-                analysis['domains'].add(domain)
-            
-            # 状态码统计
-            status_code = result.get('status_code')
-            if status_code:
-                analysis['status_codes'][status_code] = analysis['status_codes'].get(status_code, 0) + 1
-        
-        # 计算平均值
-        if execution_times:
-            analysis['avg_execution_time'] = sum(execution_times) / len(execution_times)
-        
-        # 转换集合为列表（JSON序列化）
-        analysis['domains'] = list(analysis['domains'])
-        analysis['success_rate'] = analysis['success_count'] / analysis['total_count'] if analysis['total_count'] > 0 else 0
-        
-        return analysis
+            analyzer.add(result)
+        return analyzer.summary()
     
     def analyze_structured_extraction(self, result: Dict) -> Dict:
         """
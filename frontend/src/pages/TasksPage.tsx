@@ -52,11 +52,14 @@ interface TaskInfo {
   updated_at?: string
   completed_at?: string
   error_message?: string
+  timing_stats?: Record<string, { count: number; p50: number; p95: number }>
   results?: any[]
 }
 
 const TasksPage: React.FC = () => {
   const [tasks, setTasks] = useState<TaskInfo[]>([])
+  const [total, setTotal] = useState(0)
+  const [pagination, setPagination] = useState({ current: 1, pageSize: 10 })
   const [loading, setLoading] = useState(false)
   const [selectedTask, setSelectedTask] = useState<TaskInfo | null>(null)
   const [detailVisible, setDetailVisible] = useState(false)
@@ -64,13 +67,15 @@ const TasksPage: React.FC = () => {
   const [batchForm] = Form.useForm()
 
   // 获取任务列表
-  const fetchTasks = async () => {
+  const fetchTasks = async (page = pagination) => {
     setLoading(true)
     try {
-      const response = await fetch('/api/v1/tasks/')
+      const offset = (page.current - 1) * page.pageSize
+      const response = await fetch(`/api/v1/tasks/?offset=${offset}&limit=${page.pageSize}`)
       const data = await response.json()
-      if (data.success) {
-        setTasks(Array.isArray(data.data) ? data.data : [])
+      if (data.success && data.data) {
+        setTasks(Array.isArray(data.data.items) ? data.data.items : [])
+        setTotal(data.data.total || 0)
       }
     } catch (error) {
       console.error('获取任务列表失败:', error)
@@ -144,26 +149,25 @@ const TasksPage: React.FC = () => {
   // 创建批量任务
   const createBatchTask = async (values: any) => {
     try {
-      const urls = values.urls.split('\n').filter((url: string) => url.trim())
-      const response = await fetch('/api/v1/crawler/batch', {
+      // 以换行分隔的文本提交，服务端边接收边校验、去重，不限URL数量
+      const params = new URLSearchParams({
+        concurrent_limit: String(values.concurrent_limit || 3)
+      })
+      const response = await fetch(`/api/v1/crawler/batch/stream?${params}`, {
         method: 'POST',
         headers: {
-          'Content-Type': 'application/json'
+          'Content-Type': 'text/plain'
         },
-        body: JSON.stringify({
-          urls: urls,
-          config: {},
-          concurrent_limit: values.concurrent_limit || 3
-        })
+        body: values.urls
       })
       const data = await response.json()
       if (data.success) {
-        message.success('批量任务已创建')
+        message.success(data.message || '批量任务已创建')
         setBatchModalVisible(false)
         batchForm.resetFields()
         fetchTasks()
       } else {
-        message.error(data.message || '创建批量任务失败')
+        message.error(data.message || data.detail || '创建批量任务失败')
       }
     } catch (error) {
       console.error('创建批量任务失败:', error)
@@ -292,7 +296,7 @@ const TasksPage: React.FC = () => {
 
   // 统计数据
   const stats = {
-    total: tasks.length,
+    total: total,
     running: tasks.filter(t => t.status === TaskStatus.RUNNING).length,
     completed: tasks.filter(t => t.status === TaskStatus.COMPLETED).length,
     failed: tasks.filter(t => t.status === TaskStatus.FAILED).length
@@ -303,17 +307,38 @@ const TasksPage: React.FC = () => {
     fetchTasks()
   }, [])
 
-  // 自动刷新运行中的任务
+  // 订阅未结束任务的事件流 (SSE)，替代定时轮询
+  const activeTaskIds = tasks
+    .filter(t => t.status === TaskStatus.RUNNING || t.status === TaskStatus.PENDING)
+    .map(t => t.task_id)
+    .join(',')
+
   useEffect(() => {
-    const interval = setInterval(() => {
-      const hasRunningTasks = tasks.some(t => t.status === TaskStatus.RUNNING)
-      if (hasRunningTasks) {
+    if (!activeTaskIds) return
+
+    const sources = activeTaskIds.split(',').map(taskId => {
+      const source = new EventSource(`/api/v1/tasks/${taskId}/events`)
+
+      source.addEventListener('progress', (event) => {
+        const progress = JSON.parse((event as MessageEvent).data)
+        setTasks(prev => prev.map(t => (
+          t.task_id === progress.task_id ? { ...t, ...progress } : t
+        )))
+      })
+
+      const finish = () => {
+        source.close()
         fetchTasks()
       }
-    }, 5000)
+      ;[TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED].forEach(status => {
+        source.addEventListener(status, finish)
+      })
 
-    return () => clearInterval(interval)
-  }, [tasks])
+      return source
+    })
+
+    return () => sources.forEach(source => source.close())
+  }, [activeTaskIds])
 
   return (
     <div style={{ padding: '24px' }}>
@@ -371,7 +396,7 @@ const TasksPage: React.FC = () => {
             </Button>
             <Button 
               icon={<ReloadOutlined />}
-              onClick={fetchTasks}
+              onClick={() => fetchTasks()}
               loading={loading}
             >
               刷新
@@ -392,10 +417,17 @@ const TasksPage: React.FC = () => {
           rowKey="task_id"
           loading={loading}
           pagination={{
-            pageSize: 10,
+            current: pagination.current,
+            pageSize: pagination.pageSize,
+            total: total,
             showSizeChanger: true,
             showQuickJumper: true,
-            showTotal: (total) => `共 ${total} 个任务`
+            showTotal: (total) => `共 ${total} 个任务`,
+            onChange: (current, pageSize) => {
+              const page = { current, pageSize }
+              setPagination(page)
+              fetchTasks(page)
+            }
           }}
         />
       </Card>
@@ -451,6 +483,18 @@ const TasksPage: React.FC = () => {
                 style={{ marginTop: '16px' }}
               />
             )}
+
+            {selectedTask.timing_stats && (
+              <div style={{ marginTop: '16px' }}>
+                <p><strong>阶段耗时 (p50 / p95):</strong></p>
+                {Object.entries(selectedTask.timing_stats).map(([stage, stats]) => (
+                  <p key={stage}>
+                    {stage}: {(stats.p50 * 1000).toFixed(0)}ms / {(stats.p95 * 1000).toFixed(0)}ms
+                    <span style={{ color: '#999', marginLeft: '8px' }}>({stats.count})</span>
+                  </p>
+                ))}
+              </div>
+            )}
           </div>
         )}
       </Modal>
@@ -484,7 +528,7 @@ const TasksPage: React.FC = () => {
             label="并发限制"
             initialValue={3}
           >
-            <Input type="number" min={1} max={10} />
+            <Input type="number" min={1} max={100} />
           </Form.Item>
         </Form>
       </Modal>
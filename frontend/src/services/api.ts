@@ -3,8 +3,12 @@ import axios from 'axios'
 import type {
   SingleCrawlRequest,
   BatchCrawlRequest,
+  CrawlConfig,
   StructuredExtractionRequest,
   TaskResponse,
+  TaskListResponse,
+  TaskResultResponse,
+  CrawlStatus,
   CrawlResponse,
   ProjectResponse,
   APIResponse
@@ -51,6 +55,19 @@ export const crawlerAPI = {
   crawlBatch: (data: BatchCrawlRequest): Promise<TaskResponse> =>
     api.post('/crawler/batch', data),
 
+  // 流式批量爬取 (换行分隔的URL列表，不限数量)
+  crawlBatchStream: (
+    urls: string,
+    params?: { concurrent_limit?: number; config?: Partial<CrawlConfig> }
+  ): Promise<TaskResponse> =>
+    api.post('/crawler/batch/stream', urls, {
+      headers: { 'Content-Type': 'text/plain' },
+      params: {
+        concurrent_limit: params?.concurrent_limit,
+        config: params?.config ? JSON.stringify(params.config) : undefined
+      }
+    }),
+
   // 结构化数据提取
   extractStructured: (data: StructuredExtractionRequest): Promise<CrawlResponse> =>
     api.post('/crawler/extract', data),
@@ -66,14 +83,27 @@ export const taskAPI = {
   getTask: (taskId: string): Promise<TaskResponse> =>
     api.get(`/tasks/${taskId}`),
 
-  // 获取所有任务
-  getAllTasks: (): Promise<TaskResponse> =>
-    api.get('/tasks/'),
+  // 分页获取任务列表
+  getAllTasks: (params?: { status?: CrawlStatus; offset?: number; limit?: number }): Promise<TaskListResponse> =>
+    api.get('/tasks/', { params }),
 
   // 获取任务进度
   getTaskProgress: (taskId: string): Promise<any> =>
     api.get(`/tasks/${taskId}/progress`),
 
+  // 分页获取任务结果 (fields 为返回字段列表)
+  getTaskResults: (
+    taskId: string,
+    params?: { offset?: number; limit?: number; fields?: string[] }
+  ): Promise<TaskResultResponse> =>
+    api.get(`/tasks/${taskId}/results`, {
+      params: {
+        offset: params?.offset,
+        limit: params?.limit,
+        fields: params?.fields?.join(',')
+      }
+    }),
+
   // 取消任务
   cancelTask: (taskId: string): Promise<APIResponse> =>
     api.post(`/tasks/${taskId}/cancel`),
@@ -87,6 +117,20 @@ export const taskAPI = {
     api.post('/tasks/cleanup', { max_age_hours: maxAgeHours })
 }
 
+// 结果内容 API
+export const resultAPI = {
+  // 获取 Markdown 内容 (可选 Range 分段)
+  getMarkdown: (blobId: string, range?: { start: number; end?: number }): Promise<string> =>
+    api.get(`/results/${blobId}/markdown`, {
+      responseType: 'text',
+      headers: range ? { Range: `bytes=${range.start}-${range.end ?? ''}` } : undefined
+    }),
+
+  // 获取 HTML 内容
+  getHtml: (blobId: string): Promise<string> =>
+    api.get(`/results/${blobId}/html`, { responseType: 'text' })
+}
+
 // 项目 API
 export const projectAPI = {
   // 创建项目
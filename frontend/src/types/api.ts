@@ -61,6 +61,10 @@ export interface CrawlConfig {
   override_navigator?: boolean
   magic?: boolean
   
+  // 变化检测配置
+  change_detection?: boolean
+  skip_unchanged?: boolean
+  
   // 实验性功能
   experimental?: Record<string, any>
 }
@@ -91,6 +95,8 @@ export interface CrawlResult {
   title?: string
   markdown?: string
   cleaned_html?: string
+  markdown_ref?: string
+  html_ref?: string
   media?: Record<string, any>
   links?: Record<string, any>
   metadata?: Record<string, any>
@@ -112,9 +118,24 @@ export interface TaskInfo {
   updated_at?: string
   completed_at?: string
   error_message?: string
+  result_count?: number
+  timing_stats?: Record<string, StageTimingStats>
   results?: CrawlResult[]
 }
 
+export interface StageTimingStats {
+  count: number
+  p50: number
+  p95: number
+}
+
+export interface TaskPage {
+  items: TaskInfo[]
+  total: number
+  offset: number
+  limit: number
+}
+
 export interface ProjectInfo {
   project_id: string
   name: string
@@ -133,6 +154,19 @@ export interface APIResponse<T = any> {
   timestamp: string
 }
 
+export interface TaskResultPage {
+  task_id: string
+  status: CrawlStatus
+  result_count: number
+  offset: number
+  limit: number
+  next_offset: number
+  has_more: boolean
+  items: Array<Partial<CrawlResult> & { index: number }>
+}
+
 export type TaskResponse = APIResponse<TaskInfo | TaskInfo[]>
+export type TaskResultResponse = APIResponse<TaskResultPage>
+export type TaskListResponse = APIResponse<TaskPage>
 export type CrawlResponse = APIResponse<CrawlResult | CrawlResult[]>
 export type ProjectResponse = APIResponse<ProjectInfo | ProjectInfo[]> 
\ No newline at end of file